@@ -3,6 +3,7 @@ from django.urls import path
 from django.shortcuts import redirect, render
 from django.contrib import messages
 from .models import Artist, Venue, Event
+from .utils.spotify import SpotifyRateLimited, refresh_artists
 from .utils.ticketmaster import sync_events_for_city
 from .utils.riviera_sync import sync_riviera_events
 from .utils.cafeberlin_sync import sync_cafeberlin_events
@@ -34,14 +35,16 @@ class ArtistAdmin(admin.ModelAdmin):
     search_fields = ('name', 'spotify_id')
     list_filter = ('spotify_last_updated',)
     readonly_fields = ('spotify_id', 'spotify_uri', 'spotify_url', 'spotify_popularity', 
-                      'spotify_followers', 'spotify_image_url', 'spotify_last_updated')
+                      'spotify_followers', 'spotify_image_url', 'spotify_last_updated',
+                      'spotify_checked_at', 'spotify_misses')
     fieldsets = (
         (None, {
             'fields': ('name', 'bio', 'website', 'image')
         }),
         ('Spotify Information', {
             'fields': ('spotify_id', 'spotify_uri', 'spotify_url', 'spotify_popularity', 
-                      'spotify_followers', 'spotify_image_url', 'spotify_last_updated'),
+                      'spotify_followers', 'spotify_image_url', 'spotify_last_updated',
+                      'spotify_checked_at', 'spotify_misses'),
             'classes': ('collapse',),
         }),
     )
@@ -51,21 +54,32 @@ class ArtistAdmin(admin.ModelAdmin):
     has_spotify_data.boolean = True
     has_spotify_data.short_description = 'Spotify'
     
-    actions = ['fetch_spotify_data']
+    actions = ['fetch_spotify_data', 'retry_spotify_search']
     
-    def fetch_spotify_data(self, request, queryset):
-        updated = 0
-        for artist in queryset:
-            if artist.fetch_spotify_data(force_update=True):
-                updated += 1
-        
+    def _refresh_spotify_data(self, request, queryset, retry_misses=False):
+        try:
+            updated, _, skipped = refresh_artists(queryset, force_update=True, retry_misses=retry_misses)
+        except SpotifyRateLimited as e:
+            self.message_user(request, str(e), level=messages.ERROR)
+            return
+
         if updated:
             self.message_user(request, f"Successfully updated Spotify data for {updated} artists.")
         else:
             self.message_user(request, "Could not find Spotify data for any of the selected artists.", level=messages.WARNING)
+        if skipped:
+            self.message_user(request, f"Skipped {skipped} artists with no Spotify match found recently.")
+
+    def fetch_spotify_data(self, request, queryset):
+        self._refresh_spotify_data(request, queryset)
     
     fetch_spotify_data.short_description = "Fetch Spotify data for selected artists"
 
+    def retry_spotify_search(self, request, queryset):
+        self._refresh_spotify_data(request, queryset, retry_misses=True)
+
+    retry_spotify_search.short_description = "Search Spotify again for selected artists, including recent misses"
+
 class VenueAdmin(admin.ModelAdmin):
     list_display = ('name', 'city', 'state', 'capacity')
     list_filter = ('city', 'state')
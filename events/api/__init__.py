@@ -0,0 +1,3 @@
+"""
+Read-only JSON API for events, artists and venues, served under /api/v1/.
+"""
@@ -0,0 +1,13 @@
+from django.urls import path
+from . import views
+
+app_name = 'api'
+
+urlpatterns = [
+    path('events/', views.event_list, name='event_list'),
+    path('events/<int:pk>/', views.event_detail, name='event_detail'),
+    path('artists/', views.artist_list, name='artist_list'),
+    path('artists/<int:pk>/', views.artist_detail, name='artist_detail'),
+    path('venues/', views.venue_list, name='venue_list'),
+    path('venues/<int:pk>/', views.venue_detail, name='venue_detail'),
+]
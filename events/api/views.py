@@ -0,0 +1,248 @@
+"""
+JSON views reading rows with .values(), so no model instances are built.
+
+List endpoints stream their JSON array in chunks and accept ?fields= to
+select attributes and ?limit= to cap the number of rows. The event list
+takes the EventListView filters plus ?scope=upcoming|past|all.
+"""
+import json
+from itertools import islice
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from events.filters import EventFilterForm
+from events.models import Artist, Event, Venue
+from events.utils.page_cache import cache_public_page, conditional_page
+
+# Rows read and serialized per database round trip
+CHUNK_SIZE = 500
+
+def _image_url(name):
+    return default_storage.url(name) if name else None
+
+# Public field name -> (values() lookup, optional converter)
+EVENT_FIELDS = {
+    'id': ('id', None),
+    'title': ('title', None),
+    'slug': ('slug', None),
+    'description': ('description', None),
+    'date': ('date', None),
+    'venue': ('venue_id', None),
+    'venue_name': ('venue__name', None),
+    'city': ('venue__city', None),
+    'ticket_url': ('ticket_url', None),
+    'ticket_price': ('ticket_price', None),
+    'image': ('image', _image_url),
+    'thumbnail': ('thumbnail', _image_url),
+    'external_id': ('external_id', None),
+    'updated_at': ('updated_at', None),
+}
+# Not a column: filled with one query per chunk
+EVENT_ARTISTS_FIELD = 'artists'
+
+ARTIST_FIELDS = {
+    'id': ('id', None),
+    'name': ('name', None),
+    'bio': ('bio', None),
+    'website': ('website', None),
+    'image': ('display_image', _image_url),
+    'spotify_id': ('spotify_id', None),
+    'spotify_url': ('spotify_url', None),
+    'spotify_popularity': ('spotify_popularity', None),
+    'spotify_followers': ('spotify_followers', None),
+}
+
+VENUE_FIELDS = {
+    'id': ('id', None),
+    'name': ('name', None),
+    'address': ('address', None),
+    'city': ('city', None),
+    'state': ('state', None),
+    'zip_code': ('zip_code', None),
+    'website': ('website', None),
+    'capacity': ('capacity', None),
+}
+
+class BadRequest(Exception):
+    """Raised for invalid query parameters"""
+
+def _error(message, status):
+    return JsonResponse({'error': message}, status=status)
+
+def _selected_fields(request, available, extra=()):
+    """
+    Parse ?fields=, defaulting to every field.
+
+    Raises:
+        BadRequest: If a requested field does not exist
+    """
+    names = list(available) + list(extra)
+    requested = request.GET.get('fields')
+    if not requested:
+        return names
+    fields = [name.strip() for name in requested.split(',') if name.strip()]
+    unknown = [name for name in fields if name not in names]
+    if unknown:
+        raise BadRequest(f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(names)}")
+    return fields
+
+def _limit(request):
+    value = request.GET.get('limit')
+    if value is None:
+        return None
+    try:
+        limit = int(value)
+    except ValueError:
+        raise BadRequest(f"Invalid limit '{value}'")
+    if limit < 0:
+        raise BadRequest(f"Invalid limit '{value}'")
+    return limit
+
+def _rows(queryset, available, fields):
+    """Yield dicts of the public fields, read through values()."""
+    columns = [name for name in fields if name in available]
+    lookups = [available[name][0] for name in columns]
+    # The id is always read, e.g. to attach event artists
+    values = queryset.values_list('id', *lookups)
+    for row in values.iterator(chunk_size=CHUNK_SIZE):
+        item = {'id': row[0]}
+        for name, value in zip(columns, row[1:]):
+            converter = available[name][1]
+            item[name] = converter(value) if converter else value
+        yield item
+
+def _with_artists(rows, fields):
+    """Attach artist ids and names to event rows, one query per chunk."""
+    include_artists = EVENT_ARTISTS_FIELD in fields
+    include_id = 'id' in fields
+    through = Event.artists.through
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, CHUNK_SIZE))
+        if not chunk:
+            return
+        if include_artists:
+            artists = {}
+            links = through.objects.filter(event_id__in=[row['id'] for row in chunk]).order_by('artist__name')
+            for event_id, artist_id, name in links.values_list('event_id', 'artist_id', 'artist__name'):
+                artists.setdefault(event_id, []).append({'id': artist_id, 'name': name})
+            for row in chunk:
+                row[EVENT_ARTISTS_FIELD] = artists.get(row['id'], [])
+        for row in chunk:
+            if not include_id:
+                del row['id']
+            yield row
+
+def _stream(rows):
+    """Serialize rows as a JSON array, one element at a time."""
+    yield '['
+    for i, row in enumerate(rows):
+        yield (',' if i else '') + json.dumps(row, cls=DjangoJSONEncoder)
+    yield ']'
+
+def _list_response(rows):
+    return StreamingHttpResponse(_stream(rows), content_type='application/json')
+
+def _strip_id(rows, fields):
+    for row in rows:
+        if 'id' not in fields:
+            del row['id']
+        yield row
+
+def _events(request):
+    scope = request.GET.get('scope', 'upcoming')
+    if scope == 'upcoming':
+        events = Event.objects.upcoming()
+    elif scope == 'past':
+        events = Event.objects.past()
+    elif scope == 'all':
+        events = Event.objects.order_by('date')
+    else:
+        raise BadRequest(f"Invalid scope '{scope}', expected upcoming, past or all")
+    form = EventFilterForm(request.GET)
+    if not form.is_valid():
+        raise BadRequest(f"Invalid filters: {', '.join(form.errors)}")
+    # The id breaks date ties, so exports are stable
+    return form.apply(events).order_by(*events.query.order_by, 'id')
+
+def _detail(queryset, pk, available, fields):
+    return next(_rows(queryset.filter(pk=pk), available, fields), None)
+
+@require_GET
+@conditional_page()
+def event_list(request):
+    try:
+        fields = _selected_fields(request, EVENT_FIELDS, [EVENT_ARTISTS_FIELD])
+        events = _events(request)
+        limit = _limit(request)
+    except BadRequest as e:
+        return _error(str(e), 400)
+    if limit is not None:
+        events = events[:limit]
+    return _list_response(_with_artists(_rows(events, EVENT_FIELDS, fields), fields))
+
+@require_GET
+@conditional_page()
+@cache_public_page
+def event_detail(request, pk):
+    try:
+        fields = _selected_fields(request, EVENT_FIELDS, [EVENT_ARTISTS_FIELD])
+    except BadRequest as e:
+        return _error(str(e), 400)
+    event = _detail(Event.objects.all(), pk, EVENT_FIELDS, fields)
+    if event is None:
+        return _error('Event not found', 404)
+    return JsonResponse(next(_with_artists([event], fields)))
+
+@require_GET
+@conditional_page()
+def artist_list(request):
+    try:
+        fields = _selected_fields(request, ARTIST_FIELDS)
+        limit = _limit(request)
+    except BadRequest as e:
+        return _error(str(e), 400)
+    artists = Artist.objects.order_by('name', 'id')
+    if limit is not None:
+        artists = artists[:limit]
+    return _list_response(_strip_id(_rows(artists, ARTIST_FIELDS, fields), fields))
+
+@require_GET
+@conditional_page()
+@cache_public_page
+def artist_detail(request, pk):
+    try:
+        fields = _selected_fields(request, ARTIST_FIELDS)
+    except BadRequest as e:
+        return _error(str(e), 400)
+    artist = _detail(Artist.objects.all(), pk, ARTIST_FIELDS, fields)
+    if artist is None:
+        return _error('Artist not found', 404)
+    return JsonResponse(next(_strip_id([artist], fields)))
+
+@require_GET
+@conditional_page()
+def venue_list(request):
+    try:
+        fields = _selected_fields(request, VENUE_FIELDS)
+        limit = _limit(request)
+    except BadRequest as e:
+        return _error(str(e), 400)
+    venues = Venue.objects.order_by('name', 'id')
+    if limit is not None:
+        venues = venues[:limit]
+    return _list_response(_strip_id(_rows(venues, VENUE_FIELDS, fields), fields))
+
+@require_GET
+@conditional_page()
+@cache_public_page
+def venue_detail(request, pk):
+    try:
+        fields = _selected_fields(request, VENUE_FIELDS)
+    except BadRequest as e:
+        return _error(str(e), 400)
+    venue = _detail(Venue.objects.all(), pk, VENUE_FIELDS, fields)
+    if venue is None:
+        return _error('Venue not found', 404)
+    return JsonResponse(next(_strip_id([venue], fields)))
@@ -8,4 +8,5 @@ def site_settings(request):
         'SITE_LOGO': settings.SITE_LOGO,
         'SITE_NAME': settings.SITE_NAME,
         'LANGUAGES': settings.LANGUAGES,
+        'EVENT_CARD_CACHE_TIMEOUT': getattr(settings, 'EVENT_CARD_CACHE_TIMEOUT', 86400),
     }
\ No newline at end of file
@@ -0,0 +1,110 @@
+"""
+Filters and facet counts for the event list.
+
+Facets are computed over the filtered events with two aggregated queries,
+one grouped by venue (which also yields the city counts) and one grouped by
+artist, instead of one COUNT per facet value.
+"""
+import datetime
+from django import forms
+from django.db.models import Count
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+# Artists listed in the artist facet
+MAX_ARTIST_FACETS = 10
+
+def _start_of_day(day):
+    return timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+
+class EventFilterForm(forms.Form):
+    """Validates the event list query parameters; invalid ones are ignored."""
+    city = forms.CharField(required=False, label=_('City'),
+                           widget=forms.TextInput(attrs={'class': 'form-control form-control-sm'}))
+    # Chosen from the facet links, so only carried over by the form
+    venue = forms.IntegerField(required=False, min_value=1, widget=forms.HiddenInput)
+    artist = forms.IntegerField(required=False, min_value=1, widget=forms.HiddenInput)
+    date_from = forms.DateField(required=False, label=_('From'),
+                                widget=forms.DateInput(attrs={'type': 'date', 'class': 'form-control form-control-sm'}))
+    date_to = forms.DateField(required=False, label=_('To'),
+                              widget=forms.DateInput(attrs={'type': 'date', 'class': 'form-control form-control-sm'}))
+    max_price = forms.DecimalField(required=False, min_value=0, decimal_places=2, label=_('Max price'),
+                                   widget=forms.NumberInput(attrs={'class': 'form-control form-control-sm'}))
+
+    def filters(self):
+        """Return the valid, non-empty filter values."""
+        # Invalid fields are left out of cleaned_data, the rest still apply
+        self.is_valid()
+        return {name: value for name, value in self.cleaned_data.items() if value not in (None, '')}
+
+    def apply(self, queryset, dates=True):
+        """
+        Filter an event queryset.
+
+        Args:
+            queryset (QuerySet): Events to filter
+            dates (bool): Whether to apply the date range
+
+        Returns:
+            QuerySet: The filtered events
+        """
+        values = self.filters()
+        if 'city' in values:
+            queryset = queryset.filter(venue__city__iexact=values['city'])
+        if 'venue' in values:
+            queryset = queryset.filter(venue_id=values['venue'])
+        if 'artist' in values:
+            queryset = queryset.filter(artists__id=values['artist'])
+        if 'max_price' in values:
+            queryset = queryset.filter(ticket_price__lte=values['max_price'])
+        # Whole days in the site's time zone, as ranges the date index can serve
+        if dates and 'date_from' in values:
+            queryset = queryset.filter(date__gte=_start_of_day(values['date_from']))
+        if dates and 'date_to' in values:
+            queryset = queryset.filter(date__lt=_start_of_day(values['date_to'] + datetime.timedelta(days=1)))
+        return queryset
+
+def facet_counts(queryset, query=None):
+    """
+    Count events per city, venue and artist.
+
+    Args:
+        queryset (QuerySet): Filtered events
+        query (QueryDict): Current filter parameters; when given, every facet
+            value gets the query string selecting it on top of them
+
+    Returns:
+        dict: 'cities', 'venues' and 'artists' lists of dicts with a count,
+            most events first
+    """
+    events = queryset.order_by()
+    cities = {}
+    venues = []
+    for row in events.values('venue_id', 'venue__name', 'venue__city').annotate(count=Count('id', distinct=True)):
+        venues.append({'param': 'venue', 'value': row['venue_id'], 'name': row['venue__name'], 'count': row['count']})
+        cities[row['venue__city']] = cities.get(row['venue__city'], 0) + row['count']
+
+    artists = (
+        events.filter(artists__isnull=False)
+        .values('artists__id', 'artists__name')
+        .annotate(count=Count('id', distinct=True))
+        .order_by('-count', 'artists__name')[:MAX_ARTIST_FACETS]
+    )
+    facets = {
+        'cities': sorted(
+            ({'param': 'city', 'value': name, 'name': name, 'count': count} for name, count in cities.items()),
+            key=lambda city: (-city['count'], city['name']),
+        ),
+        'venues': sorted(venues, key=lambda venue: (-venue['count'], venue['name'])),
+        'artists': [
+            {'param': 'artist', 'value': row['artists__id'], 'name': row['artists__name'], 'count': row['count']}
+            for row in artists
+        ],
+    }
+    if query is not None:
+        for values in facets.values():
+            for facet in values:
+                selected = query.copy()
+                selected[facet['param']] = facet['value']
+                facet['query'] = selected.urlencode()
+    return facets
@@ -0,0 +1,171 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models.functions import Upper
+from django.utils import timezone
+from datetime import timedelta
+from itertools import islice
+from events import search
+from events.models import Artist, Event, Venue
+import random
+import statistics
+import time
+
+# Prefix marking the synthetic rows created by this command
+SYNTHETIC_PREFIX = 'bench-'
+
+class Rollback(Exception):
+    """Raised to undo the temporary index removal"""
+
+class Command(BaseCommand):
+    help = 'Benchmark listing and sync queries on a synthetic dataset, with and without the indexes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=1_000_000,
+                            help='Synthetic events to create if missing (default: 1,000,000)')
+        parser.add_argument('--venues', type=int, default=500, help='Synthetic venues (default: 500)')
+        parser.add_argument('--artists', type=int, default=50_000, help='Synthetic artists (default: 50,000)')
+        parser.add_argument('--runs', type=int, default=20, help='Timed runs per query (default: 20)')
+        parser.add_argument('--batch-size', type=int, default=10_000, help='Rows per bulk insert (default: 10,000)')
+        parser.add_argument('--no-compare', action='store_true',
+                            help='Only benchmark with the indexes in place')
+        parser.add_argument('--explain', action='store_true', help='Print the query plans')
+        parser.add_argument('--cleanup', action='store_true', help='Delete the synthetic dataset and exit')
+
+    def _bulk_insert(self, model, rows, batch_size):
+        rows = iter(rows)
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+            model.objects.bulk_create(batch, batch_size=batch_size)
+
+    def _populate(self, options):
+        existing = Event.objects.filter(external_id__startswith=SYNTHETIC_PREFIX).count()
+        if existing >= options['events']:
+            self.stdout.write(f"Using {existing} existing synthetic events")
+            return
+
+        self.stdout.write(f"Creating {options['events'] - existing} synthetic events...")
+        rng = random.Random(42)
+        batch_size = options['batch_size']
+        now = timezone.now()
+
+        if not Venue.objects.filter(name__startswith=SYNTHETIC_PREFIX).exists():
+            self._bulk_insert(Venue, (
+                Venue(name=f"{SYNTHETIC_PREFIX}venue-{i}", address='Calle Falsa 123', city='Madrid',
+                      state='Madrid', zip_code='28001')
+                for i in range(options['venues'])
+            ), batch_size)
+        if not Artist.objects.filter(name__startswith=SYNTHETIC_PREFIX).exists():
+            self._bulk_insert(Artist, (
+                Artist(name=f"{SYNTHETIC_PREFIX}artist-{i}") for i in range(options['artists'])
+            ), batch_size)
+
+        venue_ids = list(Venue.objects.filter(name__startswith=SYNTHETIC_PREFIX).values_list('pk', flat=True))
+        artist_ids = list(Artist.objects.filter(name__startswith=SYNTHETIC_PREFIX).values_list('pk', flat=True))
+        through = Event.artists.through
+
+        for start in range(existing, options['events'], batch_size):
+            stop = min(start + batch_size, options['events'])
+            with transaction.atomic():
+                events = Event.objects.bulk_create([
+                    Event(
+                        title=f"Synthetic event {i}",
+                        slug=f"synthetic-event-{i}",
+                        # Five years of history and one year ahead
+                        date=now + timedelta(minutes=rng.randint(-5 * 525_600, 525_600)),
+                        venue_id=rng.choice(venue_ids),
+                        external_id=f"{SYNTHETIC_PREFIX}{i}",
+                    )
+                    for i in range(start, stop)
+                ], batch_size=batch_size)
+                if not all(event.pk for event in events):
+                    # Backends without RETURNING: look the new ids up
+                    ids = dict(Event.objects.filter(
+                        external_id__in=[event.external_id for event in events]
+                    ).values_list('external_id', 'pk'))
+                    for event in events:
+                        event.pk = ids[event.external_id]
+                through.objects.bulk_create([
+                    through(event_id=event.pk, artist_id=artist_id)
+                    for event in events
+                    for artist_id in set(rng.sample(artist_ids, 2))
+                ], batch_size=batch_size)
+            self.stdout.write(f"  {stop}/{options['events']}")
+
+    def _queries(self):
+        now = timezone.now()
+        venue = Venue.objects.filter(name__startswith=SYNTHETIC_PREFIX).order_by('pk').first()
+        artist = Artist.objects.filter(name__startswith=SYNTHETIC_PREFIX).order_by('pk').first()
+        external_ids = [f"{SYNTHETIC_PREFIX}{i}" for i in range(0, 100_000, 1_000)]
+        artist_names = [f"{SYNTHETIC_PREFIX}artist-{i}" for i in range(0, 1_000, 10)]
+        return [
+            ('upcoming events page', Event.objects.filter(date__gte=now).order_by('date')[:9]),
+            ('past events', Event.objects.filter(date__lt=now).order_by('-date')[:5]),
+            ('venue upcoming events', Event.objects.filter(venue=venue, date__gte=now).order_by('date')),
+            ('artist upcoming events', artist.events.filter(date__gte=now).order_by('date')),
+            ('sync: events by external_id', Event.objects.filter(external_id__in=external_ids)),
+            ('sync: artists by name', Artist.objects.filter(name__in=artist_names)),
+            ('artist by name, any case', Artist.objects.annotate(upper_name=Upper('name'))
+             .filter(upper_name=f"{SYNTHETIC_PREFIX}ARTIST-500".upper())),
+            ('venue by name', Venue.objects.filter(name=f"{SYNTHETIC_PREFIX}venue-7")),
+        ]
+
+    def _time(self, name, runs, run):
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - start)
+        self.stdout.write(
+            f"  {name:<30} median {statistics.median(timings) * 1000:9.2f} ms"
+            f"  max {max(timings) * 1000:9.2f} ms"
+        )
+
+    def _run(self, label, runs, explain):
+        self.stdout.write(self.style.MIGRATE_HEADING(label))
+        for name, queryset in self._queries():
+            self._time(name, runs, lambda: list(queryset.all()))
+            if explain:
+                for line in queryset.explain().splitlines():
+                    self.stdout.write(f"      {line}")
+
+    def _run_search(self, runs):
+        # Bulk inserts bypass the signals, so index the synthetic events first
+        indexed = len(search.search_event_ids('Synthetic event', limit=1))
+        if not indexed:
+            self.stdout.write("Indexing the synthetic events for search...")
+            with transaction.atomic():
+                search.rebuild_index()
+        self.stdout.write(self.style.MIGRATE_HEADING('Search'))
+        for query in ('synthetic event 4242', 'synth', 'venue-7'):
+            self._time(f"search '{query}'", runs, lambda: search.search_event_ids(query))
+
+    def handle(self, *args, **options):
+        if options['cleanup']:
+            Event.objects.filter(external_id__startswith=SYNTHETIC_PREFIX).delete()
+            Artist.objects.filter(name__startswith=SYNTHETIC_PREFIX).delete()
+            Venue.objects.filter(name__startswith=SYNTHETIC_PREFIX).delete()
+            self.stdout.write(self.style.SUCCESS("Deleted the synthetic dataset"))
+            return
+
+        self.stdout.write(f"Database: {connection.vendor}")
+        self._populate(options)
+        self._run('With indexes', options['runs'], options['explain'])
+        self._run_search(options['runs'])
+
+        if options['no_compare']:
+            return
+
+        # Drop the indexes inside a transaction and roll back afterwards;
+        # both SQLite and PostgreSQL support transactional DDL
+        try:
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    for model in (Event, Artist, Venue):
+                        for index in model._meta.indexes:
+                            cursor.execute(f"DROP INDEX {connection.ops.quote_name(index.name)}")
+                self._run('Without indexes', options['runs'], options['explain'])
+                raise Rollback
+        except Rollback:
+            pass
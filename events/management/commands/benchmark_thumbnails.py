@@ -0,0 +1,101 @@
+from django.core.management.base import BaseCommand, CommandError
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from PIL import Image
+from events.utils.thumbnails import open_scaled
+import multiprocessing
+import resource
+import time
+
+
+def _full_decode(data, size):
+    """Thumbnail path before draft decoding: full decode, convert, then resize"""
+    img = Image.open(BytesIO(data))
+    # The decoded image used to be shared by the thumbnail and renditions
+    img.load()
+    if img.mode != 'RGB':
+        img = img.convert('RGB')
+    img.thumbnail(size, Image.LANCZOS)
+    return img
+
+def _scaled_decode(data, size):
+    """Thumbnail path with draft/reduce decoding"""
+    img = open_scaled(BytesIO(data), size)
+    img.thumbnail(size, Image.LANCZOS)
+    return img
+
+ENGINES = {
+    'full': _full_decode,
+    'scaled': _scaled_decode,
+}
+
+def _run(engine, images, size, repeat):
+    """
+    Thumbnail every image in a fresh worker process
+
+    Returns:
+        tuple: (CPU seconds per image, peak RSS growth in KiB)
+    """
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.process_time()
+    for _ in range(repeat):
+        for data in images:
+            output = BytesIO()
+            ENGINES[engine](data, size).save(output, format='JPEG', quality=85, optimize=True)
+    cpu = (time.process_time() - start) / (len(images) * repeat)
+    return cpu, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline
+
+def _synthetic_images(count, width, height):
+    """Noisy JPEG posters, so the codecs cannot shortcut flat colour"""
+    images = []
+    for _ in range(count):
+        img = Image.effect_noise((width, height), 64).convert('RGB')
+        output = BytesIO()
+        img.save(output, format='JPEG', quality=90)
+        images.append(output.getvalue())
+    return images
+
+class Command(BaseCommand):
+    help = 'Compare CPU time and peak memory of full and draft-mode thumbnail decoding'
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*', help='Images to benchmark (defaults to synthetic posters)')
+        parser.add_argument('--source-size', default='4000x6000', help='Size of the synthetic posters (default: 4000x6000)')
+        parser.add_argument('--count', type=int, default=3, help='Number of synthetic posters (default: 3)')
+        parser.add_argument('--size', default='300x200', help='Thumbnail size (default: 300x200)')
+        parser.add_argument('--repeat', type=int, default=3, help='Runs over the image set (default: 3)')
+
+    def _parse_size(self, value):
+        try:
+            width, height = (int(part) for part in value.lower().split('x'))
+        except ValueError:
+            raise CommandError(f"Invalid size '{value}', expected WIDTHxHEIGHT")
+        return width, height
+
+    def handle(self, *args, **options):
+        size = self._parse_size(options['size'])
+
+        # Work runs in child processes so peak RSS is measured per engine
+        context = multiprocessing.get_context('fork')
+
+        if options['paths']:
+            images = []
+            for path in options['paths']:
+                with open(path, 'rb') as f:
+                    images.append(f.read())
+        else:
+            source_size = self._parse_size(options['source_size'])
+            self.stdout.write(f"Generating {options['count']} synthetic {options['source_size']} posters...")
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                images = executor.submit(_synthetic_images, options['count'], *source_size).result()
+
+        results = {}
+        for engine in ENGINES:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                results[engine] = executor.submit(_run, engine, images, size, options['repeat']).result()
+            cpu, peak = results[engine]
+            self.stdout.write(f"{engine:>7}: {cpu * 1000:8.1f} ms CPU/image, {peak / 1024:8.1f} MiB peak RSS growth")
+
+        full_cpu, _ = results['full']
+        scaled_cpu, _ = results['scaled']
+        self.stdout.write(self.style.SUCCESS(f"Draft-mode decoding is {full_cpu / scaled_cpu:.1f}x faster"))
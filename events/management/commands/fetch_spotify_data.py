@@ -1,6 +1,6 @@
 from django.core.management.base import BaseCommand
-from django.utils import timezone
 from events.models import Artist
+from events.utils import spotify
 import logging
 
 logger = logging.getLogger(__name__)
@@ -19,26 +19,39 @@ class Command(BaseCommand):
             type=int,
             help='Update a specific artist by ID',
         )
+        parser.add_argument(
+            '--retry-misses',
+            action='store_true',
+            help='Search again for artists whose recent searches found no match',
+        )
 
     def handle(self, *args, **options):
         force = options.get('force', False)
         artist_id = options.get('artist_id')
+        retry_misses = options.get('retry_misses', False)
+
+        # One client for the run, so its metrics cover every call
+        sp = spotify.spotify_client()
+        if sp is None:
+            self.stdout.write(self.style.ERROR("Spotify API credentials not configured"))
+            return
         
         if artist_id:
             try:
                 artist = Artist.objects.get(pk=artist_id)
                 self.stdout.write(f"Fetching Spotify data for artist: {artist.name}")
-                success = artist.fetch_spotify_data(force_update=force)
+                success = artist.fetch_spotify_data(force_update=force, sp=sp, retry_misses=retry_misses)
                 if success:
                     self.stdout.write(self.style.SUCCESS(f"Successfully updated Spotify data for {artist.name}"))
                 else:
                     self.stdout.write(self.style.WARNING(f"Could not find Spotify data for {artist.name}"))
             except Artist.DoesNotExist:
                 self.stdout.write(self.style.ERROR(f"Artist with ID {artist_id} does not exist"))
+            self.stdout.write(f"Spotify API: {sp.metrics}")
             return
         
         # Get all artists
-        artists = Artist.objects.all()
+        artists = Artist.objects.order_by('pk')
         total = artists.count()
         
         if total == 0:
@@ -46,31 +59,19 @@ class Command(BaseCommand):
             return
             
         self.stdout.write(f"Fetching Spotify data for {total} artists...")
-        
-        success_count = 0
-        fail_count = 0
-        
-        for i, artist in enumerate(artists, 1):
-            self.stdout.write(f"Processing {i}/{total}: {artist.name}")
-            
-            # Skip if already has data and not forcing update
-            if not force and artist.spotify_id and artist.spotify_last_updated:
-                # Only update if data is older than 7 days
-                days_since_update = (timezone.now() - artist.spotify_last_updated).days
-                if days_since_update < 7:
-                    self.stdout.write(f"  Skipping {artist.name} - data is recent ({days_since_update} days old)")
-                    continue
-            
-            # Fetch data
-            success = artist.fetch_spotify_data(force_update=force)
-            
-            if success:
-                success_count += 1
-                self.stdout.write(f"  ✓ Found Spotify data for {artist.name}")
-            else:
-                fail_count += 1
-                self.stdout.write(f"  ✗ Could not find Spotify data for {artist.name}")
+
+        # Known Spotify ids are fetched in batches, only the other artists are searched
+        try:
+            success_count, fail_count, skip_count = spotify.refresh_artists(
+                artists.iterator(), force_update=force, sp=sp, retry_misses=retry_misses
+            )
+        except spotify.SpotifyRateLimited as e:
+            self.stdout.write(self.style.ERROR(f"Stopped: {e}"))
+            self.stdout.write(f"Spotify API: {sp.metrics}")
+            return
         
         self.stdout.write(self.style.SUCCESS(
-            f"Completed Spotify data fetch: {success_count} successful, {fail_count} failed"
-        ))
\ No newline at end of file
+            f"Completed Spotify data fetch: {success_count} successful, {fail_count} failed, "
+            f"{skip_count} skipped (data less than {spotify.REFRESH_AGE_DAYS} days old or no recent match)"
+        ))
+        self.stdout.write(f"Spotify API: {sp.metrics}")
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from events.utils.image_store import collect_garbage
+import logging
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = 'Delete content-addressed images no longer referenced by any event or artist'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='List unreferenced images without deleting them')
+
+    def handle(self, *args, **options):
+        names = collect_garbage(dry_run=options['dry_run'])
+
+        for name in names:
+            self.stdout.write(name)
+
+        action = "Would delete" if options['dry_run'] else "Deleted"
+        self.stdout.write(self.style.SUCCESS(f"{action} {len(names)} unreferenced images"))
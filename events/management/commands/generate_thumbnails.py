@@ -1,33 +1,173 @@
-from django.core.management.base import BaseCommand
-from events.models import Event
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from django.utils import timezone
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from events.models import Artist, Event
+from events.utils.page_cache import invalidate_pages
+from events.utils.renditions import get_renditions
+from events.utils.thumbnails import init_worker, render_event_images
+import json
 import logging
+import multiprocessing
+import os
 
 logger = logging.getLogger(__name__)
 
+# Default file recording the last event processed, to resume crashed runs
+CHECKPOINT_FILE = '.generate_thumbnails.checkpoint'
+
 class Command(BaseCommand):
-    help = 'Generate thumbnails for all events with images'
+    help = 'Generate thumbnails and responsive renditions for all events with images'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Worker processes for the image work; 0 runs in this process (default: CPU count)')
+        parser.add_argument('--chunk-size', type=int, default=100,
+                            help='Events per database read and bulk update (default: 100)')
+        parser.add_argument('--force', action='store_true',
+                            help='Regenerate images even for events that already have them')
+        parser.add_argument('--sizes',
+                            help='Comma-separated rendition groups to generate (default: all configured groups)')
+        parser.add_argument('--checkpoint', default=CHECKPOINT_FILE,
+                            help=f'File used to resume an interrupted run (default: {CHECKPOINT_FILE})')
+        parser.add_argument('--restart', action='store_true',
+                            help='Ignore any checkpoint and start from the first event')
+        parser.add_argument('--artists', action='store_true',
+                            help="Generate renditions of the artists' own images instead, in this process")
+
+    def _groups(self, sizes):
+        configured = get_renditions()
+        if not sizes:
+            return None, configured
+        names = [name.strip() for name in sizes.split(',') if name.strip()]
+        unknown = [name for name in names if name not in configured]
+        if unknown:
+            raise CommandError(
+                f"Unknown rendition groups: {', '.join(unknown)}. Available: {', '.join(configured)}"
+            )
+        groups = {name: configured[name] for name in names}
+        return groups, groups
+
+    def _load_checkpoint(self, path, run_key):
+        try:
+            with open(path, encoding='utf-8') as f:
+                checkpoint = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        if checkpoint.get('run') != run_key:
+            self.stdout.write("Ignoring checkpoint from a run with different options")
+            return 0
+        return checkpoint.get('last_pk', 0)
+
+    def _save_checkpoint(self, path, run_key, last_pk):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'run': run_key, 'last_pk': last_pk}, f)
+        os.replace(tmp_path, path)
+
+    def _handle_artists(self, options):
+        artists = Artist.objects.filter(image__isnull=False).exclude(image='')
+        if not options['force']:
+            artists = artists.filter(renditions={})
+        total = artists.count()
+        self.stdout.write(f"Found {total} artists with images to process. Generating renditions...")
+
+        success_count = 0
+        error_count = 0
+        updates = []
+        for artist in artists.order_by('pk').iterator(chunk_size=options['chunk_size']):
+            artist.generate_renditions()
+            if artist.renditions:
+                updates.append(artist)
+                success_count += 1
+            else:
+                error_count += 1
+                self.stdout.write(self.style.ERROR(f"Error generating renditions for artist {artist.pk}"))
+            if len(updates) >= options['chunk_size']:
+                Artist.objects.bulk_update(updates, ['renditions'])
+                updates = []
+        Artist.objects.bulk_update(updates, ['renditions'])
+        if success_count:
+            invalidate_pages()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Artist rendition generation complete. Success: {success_count}, Errors: {error_count}, Total: {total}"
+        ))
 
     def handle(self, *args, **options):
-        events = Event.objects.filter(image__isnull=False).exclude(image='')
+        if options['artists']:
+            return self._handle_artists(options)
+
+        groups, selected = self._groups(options['sizes'])
+        run_key = {'force': options['force'], 'sizes': sorted(selected)}
+        checkpoint = options['checkpoint']
+
+        last_pk = 0 if options['restart'] else self._load_checkpoint(checkpoint, run_key)
+        if last_pk:
+            self.stdout.write(f"Resuming after event {last_pk}")
+
+        events = Event.objects.filter(image__isnull=False).exclude(image='').filter(pk__gt=last_pk)
+        if not options['force']:
+            missing = Q(thumbnail__isnull=True) | Q(thumbnail='')
+            for name in selected:
+                missing |= ~Q(renditions__has_key=name)
+            events = events.filter(missing)
+        events = events.order_by('pk')
+
         total = events.count()
-        self.stdout.write(f"Found {total} events with images. Generating thumbnails...")
-        
+        self.stdout.write(f"Found {total} events with images to process. Generating thumbnails...")
+
         success_count = 0
         error_count = 0
-        
-        for event in events:
-            try:
-                if not event.thumbnail:
-                    event.generate_thumbnail()
-                    event.save()
-                    success_count += 1
-                    self.stdout.write(f"Generated thumbnail for event: {event.title}")
-                else:
-                    self.stdout.write(f"Event already has thumbnail: {event.title}")
-            except Exception as e:
-                error_count += 1
-                self.stdout.write(self.style.ERROR(f"Error generating thumbnail for event {event.id}: {str(e)}"))
-        
+        jobs = (
+            (pk, image, renditions, groups)
+            for pk, image, renditions in events.values_list('pk', 'image', 'renditions').iterator(
+                chunk_size=options['chunk_size']
+            )
+        )
+
+        executor = None
+        if options['workers'] > 0:
+            # Spawned, so workers never share the parent's database connections
+            executor = ProcessPoolExecutor(
+                max_workers=options['workers'],
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=init_worker,
+            )
+        render = executor.map if executor else map
+
+        try:
+            while True:
+                chunk = list(islice(jobs, options['chunk_size']))
+                if not chunk:
+                    break
+
+                updates = []
+                # bulk_update skips auto_now, and cached event cards are keyed on updated_at
+                now = timezone.now()
+                for pk, thumbnail, renditions in render(render_event_images, chunk):
+                    if thumbnail:
+                        updates.append(Event(pk=pk, thumbnail=thumbnail, renditions=renditions, updated_at=now))
+                        success_count += 1
+                    else:
+                        error_count += 1
+                        self.stdout.write(self.style.ERROR(f"Error generating thumbnail for event {pk}"))
+
+                Event.objects.bulk_update(updates, ['thumbnail', 'renditions', 'updated_at'])
+                self._save_checkpoint(checkpoint, run_key, chunk[-1][0])
+                self.stdout.write(f"Processed {success_count + error_count}/{total} events")
+        finally:
+            if executor:
+                executor.shutdown()
+            # Also after an interrupted run, for the chunks already written
+            if success_count:
+                invalidate_pages()
+
+        # The run finished, so the next one starts from the beginning
+        if os.path.exists(checkpoint):
+            os.remove(checkpoint)
+
         self.stdout.write(self.style.SUCCESS(
             f"Thumbnail generation complete. Success: {success_count}, Errors: {error_count}, Total: {total}"
-        ))
\ No newline at end of file
+        ))
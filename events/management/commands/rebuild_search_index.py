@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from events import search
+import time
+
+class Command(BaseCommand):
+    help = 'Index every event for full-text search, e.g. after bulk imports outside the sync'
+
+    def handle(self, *args, **options):
+        if not search.search_backend():
+            self.stdout.write("This database has no search index, searches use icontains lookups")
+            return
+
+        start = time.perf_counter()
+        with transaction.atomic():
+            count = search.rebuild_index()
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {count} events in {time.perf_counter() - start:.1f}s"
+        ))
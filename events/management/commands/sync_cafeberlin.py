@@ -2,18 +2,23 @@
 Management command to synchronize events from Café Berlín website.
 """
 from django.core.management.base import BaseCommand
-from events.utils.cafeberlin_sync import sync_cafeberlin_events
+from events.utils.cafeberlin_sync import CafeBerlinEventSync
 
 class Command(BaseCommand):
     help = 'Synchronize events from Café Berlín website'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--no-cache', action='store_true', help='Download all pages even if they have not changed')
+
     def handle(self, *args, **options):
-        created, updated, error_count = sync_cafeberlin_events()
+        syncer = CafeBerlinEventSync(use_cache=not options['no_cache'])
+        created, updated, error_count = syncer.sync_events()
         
         self.stdout.write(
             self.style.SUCCESS(
                 f'Successfully synchronized Café Berlín events. '
-                f'Created: {created}, Updated: {updated}'
+                f'Created: {created}, Updated: {updated}, Unchanged: {syncer.unchanged_count}'
                 + (f', Errors: {error_count}' if error_count else '')
             )
-        )
\ No newline at end of file
+        )
+        self.stdout.write(f'HTTP cache: {syncer.cache_hits} hits, {syncer.cache_misses} misses')
@@ -1,5 +1,5 @@
 from django.core.management.base import BaseCommand
-from events.utils.riviera_sync import sync_riviera_events
+from events.utils.riviera_sync import RivieraEventSync
 import logging
 
 logger = logging.getLogger(__name__)
@@ -7,12 +7,17 @@ logger = logging.getLogger(__name__)
 class Command(BaseCommand):
     help = 'Synchronize events from Sala Riviera website'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--no-cache', action='store_true', help='Download the listing even if it has not changed')
+
     def handle(self, *args, **options):
         self.stdout.write("Starting Sala Riviera events synchronization...")
         
-        created, updated, errors = sync_riviera_events()
+        syncer = RivieraEventSync(use_cache=not options['no_cache'])
+        created, updated, errors = syncer.sync_events()
         
         self.stdout.write(self.style.SUCCESS(
             f"Sala Riviera synchronization complete. "
-            f"Created: {created}, Updated: {updated}, Errors: {errors}"
-        ))
\ No newline at end of file
+            f"Created: {created}, Updated: {updated}, Unchanged: {syncer.unchanged_count}, Errors: {errors}"
+        ))
+        self.stdout.write(f"HTTP cache: {syncer.cache_hits} hits, {syncer.cache_misses} misses")
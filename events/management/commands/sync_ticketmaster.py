@@ -1,5 +1,5 @@
 from django.core.management.base import BaseCommand, CommandError
-from events.utils.ticketmaster import sync_events_for_city
+from events.utils.ticketmaster import TicketmasterEventSync
 from django.conf import settings
 
 class Command(BaseCommand):
@@ -22,7 +22,8 @@ class Command(BaseCommand):
         
         self.stdout.write(self.style.SUCCESS(f'Syncing events for {city}, {state if state else ""}...'))
         
-        created, updated, error = sync_events_for_city(city, state, api_key)
+        syncer = TicketmasterEventSync(city, state, api_key)
+        created, updated, error = syncer.sync_events()
         
         if error:
             self.stdout.write(self.style.ERROR(f'Error: {error}'))
@@ -30,4 +31,5 @@ class Command(BaseCommand):
         
         self.stdout.write(self.style.SUCCESS(f'Successfully synced events for {city}'))
         self.stdout.write(f'Created: {created} events')
-        self.stdout.write(f'Updated: {updated} events')
\ No newline at end of file
+        self.stdout.write(f'Updated: {updated} events')
+        self.stdout.write(f'Unchanged: {syncer.unchanged_count} events')
\ No newline at end of file
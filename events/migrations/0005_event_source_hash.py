@@ -0,0 +1,18 @@
+# Generated by Django 4.2.20 on 2026-10-17 22:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0004_artist_spotify_followers_artist_spotify_id_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='source_hash',
+            field=models.CharField(blank=True, default='', help_text='Fingerprint of the source data from the last sync', max_length=64),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.20 on 2026-10-17 23:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0005_event_source_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageSource',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField(max_length=1000, unique=True)),
+                ('sha256', models.CharField(db_index=True, help_text='SHA-256 of the downloaded image bytes', max_length=64)),
+                ('fetched_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
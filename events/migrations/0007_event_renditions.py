@@ -0,0 +1,18 @@
+# Generated by Django 4.2.20 on 2026-10-17 23:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0006_imagesource'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='renditions',
+            field=models.JSONField(blank=True, default=dict, help_text='Responsive renditions of the image: group -> format -> [name, width] list'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.20 on 2026-10-17 23:09
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce, NullIf
+
+
+def fill_display_images(apps, schema_editor):
+    Artist = apps.get_model('events', 'Artist')
+    Event = apps.get_model('events', 'Event')
+    event_image = (
+        Event.objects.filter(artists=models.OuterRef('pk'))
+        .exclude(image='')
+        .exclude(image__isnull=True)
+        .order_by('pk')
+        .values('image')[:1]
+    )
+    Artist.objects.update(display_image=Coalesce(
+        NullIf('image', models.Value('')),
+        models.Subquery(event_image),
+        models.Value(''),
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0007_event_renditions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='artist',
+            name='display_image',
+            field=models.ImageField(blank=True, default='', editable=False, help_text='Image shown for the artist: its own image or one from its events', upload_to='artists/'),
+        ),
+        migrations.RunPython(fill_display_images, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.20 on 2026-10-17 23:11
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0008_artist_display_image'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='artist',
+            index=models.Index(fields=['name'], name='artist_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='artist',
+            index=models.Index(django.db.models.functions.text.Upper('name'), name='artist_name_upper_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='artist',
+            index=models.Index(fields=['spotify_id'], name='artist_spotify_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['date'], name='event_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['venue', 'date'], name='event_venue_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['external_id'], name='event_external_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='venue',
+            index=models.Index(fields=['name'], name='venue_name_idx'),
+        ),
+    ]
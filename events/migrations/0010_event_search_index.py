@@ -0,0 +1,22 @@
+from django.db import migrations
+from events import search
+
+
+def create_search_index(apps, schema_editor):
+    search.create_index(schema_editor.connection)
+    search.rebuild_index(schema_editor.connection)
+
+
+def drop_search_index(apps, schema_editor):
+    search.drop_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0009_listing_and_sync_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
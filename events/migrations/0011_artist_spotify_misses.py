@@ -0,0 +1,23 @@
+# Generated by Django 4.2.20 on 2026-10-17 23:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0010_event_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='artist',
+            name='spotify_checked_at',
+            field=models.DateTimeField(blank=True, help_text='When Spotify was last searched for the artist', null=True),
+        ),
+        migrations.AddField(
+            model_name='artist',
+            name='spotify_misses',
+            field=models.PositiveSmallIntegerField(default=0, help_text='Consecutive Spotify searches without a match'),
+        ),
+    ]
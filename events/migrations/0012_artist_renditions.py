@@ -0,0 +1,18 @@
+# Generated by Django 4.2.20 on 2026-10-17 23:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0011_artist_spotify_misses'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='artist',
+            name='renditions',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Responsive renditions of the image: group -> format -> [name, width] list'),
+        ),
+    ]
@@ -1,22 +1,91 @@
+from django.apps import apps
 from django.db import models
+from django.db.models.fields.files import FieldFile
+from django.db.models.functions import Coalesce, NullIf, Upper
 from django.utils import timezone
 from django.core.files.base import ContentFile
 from django.utils.text import slugify
 from django.conf import settings
 import os
 import logging
-import spotipy
-from spotipy.oauth2 import SpotifyClientCredentials
 from PIL import Image
 from io import BytesIO
 
 logger = logging.getLogger(__name__)
 
-class Artist(models.Model):
+# Largest Spotify artist image downloaded
+MAX_ARTIST_IMAGE_BYTES = 5 * 1024 * 1024
+
+class TrackedFieldsMixin:
+    """
+    Remember the values of TRACKED_FIELDS as loaded or last saved, so that
+    saves and their signals can tell whether they changed without a query
+    """
+    TRACKED_FIELDS = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_values()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None):
+        super().refresh_from_db(using=using, fields=fields)
+        self._remember_values(fields)
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._remember_values(kwargs.get('update_fields'))
+
+    def _field_value(self, name):
+        value = getattr(self, name)
+        # Files compare by their stored name
+        return value.name if isinstance(value, FieldFile) else value
+
+    def _remember_values(self, fields=None):
+        """Remember the tracked fields that are loaded, or only those given"""
+        remembered = self.__dict__.setdefault('_loaded_values', {})
+        for name in self.TRACKED_FIELDS:
+            # Deferred fields are not loaded, so there is nothing to compare
+            if name in self.__dict__ and (fields is None or name in fields):
+                remembered[name] = self._field_value(name)
+
+    def has_changed(self, *names):
+        """Whether any of the tracked fields differs from its loaded value"""
+        remembered = self.__dict__.get('_loaded_values', {})
+        return any(
+            name not in remembered or remembered[name] != self._field_value(name)
+            for name in names
+        )
+
+class ArtistQuerySet(models.QuerySet):
+    def refresh_display_images(self):
+        """
+        Recompute display_image in a single UPDATE: the artist's own image,
+        else the image of the artist's first event that has one
+        """
+        event_image = (
+            Event.objects.filter(artists=models.OuterRef('pk'))
+            .exclude(image='')
+            .exclude(image__isnull=True)
+            .order_by('pk')
+            .values('image')[:1]
+        )
+        return self.update(display_image=Coalesce(
+            NullIf('image', models.Value('')),
+            models.Subquery(event_image),
+            models.Value(''),
+        ))
+
+class Artist(TrackedFieldsMixin, models.Model):
     name = models.CharField(max_length=200)
     bio = models.TextField(blank=True)
     website = models.URLField(max_length=1000, blank=True)
     image = models.ImageField(upload_to='artists/', blank=True, null=True)
+    display_image = models.ImageField(upload_to='artists/', blank=True, default='', editable=False,
+                                      help_text="Image shown for the artist: its own image or one from its events")
+    renditions = models.JSONField(default=dict, blank=True, editable=False,
+                                  help_text="Responsive renditions of the image: group -> format -> [name, width] list")
     
     # Spotify fields
     spotify_id = models.CharField(max_length=100, blank=True, null=True, help_text="Spotify artist ID")
@@ -26,101 +95,118 @@ class Artist(models.Model):
     spotify_followers = models.IntegerField(blank=True, null=True, help_text="Number of Spotify followers")
     spotify_image_url = models.URLField(max_length=1000, blank=True, null=True, help_text="URL to artist image on Spotify")
     spotify_last_updated = models.DateTimeField(blank=True, null=True, help_text="When Spotify data was last updated")
+    spotify_checked_at = models.DateTimeField(blank=True, null=True, help_text="When Spotify was last searched for the artist")
+    spotify_misses = models.PositiveSmallIntegerField(default=0, help_text="Consecutive Spotify searches without a match")
+
+    # Fields compared against their loaded values when saving
+    TRACKED_FIELDS = ('name', 'image')
+
+    objects = ArtistQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Sync matches artists by name; Upper() serves case-insensitive lookups
+            models.Index(fields=['name'], name='artist_name_idx'),
+            models.Index(Upper('name'), name='artist_name_upper_idx'),
+            models.Index(fields=['spotify_id'], name='artist_spotify_id_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
-    def fetch_spotify_data(self, force_update=False):
+    def fetch_spotify_data(self, force_update=False, sp=None, retry_misses=False):
         """
         Fetch artist data from Spotify API and update the model
         Returns True if successful, False otherwise
-        """
-        # Skip if we already have Spotify data and not forcing an update
-        if self.spotify_id and not force_update:
-            # Only update if data is older than 7 days
-            if self.spotify_last_updated and (timezone.now() - self.spotify_last_updated).days < 7:
-                return True
 
-        try:
-            # Initialize Spotify client
-            client_id = getattr(settings, 'SPOTIFY_CLIENT_ID', None)
-            client_secret = getattr(settings, 'SPOTIFY_CLIENT_SECRET', None)
-
-            if not client_id or not client_secret:
-                logger.warning("Spotify API credentials not configured")
-                return False
+        Args:
+            force_update (bool): Refresh even if the data is less than a week old
+            sp (spotipy.Spotify): Optional authenticated client to reuse
+            retry_misses (bool): Search even if a recent search found no match
+        """
+        from .utils import spotify
 
-            client_credentials_manager = SpotifyClientCredentials(
-                client_id=client_id,
-                client_secret=client_secret
-            )
+        # Skip if we already have recent Spotify data and not forcing an update
+        if not force_update and spotify.is_fresh(self):
+            return True
+        # Skip artists that recently had no match until their recheck is due
+        if not retry_misses and spotify.is_known_miss(self):
+            return False
 
-            sp = spotipy.Spotify(client_credentials_manager=client_credentials_manager)
-            
-            # Search for the artist
-            results = sp.search(q=f'artist:{self.name}', type='artist', limit=5)
-            
-            if not results['artists']['items']:
-                logger.info(f"No Spotify results found for artist: {self.name}")
+        if sp is None:
+            sp = spotify.spotify_client()
+            if sp is None:
                 return False
-                
-            # Find the best match
-            best_match = None
-            for item in results['artists']['items']:
-                # Exact match is best
-                if item['name'].lower() == self.name.lower():
-                    best_match = item
-                    break
-                # Otherwise take the first result
-                elif not best_match:
-                    best_match = item
-            
-            if not best_match:
-                return False
-                
-            # Update artist with Spotify data
-            self.spotify_id = best_match['id']
-            self.spotify_uri = best_match['uri']
-            self.spotify_url = best_match['external_urls'].get('spotify', '')
-            self.spotify_popularity = best_match['popularity']
-            self.spotify_followers = best_match['followers']['total']
-            
-            # Get the largest image if available
-            if best_match['images'] and len(best_match['images']) > 0:
-                # Sort by size (largest first)
-                sorted_images = sorted(best_match['images'], key=lambda x: x.get('width', 0) or 0, reverse=True)
-                self.spotify_image_url = sorted_images[0]['url']
-                
-                # If we don't have an image, download from Spotify
-                if not self.image and self.spotify_image_url:
-                    self._download_spotify_image()
-            
-            self.spotify_last_updated = timezone.now()
-            self.save()
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error fetching Spotify data for {self.name}: {str(e)}")
+        try:
+            return spotify.enrich_artist(sp, self)
+        except spotify.SpotifyRateLimited as e:
+            # Left for a later run, as this is called from save()
+            logger.warning(f"Skipping Spotify lookup for {self.name}: {e}")
             return False
-            
+
     def _download_spotify_image(self):
         """Download artist image from Spotify and save it to the model"""
         if not self.spotify_image_url:
             return
             
         try:
-            import requests
-            response = requests.get(self.spotify_image_url)
-            if response.status_code == 200:
-                # Create a filename
-                filename = f"{slugify(self.name)}_spotify.jpg"
-                
-                # Save the image
-                self.image.save(filename, ContentFile(response.content), save=False)
-                
+            if getattr(settings, 'CONTENT_ADDRESSED_IMAGES', False):
+                from .utils.image_store import store_image_from_url
+                self.image.name = store_image_from_url(self.spotify_image_url, max_bytes=MAX_ARTIST_IMAGE_BYTES)
+                return
+
+            from .utils.image_utils import download_image_bytes
+            # Streamed with a timeout, giving up on oversized images
+            data = download_image_bytes(self.spotify_image_url, MAX_ARTIST_IMAGE_BYTES)
+            # Create a filename
+            filename = f"{slugify(self.name)}_spotify.jpg"
+
+            # Save the image
+            self.image.save(filename, ContentFile(data), save=False)
+
         except Exception as e:
             logger.error(f"Error downloading Spotify image for {self.name}: {str(e)}")
             
+    def generate_renditions(self):
+        """Generate the responsive renditions of the artist's own image"""
+        if not self.image:
+            self.renditions = {}
+            return
+
+        try:
+            from .utils.renditions import (
+                ARTIST_RENDITIONS_DIR, generate_renditions, get_artist_renditions, largest_box,
+            )
+            from .utils.thumbnails import open_scaled
+
+            groups = get_artist_renditions()
+            if getattr(settings, 'CONTENT_ADDRESSED_IMAGES', False):
+                # Artists sharing an image share its renditions too
+                shared = (
+                    Artist.objects.filter(image=self.image.name)
+                    .exclude(renditions={})
+                    .values_list('renditions', flat=True)
+                    .first()
+                )
+                if shared:
+                    self.renditions = shared
+                    return
+
+            # Decode at the smallest scale covering the largest rendition, as RGB
+            img = open_scaled(self.image, largest_box(groups))
+            self.renditions = generate_renditions(img, self.image.name, groups, ARTIST_RENDITIONS_DIR)
+        except Exception as e:
+            logger.error(f"Error generating renditions for artist {self.name} (Image: {self.image.name}): {e}")
+            self.renditions = {}
+
+    def _image_changed(self):
+        """Whether the renditions no longer match the artist's own image"""
+        if not self.image:
+            return bool(self.renditions)
+        # Compared with the loaded image, so a failed generation is not
+        # retried on every save; generate_thumbnails --artists backfills those
+        return self.has_changed('image')
+
     def get_spotify_embed_url(self):
         """Return the URL for embedding a Spotify player for this artist"""
         if self.spotify_id:
@@ -129,17 +215,21 @@ class Artist(models.Model):
 
     @property
     def get_image(self):
-        """Get the artist's image, falling back to an event image if none exists"""
+        """
+        Get the artist's image, falling back to an event image if none exists
+
+        Reads the precomputed display_image, or events prefetched along with
+        the artist, so it never queries or writes while a page renders.
+        """
+        if self.display_image:
+            return self.display_image
         if self.image:
             return self.image
-        
-        # Look for the first event with an image
-        event_with_image = self.events.exclude(image='').filter(image__isnull=False).first()
-        if event_with_image and event_with_image.image:
-            # Save the image for future use
-            self.save_event_image(event_with_image)
-            return self.image
-        
+
+        for event in getattr(self, '_prefetched_objects_cache', {}).get('events', ()):
+            if event.image:
+                return event.image
+
         return None
 
     def save_event_image(self, event):
@@ -148,13 +238,23 @@ class Artist(models.Model):
             return
 
         try:
+            if getattr(settings, 'CONTENT_ADDRESSED_IMAGES', False):
+                # Share the stored file instead of writing a copy per artist
+                self.image.name = event.image.name
+                self.save(update_fields=['image'])
+                return
+
             # Get the original filename and create a new filename for the artist
             original_name = os.path.basename(event.image.name)
             name, ext = os.path.splitext(original_name)
             artist_image_name = f"{slugify(self.name)}{ext}"
 
-            # Open the event image and save it to BytesIO
+            # Event images are stored as RGB JPEGs, so copy those without decoding
             img = Image.open(event.image)
+            if img.format == 'JPEG' and img.mode == 'RGB':
+                event.image.seek(0)
+                self.image.save(artist_image_name, ContentFile(event.image.read()), save=True)
+                return
             
             # Convert to RGB if needed
             if img.mode == 'RGBA' or img.mode == 'P':
@@ -182,9 +282,21 @@ class Artist(models.Model):
         
         # Skip Spotify update if specified
         skip_spotify = kwargs.pop('skip_spotify', False)
+
+        # Resize a new or changed image, like events do for their thumbnails
+        if self._image_changed():
+            self.generate_renditions()
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'renditions'}
         
         # First save to ensure we have an ID
         super().save(*args, **kwargs)
+
+        # An artist's own image always takes precedence over event images;
+        # set after saving, once the uploaded file has its final name
+        if self.image and self.display_image.name != self.image.name:
+            self.display_image = self.image.name
+            Artist.objects.filter(pk=self.pk).update(display_image=self.display_image.name)
         
         # Then look for event images if needed
         if not self.image:
@@ -197,11 +309,18 @@ class Artist(models.Model):
         
         # Fetch Spotify data for new artists or when forced
         if (is_new or not self.spotify_id) and not skip_spotify:
-            # Use a separate thread or task queue for production
-            # For simplicity, we'll call it directly here
-            self.fetch_spotify_data()
+            from .utils.spotify import is_known_miss
+            # Unmatched artists are searched again once their recheck is due
+            if is_known_miss(self):
+                return
+            if getattr(settings, 'SPOTIFY_ENRICHMENT_ASYNC', False) and apps.is_installed('django_q'):
+                # Imported here as it requires django_q to be installed
+                from .tasks import enqueue_artist_enrichment
+                enqueue_artist_enrichment([self.pk])
+            else:
+                self.fetch_spotify_data()
 
-class Venue(models.Model):
+class Venue(TrackedFieldsMixin, models.Model):
     name = models.CharField(max_length=200)
     address = models.CharField(max_length=300)
     city = models.CharField(max_length=100)
@@ -209,10 +328,51 @@ class Venue(models.Model):
     zip_code = models.CharField(max_length=20)
     website = models.URLField(max_length=1000, blank=True)
     capacity = models.PositiveIntegerField(null=True, blank=True)
+
+    # Fields compared against their loaded values when saving
+    TRACKED_FIELDS = ('name', 'city')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['name'], name='venue_name_idx'),
+        ]
     
     def __str__(self):
         return self.name
 
+class EventQuerySet(models.QuerySet):
+    # Event fields rendered by the event cards and event list groups
+    CARD_FIELDS = (
+        'id', 'title', 'slug', 'description', 'date', 'image', 'thumbnail', 'renditions', 'updated_at',
+        'venue__name', 'venue__city', 'venue__state',
+    )
+
+    def upcoming(self):
+        """Events from now on, soonest first"""
+        return self.filter(date__gte=timezone.now()).order_by('date')
+
+    def past(self):
+        """Events that already took place, most recent first"""
+        return self.filter(date__lt=timezone.now()).order_by('-date')
+
+    def touch(self):
+        """
+        Mark events as modified without saving them, e.g. when a linked artist
+        or venue changes, so caches keyed on updated_at are refreshed
+        """
+        return self.update(updated_at=timezone.now())
+
+    def cards(self):
+        """
+        Load only what listings render, with the venue joined and artist
+        names prefetched, so a page costs the same queries for any size
+        """
+        return (
+            self.select_related('venue')
+            .only(*self.CARD_FIELDS)
+            .prefetch_related(models.Prefetch('artists', queryset=Artist.objects.only('id', 'name')))
+        )
+
 class Event(models.Model):
     title = models.CharField(max_length=200)
     slug = models.SlugField(max_length=200, unique=False, blank=True, null=True)
@@ -225,9 +385,22 @@ class Event(models.Model):
     image = models.ImageField(upload_to='events/', blank=True, null=True)
     image_url = models.URLField(max_length=1000, blank=True, help_text="Original image URL from external source")
     thumbnail = models.ImageField(upload_to='events/thumbnails/', blank=True, null=True, help_text="Thumbnail version of the image")
+    renditions = models.JSONField(default=dict, blank=True, help_text="Responsive renditions of the image: group -> format -> [name, width] list")
     external_id = models.CharField(max_length=200, blank=True, null=True, help_text="ID from external API (e.g., Ticketmaster)")
+    source_hash = models.CharField(max_length=64, blank=True, default='', help_text="Fingerprint of the source data from the last sync")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    objects = EventQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Listings filter on date and order by it, per venue on venue pages
+            models.Index(fields=['date'], name='event_date_idx'),
+            models.Index(fields=['venue', 'date'], name='event_venue_date_idx'),
+            # Sync looks events up by their source id
+            models.Index(fields=['external_id'], name='event_external_id_idx'),
+        ]
     
     def __str__(self):
         return self.title
@@ -236,22 +409,47 @@ class Event(models.Model):
     def is_past(self):
         return self.date < timezone.now()
         
-    def generate_thumbnail(self, size=(300, 200), quality=85):
-        """Generate a thumbnail for the event image"""
+    def generate_thumbnail(self, size=(300, 200), quality=85, renditions=None):
+        """
+        Generate a thumbnail and the responsive renditions for the event image
+
+        Passing a subset of the rendition groups regenerates only those,
+        keeping the other groups already stored on the event.
+        """
         if not self.image:
             self.thumbnail = None
+            self.renditions = {}
             return
 
         try:
-            # Open the image
-            img = Image.open(self.image)
+            from .utils.renditions import generate_renditions, get_renditions
+            from .utils.thumbnails import open_scaled
 
-            # Convert to RGB if it's RGBA or P (palette) mode to remove alpha channel
-            if img.mode == 'RGBA' or img.mode == 'P':
-                img = img.convert('RGB')
-            elif img.mode != 'RGB':
-                # Handle other modes like L (grayscale) if necessary, or convert non-RGB to RGB
-                img = img.convert('RGB')
+            groups = get_renditions() if renditions is None else renditions
+            thumbnail_name = None
+            if getattr(settings, 'CONTENT_ADDRESSED_IMAGES', False):
+                from .utils.image_store import is_content_addressed, thumbnail_path
+                if is_content_addressed(self.image.name):
+                    # Events sharing an image share its thumbnail and renditions too
+                    thumbnail_name = thumbnail_path(self.image.name)
+                    shared = (
+                        Event.objects.filter(image=self.image.name)
+                        .exclude(renditions={})
+                        .values_list('renditions', flat=True)
+                        .first()
+                    )
+                    if self.thumbnail.storage.exists(thumbnail_name) and (shared or not groups):
+                        self.thumbnail.name = thumbnail_name
+                        self.renditions = shared or {}
+                        return
+
+            # Decode at the smallest scale covering the largest output, as RGB
+            boxes = [size] + [box for group in groups.values() for box in group]
+            img = open_scaled(self.image, (max(w for w, _ in boxes), max(h for _, h in boxes)))
+
+            # Responsive renditions are resized from the same decoded image
+            generated = generate_renditions(img, self.image.name, groups) if groups else {}
+            self.renditions = generated if renditions is None else {**self.renditions, **generated}
 
             # Create a thumbnail
             img.thumbnail(size, Image.LANCZOS)
@@ -262,6 +460,11 @@ class Event(models.Model):
             img.save(thumb_io, format='JPEG', quality=quality, optimize=True)
             thumb_io.seek(0)
 
+            if thumbnail_name:
+                # Store next to the source image under its content hash
+                self.thumbnail.name = self.thumbnail.storage.save(thumbnail_name, ContentFile(thumb_io.read()))
+                return
+
             # Get the original filename and create a new filename for the thumbnail
             original_name = os.path.basename(self.image.name)
             name, ext = os.path.splitext(original_name)
@@ -277,6 +480,7 @@ class Event(models.Model):
             logger = logging.getLogger(__name__)
             logger.error(f"Error generating thumbnail for event {self.title} (Image: {self.image.name}): {e}")
             self.thumbnail = None  # Ensure thumbnail field is cleared on error
+            self.renditions = {}
 
     def save(self, *args, **kwargs):
         """Override save to generate thumbnail if image exists"""
@@ -305,3 +509,22 @@ class Event(models.Model):
             self.generate_thumbnail()  # This will set self.thumbnail if successful
 
         super().save(*args, **kwargs)  # Save the instance with the potentially updated thumbnail field
+
+
+class ImageSource(models.Model):
+    """Index of downloaded image URLs and the content hash they resolved to"""
+    url = models.URLField(max_length=1000, unique=True)
+    sha256 = models.CharField(max_length=64, db_index=True, help_text="SHA-256 of the downloaded image bytes")
+    fetched_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.url
+
+
+class ContentVersion(models.Model):
+    """Single row counting changes to the public content, shared by every process"""
+    version = models.PositiveBigIntegerField(default=0)
+    changed_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"Content version {self.version}"
@@ -0,0 +1,138 @@
+"""
+Keyset (seek) pagination for the listing views.
+
+Pages are addressed by an opaque cursor holding the ordering values of the
+first or last row shown, so fetching any page is an indexed range scan of
+page size + 1 rows: no COUNT(*) and no OFFSET, however deep the page.
+"""
+import base64
+import json
+from django.conf import settings
+from django.db.models import Q
+from django.http import Http404
+
+
+def encode_cursor(values):
+    """Encode ordering values as an URL-safe cursor."""
+    values = [value.isoformat() if hasattr(value, 'isoformat') else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(values).encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor, fields):
+    """
+    Decode a cursor back into values of the ordering fields.
+
+    Args:
+        cursor (str): Cursor from encode_cursor
+        fields (list): Model fields the cursor values belong to
+
+    Returns:
+        list: The field values
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {e}")
+    if not isinstance(values, list) or len(values) != len(fields):
+        raise ValueError("Invalid cursor: wrong number of values")
+    try:
+        return [field.to_python(value) for field, value in zip(fields, values)]
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {e}")
+
+def _seek(names, values, after):
+    """
+    Build the filter for rows strictly after (or before) values in the
+    lexicographic order of names, e.g. date > d OR (date = d AND id > i).
+    """
+    lookup = 'gt' if after else 'lt'
+    condition = Q()
+    for i, name in enumerate(names):
+        term = Q(**{f"{name}__{lookup}": values[i]})
+        for prior, value in zip(names[:i], values[:i]):
+            term &= Q(**{prior: value})
+        condition |= term
+    return condition
+
+class CursorPage:
+    """A page of results and the cursors of its neighbours."""
+    is_cursor = True
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+class CursorPaginationMixin:
+    """
+    ListView mixin paginating by cursor instead of page number.
+
+    Set cursor_ordering to the ordering fields, ending with a unique one so
+    rows never tie. It is opt-in through the CURSOR_PAGINATION setting; when
+    disabled, the view keeps Django's numbered pages (with the same
+    ordering). Pages follow ?after=<cursor> or ?before=<cursor>.
+    """
+    cursor_ordering = ('id',)
+
+    def cursor_pagination_enabled(self):
+        return getattr(settings, 'CURSOR_PAGINATION', False)
+
+    def paginate_queryset(self, queryset, page_size):
+        queryset = queryset.order_by(*self.cursor_ordering)
+        if not self.cursor_pagination_enabled():
+            return super().paginate_queryset(queryset, page_size)
+
+        fields = [queryset.model._meta.get_field(name) for name in self.cursor_ordering]
+        after = self.request.GET.get('after')
+        before = self.request.GET.get('before')
+        try:
+            if before:
+                values = decode_cursor(before, fields)
+                queryset = queryset.filter(_seek(self.cursor_ordering, values, after=False))
+            elif after:
+                values = decode_cursor(after, fields)
+                queryset = queryset.filter(_seek(self.cursor_ordering, values, after=True))
+        except ValueError as e:
+            raise Http404(str(e))
+
+        if before:
+            # Walk backwards from the cursor and restore the display order
+            rows = list(queryset.reverse()[:page_size + 1])
+            more = len(rows) > page_size
+            rows = rows[:page_size][::-1]
+            has_previous, has_next = more, True
+        else:
+            rows = list(queryset[:page_size + 1])
+            more = len(rows) > page_size
+            rows = rows[:page_size]
+            has_previous, has_next = bool(after), more
+
+        def cursor(row):
+            return encode_cursor([getattr(row, field.attname) for field in fields])
+
+        page = CursorPage(
+            rows,
+            next_cursor=cursor(rows[-1]) if rows and has_next else None,
+            previous_cursor=cursor(rows[0]) if rows and has_previous else None,
+        )
+        return None, page, rows, page.has_other_pages()
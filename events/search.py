@@ -0,0 +1,204 @@
+"""
+Full-text search over events.
+
+Each event is indexed with its title, artist names, venue name and city, and
+description. The index lives in the database and is kept current by the
+model signals and the bulk sync:
+
+- PostgreSQL: an events_event.search_vector tsvector column with a GIN index
+- SQLite: an events_event_fts FTS5 table keyed by the event id
+
+Other backends fall back to icontains lookups.
+
+Both structures are created outside the Django models by migration 0010,
+which also fills them; rebuild_index() refills them from scratch.
+"""
+import logging
+import re
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+
+logger = logging.getLogger(__name__)
+
+EVENT_TABLE = 'events_event'
+VENUE_TABLE = 'events_venue'
+ARTIST_TABLE = 'events_artist'
+EVENT_ARTISTS_TABLE = 'events_event_artists'
+FTS_TABLE = 'events_event_fts'
+SEARCH_INDEX = 'event_search_idx'
+
+# Results returned for a query
+MAX_RESULTS = 50
+# Events (re)indexed per statement, below SQLite's bound parameter limit
+INDEX_CHUNK_SIZE = 500
+# Column weights: title and artists first, then the venue, then the description
+FTS_WEIGHTS = (10.0, 10.0, 4.0, 1.0)
+
+_ARTIST_NAMES = (
+    f"(SELECT {{concat}} FROM {ARTIST_TABLE} a "
+    f"JOIN {EVENT_ARTISTS_TABLE} ea ON ea.artist_id = a.id WHERE ea.event_id = e.id)"
+)
+
+
+def search_backend(conn=connection):
+    """Return 'postgresql' or 'sqlite' when the database has a search index, else None."""
+    return conn.vendor if conn.vendor in ('postgresql', 'sqlite') else None
+
+def _search_config():
+    # 'simple' does no stemming, as the events are in several languages
+    return getattr(settings, 'SEARCH_CONFIG', 'simple')
+
+def _chunks(ids):
+    ids = list(ids)
+    for start in range(0, len(ids), INDEX_CHUNK_SIZE):
+        yield ids[start:start + INDEX_CHUNK_SIZE]
+
+def create_index(conn=connection):
+    """Create the search structures for the database backend."""
+    backend = search_backend(conn)
+    with conn.cursor() as cursor:
+        if backend == 'postgresql':
+            cursor.execute(f"ALTER TABLE {EVENT_TABLE} ADD COLUMN IF NOT EXISTS search_vector tsvector")
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {SEARCH_INDEX} ON {EVENT_TABLE} USING gin (search_vector)"
+            )
+        elif backend == 'sqlite':
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+                f"USING fts5(title, artists, venue, description, tokenize='unicode61 remove_diacritics 2')"
+            )
+
+def drop_index(conn=connection):
+    """Remove the search structures."""
+    backend = search_backend(conn)
+    with conn.cursor() as cursor:
+        if backend == 'postgresql':
+            cursor.execute(f"DROP INDEX IF EXISTS {SEARCH_INDEX}")
+            cursor.execute(f"ALTER TABLE {EVENT_TABLE} DROP COLUMN IF EXISTS search_vector")
+        elif backend == 'sqlite':
+            cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+def index_events(event_ids, conn=connection):
+    """
+    Refresh the index entries of the given events.
+
+    Args:
+        event_ids (iterable): Primary keys of created or changed events
+    """
+    backend = search_backend(conn)
+    if not backend:
+        return
+
+    with conn.cursor() as cursor:
+        for chunk in _chunks(set(event_ids)):
+            placeholders = ', '.join(['%s'] * len(chunk))
+            if backend == 'postgresql':
+                config = _search_config()
+                artists = _ARTIST_NAMES.format(concat="string_agg(a.name, ' ')")
+                cursor.execute(
+                    f"UPDATE {EVENT_TABLE} e SET search_vector = "
+                    f"setweight(to_tsvector(%s::regconfig, coalesce(e.title, '')), 'A') || "
+                    f"setweight(to_tsvector(%s::regconfig, coalesce({artists}, '')), 'A') || "
+                    f"setweight(to_tsvector(%s::regconfig, v.name || ' ' || v.city), 'B') || "
+                    f"setweight(to_tsvector(%s::regconfig, coalesce(e.description, '')), 'C') "
+                    f"FROM {VENUE_TABLE} v WHERE v.id = e.venue_id AND e.id IN ({placeholders})",
+                    [config] * 4 + chunk,
+                )
+            else:
+                artists = _ARTIST_NAMES.format(concat="group_concat(a.name, ' ')")
+                cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", chunk)
+                cursor.execute(
+                    f"INSERT INTO {FTS_TABLE} (rowid, title, artists, venue, description) "
+                    f"SELECT e.id, e.title, coalesce({artists}, ''), v.name || ' ' || v.city, e.description "
+                    f"FROM {EVENT_TABLE} e JOIN {VENUE_TABLE} v ON v.id = e.venue_id "
+                    f"WHERE e.id IN ({placeholders})",
+                    chunk,
+                )
+
+def unindex_events(event_ids, conn=connection):
+    """Remove deleted events from the index."""
+    # The PostgreSQL vector is deleted with its row
+    if search_backend(conn) != 'sqlite':
+        return
+    with conn.cursor() as cursor:
+        for chunk in _chunks(set(event_ids)):
+            placeholders = ', '.join(['%s'] * len(chunk))
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", chunk)
+
+def rebuild_index(conn=connection):
+    """
+    Index every event from scratch.
+
+    Returns:
+        int: Number of events indexed
+    """
+    if not search_backend(conn):
+        return 0
+    with conn.cursor() as cursor:
+        cursor.execute(f"SELECT id FROM {EVENT_TABLE} ORDER BY id")
+        ids = [row[0] for row in cursor.fetchall()]
+        if search_backend(conn) == 'sqlite':
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+    index_events(ids, conn)
+    logger.info(f"Indexed {len(ids)} events for search")
+    return len(ids)
+
+def _terms(query):
+    """Split a user query into plain words, dropping any search syntax."""
+    return re.findall(r'\w+', query.lower())
+
+def search_event_ids(query, limit=MAX_RESULTS):
+    """
+    Find events matching every word of a query, as prefixes.
+
+    Args:
+        query (str): User search text
+        limit (int): Maximum number of results
+
+    Returns:
+        list: Event primary keys, best match first
+    """
+    terms = _terms(query)
+    if not terms:
+        return []
+
+    backend = search_backend()
+    if backend == 'postgresql':
+        sql = (
+            f"SELECT e.id FROM {EVENT_TABLE} e, to_tsquery(%s::regconfig, %s) q "
+            f"WHERE e.search_vector @@ q ORDER BY ts_rank(e.search_vector, q) DESC, e.date LIMIT %s"
+        )
+        params = [_search_config(), ' & '.join(f"{term}:*" for term in terms), limit]
+    elif backend == 'sqlite':
+        weights = ', '.join(str(weight) for weight in FTS_WEIGHTS)
+        sql = (
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s "
+            f"ORDER BY bm25({FTS_TABLE}, {weights}) LIMIT %s"
+        )
+        params = [' '.join(f'"{term}"*' for term in terms), limit]
+    else:
+        from events.models import Event
+        matches = Event.objects.all()
+        for term in terms:
+            matches = matches.filter(
+                Q(title__icontains=term) | Q(description__icontains=term) | Q(artists__name__icontains=term)
+                | Q(venue__name__icontains=term) | Q(venue__city__icontains=term)
+            )
+        return list(matches.order_by('date').values_list('pk', flat=True).distinct()[:limit])
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+def search_events(query, limit=MAX_RESULTS):
+    """
+    Search events, loaded for rendering as cards.
+
+    Returns:
+        list: Matching events, best match first
+    """
+    from events.models import Event
+    ids = search_event_ids(query, limit)
+    events = Event.objects.filter(pk__in=ids).cards().in_bulk()
+    return [events[pk] for pk in ids if pk in events]
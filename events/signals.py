@@ -0,0 +1,125 @@
+"""
+Signal handlers keeping denormalized data in step with model changes: the
+artists' display images, the events' updated_at used by the cached event
+cards, the search index, and the page cache content version.
+"""
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from . import search
+from .models import Artist, Event, Venue
+from .utils.page_cache import invalidate_pages
+
+# Event fields included in the search index
+SEARCH_FIELDS = {'title', 'description', 'venue'}
+
+# Artist and venue fields shown on the event cards or in the search index
+RELATED_EVENT_FIELDS = {Artist: ('name',), Venue: ('name', 'city')}
+
+
+def refresh_events(events):
+    """Touch and reindex events whose cards or search entries show changed data."""
+    event_ids = list(events.values_list('pk', flat=True))
+    if event_ids:
+        Event.objects.filter(pk__in=event_ids).touch()
+        search.index_events(event_ids)
+
+
+@receiver(m2m_changed, sender=Event.artists.through)
+def refresh_linked_artist_images(sender, instance, action, reverse, pk_set, **kwargs):
+    """Refresh artists added to or removed from an event."""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if reverse:
+        # Changed through artist.events, so the instance is the artist
+        Artist.objects.filter(pk=instance.pk).refresh_display_images()
+    elif pk_set:
+        Artist.objects.filter(pk__in=pk_set).refresh_display_images()
+
+@receiver(pre_delete, sender=Event)
+def remember_event_artists(sender, instance, **kwargs):
+    """Keep the artists of an event being deleted, whose links go without signals."""
+    instance._deleted_artist_ids = list(instance.artists.values_list('pk', flat=True))
+
+@receiver(post_delete, sender=Event)
+def refresh_artist_images_of_deleted_event(sender, instance, **kwargs):
+    """Refresh the artists that may have shown the deleted event's image."""
+    artist_ids = getattr(instance, '_deleted_artist_ids', [])
+    if artist_ids:
+        Artist.objects.filter(pk__in=artist_ids).refresh_display_images()
+
+@receiver(post_save, sender=Event)
+def refresh_event_artist_images(sender, instance, created, update_fields, **kwargs):
+    """Refresh the artists of an event whose image may have changed."""
+    # New events have no artists linked yet
+    if created or not instance.image:
+        return
+    if update_fields is not None and 'image' not in update_fields:
+        return
+
+    Artist.objects.filter(events=instance).refresh_display_images()
+
+@receiver(m2m_changed, sender=Event.artists.through)
+def refresh_relinked_events(sender, instance, action, reverse, pk_set, **kwargs):
+    """Refresh events whose line-up changed, as their cards and index list the artists."""
+    if not reverse:
+        # Adding already linked artists sends the signals with an empty pk_set
+        if action == 'post_clear' or (action in ('post_add', 'post_remove') and pk_set):
+            refresh_events(Event.objects.filter(pk=instance.pk))
+    elif action in ('post_add', 'post_remove') and pk_set:
+        refresh_events(Event.objects.filter(pk__in=pk_set))
+    elif action == 'pre_clear':
+        # The links are gone after the clear, so keep the events beforehand
+        instance._cleared_event_ids = list(instance.events.values_list('pk', flat=True))
+    elif action == 'post_clear':
+        refresh_events(Event.objects.filter(pk__in=getattr(instance, '_cleared_event_ids', [])))
+
+@receiver(post_save, sender=Artist)
+@receiver(post_save, sender=Venue)
+def refresh_related_events(sender, instance, created, update_fields, **kwargs):
+    """Refresh the events of an artist or venue whose name shown on their cards changed."""
+    if created:
+        return
+    fields = RELATED_EVENT_FIELDS[sender]
+    if update_fields is not None and not set(fields) & set(update_fields):
+        return
+    # Compared with the loaded values, which are remembered after this signal
+    if instance.has_changed(*fields):
+        refresh_events(instance.events.all())
+
+@receiver(pre_delete, sender=Artist)
+def remember_artist_events(sender, instance, **kwargs):
+    """Keep the events of an artist being deleted, whose links go without signals."""
+    instance._deleted_event_ids = list(instance.events.values_list('pk', flat=True))
+
+@receiver(post_delete, sender=Artist)
+def refresh_events_of_deleted_artist(sender, instance, **kwargs):
+    """Refresh the line-ups that lost a deleted artist."""
+    refresh_events(Event.objects.filter(pk__in=getattr(instance, '_deleted_event_ids', [])))
+
+@receiver(post_save, sender=Event)
+def index_event(sender, instance, update_fields, **kwargs):
+    """Reindex a saved event unless only unsearched fields were updated."""
+    if update_fields is None or SEARCH_FIELDS & set(update_fields):
+        search.index_events([instance.pk])
+
+@receiver(post_delete, sender=Event)
+def unindex_event(sender, instance, **kwargs):
+    """Drop a deleted event from the search index."""
+    search.unindex_events([instance.pk])
+
+@receiver(post_save, sender=Event)
+@receiver(post_save, sender=Artist)
+@receiver(post_save, sender=Venue)
+@receiver(post_delete, sender=Event)
+@receiver(post_delete, sender=Artist)
+@receiver(post_delete, sender=Venue)
+def invalidate_cached_pages(sender, **kwargs):
+    """Drop cached pages when public data changes, e.g. from the admin."""
+    invalidate_pages()
+
+@receiver(m2m_changed, sender=Event.artists.through)
+def invalidate_cached_pages_on_link(sender, action, **kwargs):
+    """Drop cached pages when event line-ups change."""
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        invalidate_pages()
@@ -1,7 +1,35 @@
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import timedelta
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.utils import timezone
 from django_q.models import Schedule
+from django_q.tasks import async_task, schedule
+from .models import Artist, Event
+from .utils import spotify
+from .utils.image_store import store_image_from_url
+from .utils.image_utils import fetch_image
 from .utils.riviera_sync import sync_riviera_events
 from .utils.ticketmaster import sync_events_for_city as sync_ticketmaster_events
 
+logger = logging.getLogger(__name__)
+
+# django-q cluster (see Q_CLUSTER['ALT_CLUSTERS']) processing image downloads
+IMAGE_CLUSTER = 'images'
+# Image URLs handled by a single task
+IMAGE_BATCH_SIZE = 20
+# Attempts per URL, retried after IMAGE_RETRY_DELAY, doubling each time
+IMAGE_MAX_ATTEMPTS = 4
+IMAGE_RETRY_DELAY = timedelta(minutes=5)
+# Artists enriched from Spotify by a single task, sharing one client
+SPOTIFY_BATCH_SIZE = 50
+
+# Artist ids collected by collect_artist_enrichment() in this thread
+_enrichment = threading.local()
+
 def schedule_daily_tasks():
     """
     Schedule daily tasks for syncing events from Riviera and Ticketmaster
@@ -35,4 +63,124 @@ def run_ticketmaster_sync(city):
     """
     Run the Ticketmaster sync task for a specific city
     """
-    sync_ticketmaster_events(city)
\ No newline at end of file
+    sync_ticketmaster_events(city)
+
+def enqueue_event_images(images):
+    """
+    Queue image ingestion tasks on the image cluster.
+
+    Args:
+        images (dict): image URL -> list of Event ids using it
+    """
+    urls = sorted(images)
+    for start in range(0, len(urls), IMAGE_BATCH_SIZE):
+        batch = {url: list(images[url]) for url in urls[start:start + IMAGE_BATCH_SIZE]}
+        async_task('events.tasks.ingest_event_images', batch, cluster=IMAGE_CLUSTER)
+
+def ingest_event_images(images, attempt=1):
+    """
+    Download each image once and attach it to every event that uses it.
+
+    Events whose image_url changed since the task was queued are skipped.
+    URLs that fail are scheduled again with exponential backoff until
+    IMAGE_MAX_ATTEMPTS is reached.
+
+    Args:
+        images (dict): image URL -> list of Event ids using it
+        attempt (int): Attempt number of this batch
+    """
+    content_addressed = getattr(settings, 'CONTENT_ADDRESSED_IMAGES', False)
+    failed = {}
+    for url, event_ids in images.items():
+        events = list(Event.objects.filter(pk__in=event_ids, image_url=url))
+        if not events:
+            continue
+
+        try:
+            if content_addressed:
+                stored_name = store_image_from_url(url)
+            else:
+                image_name, content = fetch_image(url)
+        except Exception as e:
+            logger.warning(f"Attempt {attempt} to download image {url} failed: {e}")
+            failed[url] = [event.pk for event in events]
+            continue
+
+        for event in events:
+            if content_addressed:
+                event.image.name = stored_name
+            else:
+                event.image.save(image_name, ContentFile(content), save=False)
+            event.generate_thumbnail()
+            event.save(skip_thumbnail=True, update_fields=['image', 'thumbnail', 'renditions', 'updated_at'])
+
+    if not failed:
+        return
+    if attempt >= IMAGE_MAX_ATTEMPTS:
+        logger.error(f"Giving up on {len(failed)} images after {attempt} attempts: {', '.join(failed)}")
+        return
+
+    schedule(
+        'events.tasks.ingest_event_images',
+        failed,
+        attempt=attempt + 1,
+        schedule_type=Schedule.ONCE,
+        next_run=timezone.now() + IMAGE_RETRY_DELAY * 2 ** (attempt - 1),
+        cluster=IMAGE_CLUSTER,
+    )
+
+def _queue_enrichment(artist_ids):
+    artist_ids = sorted(artist_ids)
+    for start in range(0, len(artist_ids), SPOTIFY_BATCH_SIZE):
+        async_task('events.tasks.enrich_artists', artist_ids[start:start + SPOTIFY_BATCH_SIZE])
+
+def enqueue_artist_enrichment(artist_ids):
+    """
+    Queue Spotify enrichment of artists once the current transaction commits.
+
+    Inside collect_artist_enrichment() the ids are gathered instead and
+    queued in batches when the block exits.
+
+    Args:
+        artist_ids (iterable): Artist primary keys
+    """
+    pending = getattr(_enrichment, 'pending', None)
+    if pending is not None:
+        pending.update(artist_ids)
+        return
+    artist_ids = set(artist_ids)
+    if artist_ids:
+        transaction.on_commit(lambda: _queue_enrichment(artist_ids))
+
+@contextmanager
+def collect_artist_enrichment():
+    """Batch the enrichment requests made in a block, e.g. by a sync run."""
+    if getattr(_enrichment, 'pending', None) is not None:
+        # Nested: the outer block queues everything
+        yield
+        return
+    _enrichment.pending = set()
+    try:
+        yield
+    finally:
+        artist_ids, _enrichment.pending = _enrichment.pending, None
+        enqueue_artist_enrichment(artist_ids)
+        if artist_ids:
+            logger.info(f"Queued Spotify enrichment for {len(artist_ids)} artists")
+
+def enrich_artists(artist_ids, force_update=False):
+    """
+    Enrich artists with Spotify data, reusing one client for the batch and
+    writing it with a single bulk_update.
+
+    Args:
+        artist_ids (list): Artist primary keys
+        force_update (bool): Refresh artists whose data is still fresh
+
+    Returns:
+        tuple: (matched, unmatched, skipped) counts
+    """
+    artists = Artist.objects.filter(pk__in=artist_ids).order_by('pk')
+    matched, unmatched, skipped = spotify.refresh_artists(artists, force_update=force_update)
+    logger.info(f"Spotify enrichment: {matched} matched, {unmatched} unmatched, {skipped} skipped")
+    return matched, unmatched, skipped
@@ -0,0 +1,47 @@
+from django import template
+from django.core.files.storage import default_storage
+from events.utils.renditions import FORMATS, srcset
+
+register = template.Library()
+
+
+def _picture(renditions, group, alt, sizes, css_class):
+    formats = renditions.get(group) or {}
+    jpeg = formats.get('jpeg') or []
+    sources = [
+        {'type': FORMATS[fmt][0], 'srcset': srcset(entries)}
+        for fmt, entries in formats.items()
+        if fmt != 'jpeg' and fmt in FORMATS and entries
+    ]
+    return {
+        'alt': alt,
+        'sources': sources,
+        'src': default_storage.url(jpeg[0][0]) if jpeg else '',
+        'srcset': srcset(jpeg),
+        'sizes': sizes,
+        'css_class': css_class,
+    }
+
+
+@register.inclusion_tag('events/includes/picture.html')
+def event_picture(event, group='card', sizes='100vw', css_class=''):
+    """
+    Render a <picture> element for an event's responsive renditions.
+
+    Modern formats are offered as <source> elements; the JPEG renditions back
+    the <img> for browsers without support for them.
+
+    Usage:
+        {% event_picture event 'card' sizes='(min-width: 768px) 33vw, 100vw' css_class='card-img-top' %}
+    """
+    return _picture(event.renditions, group, event.title, sizes, css_class)
+
+@register.inclusion_tag('events/includes/picture.html')
+def artist_picture(artist, group='card', sizes='100vw', css_class=''):
+    """
+    Render a <picture> element for the renditions of an artist's own image.
+
+    Usage:
+        {% artist_picture artist 'card' sizes='(min-width: 768px) 33vw, 100vw' css_class='card-img-top' %}
+    """
+    return _picture(artist.renditions, group, artist.name, sizes, css_class)
@@ -0,0 +1,106 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from events.models import Artist, Event, Venue
+import datetime
+import json
+
+class ApiTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.venue = Venue.objects.create(
+            name='Test Venue',
+            address='123 Test St',
+            city='Madrid',
+            state='Madrid',
+            zip_code='28001'
+        )
+        now = timezone.now()
+        cls.events = []
+        for i in range(3):
+            event = Event.objects.create(
+                title=f'Event {i}',
+                date=now + datetime.timedelta(days=i + 1),
+                venue=cls.venue,
+                ticket_price=10 * (i + 1)
+            )
+            event.artists.add(Artist.objects.create(name=f'Artist {i}'))
+            cls.events.append(event)
+        cls.past = Event.objects.create(title='Past Event', date=now - datetime.timedelta(days=1), venue=cls.venue)
+
+    def setUp(self):
+        cache.clear()
+
+    def _json(self, response):
+        content = b''.join(response.streaming_content) if response.streaming else response.content
+        return json.loads(content)
+
+    def test_event_list_streams_upcoming_events(self):
+        """Test that the event list streams upcoming events with their artists in two queries"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('api:event_list'))
+            data = self._json(response)
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual([event['title'] for event in data], ['Event 0', 'Event 1', 'Event 2'])
+        self.assertEqual(data[0]['artists'], [{'id': self.events[0].artists.get().pk, 'name': 'Artist 0'}])
+        self.assertEqual(data[0]['city'], 'Madrid')
+        # Plus the content version read for the ETag
+        self.assertEqual(len(queries), 3)
+
+    def test_event_list_filters(self):
+        """Test the scope, EventListView filters, limit and field selection"""
+        data = self._json(self.client.get(reverse('api:event_list'), {'scope': 'past'}))
+        self.assertEqual([event['title'] for event in data], ['Past Event'])
+
+        data = self._json(self.client.get(reverse('api:event_list'), {'max_price': '20', 'fields': 'title,ticket_price'}))
+        self.assertEqual(data, [{'title': 'Event 0', 'ticket_price': '10.00'}, {'title': 'Event 1', 'ticket_price': '20.00'}])
+
+        data = self._json(self.client.get(reverse('api:event_list'), {'scope': 'all', 'limit': '1', 'fields': 'id'}))
+        self.assertEqual(data, [{'id': self.past.pk}])
+
+    def test_invalid_parameters(self):
+        """Test that invalid parameters return 400 with an error message"""
+        for params in ({'fields': 'title,secret'}, {'scope': 'soon'}, {'limit': '-1'}, {'date_from': 'tomorrow'}):
+            response = self.client.get(reverse('api:event_list'), params)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertIn('error', response.json())
+
+    def test_details(self):
+        """Test the event, artist and venue details"""
+        event = self.events[0]
+        data = self.client.get(reverse('api:event_detail', args=[event.pk])).json()
+        self.assertEqual(data['title'], 'Event 0')
+        self.assertEqual(data['artists'][0]['name'], 'Artist 0')
+
+        artist = event.artists.get()
+        data = self.client.get(reverse('api:artist_detail', args=[artist.pk]), {'fields': 'name,image'}).json()
+        self.assertEqual(data, {'name': 'Artist 0', 'image': None})
+
+        data = self.client.get(reverse('api:venue_detail', args=[self.venue.pk])).json()
+        self.assertEqual(data['city'], 'Madrid')
+
+        response = self.client.get(reverse('api:venue_detail', args=[0]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_artist_and_venue_lists(self):
+        """Test the artist and venue lists"""
+        data = self._json(self.client.get(reverse('api:artist_list'), {'fields': 'name'}))
+        self.assertEqual(data, [{'name': 'Artist 0'}, {'name': 'Artist 1'}, {'name': 'Artist 2'}])
+        data = self._json(self.client.get(reverse('api:venue_list')))
+        self.assertEqual([venue['id'] for venue in data], [self.venue.pk])
+
+    def test_conditional_requests(self):
+        """Test that lists and event details carry an ETag"""
+        response = self.client.get(reverse('api:event_list'))
+        response = self.client.get(reverse('api:event_list'), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+        url = reverse('api:event_detail', args=[self.events[0].pk])
+        response = self.client.get(url)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
@@ -2,6 +2,7 @@
 import os
 from datetime import datetime
 from unittest.mock import patch, MagicMock
+import requests
 from bs4 import BeautifulSoup
 from django.test import TestCase
 from django.utils import timezone
@@ -170,8 +171,8 @@ class TestCafeBerlinSync(TestCase):
         result = _scrape_event_card(event_card, self.mock_headers)
         self.assertIsNone(result)
 
-    @patch('events.utils.cafeberlin_sync.requests.get')
-    def test_fetch_cafeberlin_events_success(self, mock_get):
+    @patch('events.utils.cafeberlin_sync.requests.Session')
+    def test_fetch_cafeberlin_events_success(self, mock_session):
         """Test successful events fetching."""
         # Mock main page response
         mock_main_response = MagicMock()
@@ -199,6 +200,7 @@ class TestCafeBerlinSync(TestCase):
         """
         mock_event_response.raise_for_status.return_value = None
         
+        mock_get = mock_session.return_value.get
         mock_get.side_effect = [mock_main_response] + [mock_event_response] * 2
         
         with patch('events.utils.cafeberlin_sync.timezone.now') as mock_now:
@@ -208,6 +210,63 @@ class TestCafeBerlinSync(TestCase):
         self.assertEqual(len(results), 2)
         self.assertEqual(results[0]['title'], 'Event 1')
         self.assertEqual(results[1]['title'], 'Event 2')
+        self.assertEqual(results[0]['description'], 'Test event description')
+        # The listing and both detail pages share one session
+        self.assertEqual(mock_session.call_count, 1)
+        self.assertEqual(mock_get.call_count, 3)
+
+    @patch('events.utils.cafeberlin_sync.requests.Session')
+    def test_fetch_cafeberlin_events_keeps_listing_order(self, mock_session):
+        """Test that detail results are matched to their cards in order."""
+        mock_main_response = MagicMock()
+        mock_main_response.text = "".join(
+            f"""
+            <a href="/event/{i}" class="event-card">
+                <div class="event-title">Event {i}</div>
+            </a>
+            """
+            for i in range(5)
+        )
+
+        def get(url, **kwargs):
+            if url.endswith('/es'):
+                return mock_main_response
+            response = MagicMock()
+            response.text = f"<div>Descripción del evento</div><div>Details for {url.rsplit('/', 1)[1]}</div>"
+            return response
+
+        mock_session.return_value.get.side_effect = get
+
+        results = fetch_cafeberlin_events(max_workers=3)
+
+        self.assertEqual(
+            [result['description'] for result in results],
+            [f'Details for {i}' for i in range(5)]
+        )
+
+    @patch('events.utils.cafeberlin_sync.requests.Session')
+    def test_failed_details_are_reported(self, mock_session):
+        """Test that a details page that cannot be fetched flags its event and fails the run."""
+        mock_main_response = MagicMock()
+        mock_main_response.text = """
+        <a href="/event/1" class="event-card">
+            <div class="event-title">Event 1</div>
+        </a>
+        """
+        mock_session.return_value.get.side_effect = [mock_main_response, requests.ConnectionError('down')]
+
+        with patch('events.utils.cafeberlin_sync.timezone.now') as mock_now:
+            mock_now.return_value = timezone.make_aware(datetime(2025, 1, 1))
+            results = fetch_cafeberlin_events()
+        self.assertTrue(results[0]['details_missing'])
+
+        with patch('events.utils.cafeberlin_sync.fetch_cafeberlin_events', return_value=results), \
+                patch.object(self.syncer, 'sync_records') as mock_sync_records:
+            created, updated, error = self.syncer.sync_events()
+
+        # Synced from the listing, without the flag, but reported as an error
+        self.assertNotIn('details_missing', next(iter(mock_sync_records.call_args.args[0]))['event'])
+        self.assertEqual(error, 1)
 
 
     @mock_download_image(color='green')
@@ -0,0 +1,108 @@
+"""Tests for the generate_thumbnails management command."""
+import json
+import os
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from PIL import Image
+from events.models import Artist, Event, Venue
+from events.utils.page_cache import get_content_version
+
+
+class GenerateThumbnailsCommandTests(TestCase):
+    """Test batch thumbnail generation."""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(
+            MEDIA_ROOT=self.media_root,
+            IMAGE_RENDITIONS={'card': [(300, 200)], 'detail': [(800, 600)]},
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.checkpoint = os.path.join(self.media_root, 'checkpoint.json')
+
+        venue = Venue.objects.create(
+            name='Test Venue',
+            address='123 Test St',
+            city='Test City',
+            state='TS',
+            zip_code='12345'
+        )
+        image_io = BytesIO()
+        Image.new('RGB', (1000, 800), 'red').save(image_io, format='JPEG')
+        self.events = [
+            Event.objects.create(
+                title=f'Event {i}',
+                date=timezone.now(),
+                venue=venue,
+                image=SimpleUploadedFile(f'poster{i}.jpg', image_io.getvalue())
+            )
+            for i in range(3)
+        ]
+        # Simulate a bulk import that stored images without thumbnails
+        Event.objects.update(thumbnail='', renditions={})
+
+    def call(self, *args):
+        out = StringIO()
+        call_command('generate_thumbnails', '--workers', '0', '--checkpoint', self.checkpoint, *args, stdout=out)
+        return out.getvalue()
+
+    def test_generates_missing_thumbnails(self):
+        """Test that thumbnails and renditions are written in bulk."""
+        updated_at = {event.pk: event.updated_at for event in Event.objects.all()}
+        version = get_content_version()
+        output = self.call()
+
+        self.assertIn('Success: 3', output)
+        for event in Event.objects.all():
+            self.assertTrue(event.thumbnail)
+            self.assertEqual(set(event.renditions), {'card', 'detail'})
+            # Cached cards and pages show the new images
+            self.assertGreater(event.updated_at, updated_at[event.pk])
+        self.assertGreater(get_content_version(), version)
+        self.assertFalse(os.path.exists(self.checkpoint))
+
+    def test_skips_complete_events_unless_forced(self):
+        """Test that only events missing images are processed without --force."""
+        self.call()
+
+        self.assertIn('Total: 0', self.call())
+        self.assertIn('Success: 3', self.call('--force'))
+
+    def test_sizes_limits_rendition_groups(self):
+        """Test that --sizes generates only the requested groups."""
+        self.call('--sizes', 'card')
+
+        self.assertEqual(set(Event.objects.get(pk=self.events[0].pk).renditions), {'card'})
+
+    def test_resumes_from_checkpoint(self):
+        """Test that a checkpoint from an interrupted run skips processed events."""
+        with open(self.checkpoint, 'w') as f:
+            json.dump({'run': {'force': False, 'sizes': ['card', 'detail']}, 'last_pk': self.events[0].pk}, f)
+
+        output = self.call()
+
+        self.assertIn(f'Resuming after event {self.events[0].pk}', output)
+        self.assertIn('Success: 2', output)
+        self.assertFalse(Event.objects.get(pk=self.events[0].pk).thumbnail)
+
+    @override_settings(ARTIST_IMAGE_RENDITIONS={'card': [(100, 100)]})
+    def test_artists(self):
+        """Test that --artists backfills renditions of artist images."""
+        image_io = BytesIO()
+        Image.new('RGB', (400, 400), 'blue').save(image_io, format='JPEG')
+        artist = Artist(name='Painted', image=SimpleUploadedFile('painted.jpg', image_io.getvalue()))
+        artist.save(skip_spotify=True)
+        Artist.objects.update(renditions={})
+        version = get_content_version()
+
+        self.assertIn('Success: 1', self.call('--artists'))
+        self.assertGreater(get_content_version(), version)
+        self.assertIn('card', Artist.objects.get(pk=artist.pk).renditions)
+        self.assertIn('Total: 0', self.call('--artists'))
@@ -0,0 +1,110 @@
+"""Tests for the conditional HTTP response cache."""
+import shutil
+import tempfile
+from unittest.mock import MagicMock, patch
+from django.test import TestCase
+from events.utils.http_cache import HTTPCache
+from events.utils.riviera_sync import RivieraEventSync
+
+
+def make_response(status_code=200, content=b'<html>listing</html>', headers=None):
+    """Create a mock requests.Response."""
+    response = MagicMock()
+    response.status_code = status_code
+    response.content = content
+    response.text = content.decode()
+    response.encoding = 'utf-8'
+    response.url = 'https://example.com/listing'
+    response.headers = headers or {}
+    response.raise_for_status.return_value = None
+    return response
+
+
+class HTTPCacheTests(TestCase):
+    """Test the conditional request cache."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = HTTPCache(self.directory)
+        self.session = MagicMock()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_sends_validators_and_serves_304_from_cache(self):
+        """Test that a stored ETag is revalidated and reused on 304."""
+        self.session.get.return_value = make_response(headers={
+            'ETag': '"v1"', 'Last-Modified': 'Wed, 01 Jan 2025 00:00:00 GMT'
+        })
+        first = self.cache.get('https://example.com/listing', session=self.session)
+        self.assertFalse(first.not_modified)
+        self.cache.commit()
+
+        self.session.get.return_value = make_response(status_code=304, content=b'')
+        second = self.cache.get('https://example.com/listing', session=self.session)
+
+        headers = self.session.get.call_args.kwargs['headers']
+        self.assertEqual(headers['If-None-Match'], '"v1"')
+        self.assertEqual(headers['If-Modified-Since'], 'Wed, 01 Jan 2025 00:00:00 GMT')
+        self.assertTrue(second.not_modified)
+        self.assertEqual(second.text, '<html>listing</html>')
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_responses_without_validators_are_not_stored(self):
+        """Test that responses without validators are always downloaded."""
+        self.session.get.return_value = make_response()
+        self.cache.get('https://example.com/listing', session=self.session)
+        self.cache.get('https://example.com/listing', session=self.session)
+
+        self.assertNotIn('If-None-Match', self.session.get.call_args.kwargs['headers'])
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, 2))
+
+    def test_uncommitted_responses_are_not_revalidated(self):
+        """Test that validators are only sent once the response was committed."""
+        self.session.get.return_value = make_response(headers={'ETag': '"v1"'})
+        self.cache.get('https://example.com/listing', session=self.session)
+        self.cache.get('https://example.com/listing', session=self.session)
+        self.assertNotIn('If-None-Match', self.session.get.call_args.kwargs['headers'])
+
+        self.cache.commit()
+        self.cache.get('https://example.com/listing', session=self.session)
+        self.assertEqual(self.session.get.call_args.kwargs['headers']['If-None-Match'], '"v1"')
+
+    def test_params_are_part_of_the_key(self):
+        """Test that different query parameters are cached separately."""
+        self.session.get.return_value = make_response(headers={'ETag': '"v1"'})
+        self.cache.get('https://example.com/listing', session=self.session, params={'page': 0})
+        self.cache.commit()
+        self.cache.get('https://example.com/listing', session=self.session, params={'page': 1})
+
+        self.assertNotIn('If-None-Match', self.session.get.call_args.kwargs['headers'])
+
+    @patch('events.utils.riviera_sync.fetch_riviera_events', return_value=None)
+    def test_sync_skipped_when_listing_not_modified(self, mock_fetch):
+        """Test that an unchanged listing skips the database work."""
+        with self.settings(HTTP_CACHE_DIR=self.directory):
+            syncer = RivieraEventSync()
+            with patch.object(syncer, 'sync_records') as mock_sync_records:
+                created, updated, error = syncer.sync_events()
+
+        mock_sync_records.assert_not_called()
+        self.assertIs(mock_fetch.call_args.kwargs['cache'], syncer.http_cache)
+        self.assertEqual((created, updated, error), (0, 0, None))
+
+    @patch('events.utils.riviera_sync.fetch_riviera_events', return_value=[{'title': 'Show'}])
+    def test_cache_committed_only_after_a_clean_sync(self, mock_fetch):
+        """Test that a sync with errors leaves the previous validators in place."""
+        with self.settings(HTTP_CACHE_DIR=self.directory):
+            syncer = RivieraEventSync()
+            with patch.object(syncer.http_cache, 'commit') as mock_commit:
+                def fail(records):
+                    list(records)
+                    syncer.error_count += 1
+                with patch.object(syncer, 'sync_records', side_effect=fail):
+                    syncer.sync_events()
+                mock_commit.assert_not_called()
+
+                syncer.error_count = 0
+                with patch.object(syncer, 'sync_records'):
+                    syncer.sync_events()
+                mock_commit.assert_called_once()
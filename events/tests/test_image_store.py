@@ -0,0 +1,120 @@
+"""Tests for the content-addressed image store."""
+import shutil
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from .decorators import create_fake_image_response
+from events.models import Artist, Event, ImageSource, Venue
+from events.utils.image_store import collect_garbage, content_path, store_image_from_url
+from events.utils.image_utils import download_and_save_image
+from events.utils.renditions import rendition_names
+
+
+class ImageStoreTests(TestCase):
+    """Test image dedupe and garbage collection."""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root, CONTENT_ADDRESSED_IMAGES=True)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.venue = Venue.objects.create(
+            name='Test Venue',
+            address='123 Test St',
+            city='Test City',
+            state='TS',
+            zip_code='12345'
+        )
+        self.response = create_fake_image_response(size=(40, 20))
+
+    def create_event(self, title, image_url):
+        return Event.objects.create(
+            title=title,
+            date=timezone.now(),
+            venue=self.venue,
+            image_url=image_url
+        )
+
+    def test_events_sharing_an_image_share_files(self):
+        """Test that a poster used by two events is downloaded and stored once."""
+        url = 'http://test.com/poster.jpg'
+        first = self.create_event('First', url)
+        second = self.create_event('Second', url)
+
+        with patch('events.utils.image_utils._download_image', return_value=self.response) as mock_download:
+            self.assertTrue(download_and_save_image(url, first))
+            self.assertTrue(download_and_save_image(url, second))
+
+        mock_download.assert_called_once_with(url)
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertTrue(first.image.name.startswith('images/'))
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertEqual(first.thumbnail.name, second.thumbnail.name)
+        self.assertEqual(first.renditions, second.renditions)
+        self.assertTrue(default_storage.exists(first.thumbnail.name))
+
+    def test_identical_bytes_from_different_urls_dedupe(self):
+        """Test that the same image served from two URLs is stored once."""
+        with patch('events.utils.image_utils._download_image', return_value=self.response):
+            first = store_image_from_url('http://a.test/poster.jpg')
+            second = store_image_from_url('http://b.test/poster.jpg')
+
+        self.assertEqual(first, second)
+        self.assertEqual(ImageSource.objects.count(), 2)
+
+    def test_garbage_collection_removes_unreferenced_images(self):
+        """Test that images no event references are deleted along with their index entries."""
+        url = 'http://test.com/poster.jpg'
+        event = self.create_event('Event', url)
+        with patch('events.utils.image_utils._download_image', return_value=self.response):
+            download_and_save_image(url, event)
+        event.refresh_from_db()
+        stored = {event.image.name, event.thumbnail.name} | rendition_names(event.renditions)
+        self.assertGreater(len(stored), 2)
+
+        self.assertEqual(collect_garbage(), [])
+
+        event.delete()
+        deleted = collect_garbage()
+
+        self.assertCountEqual(deleted, stored)
+        self.assertFalse(default_storage.exists(event.image.name))
+        self.assertFalse(ImageSource.objects.exists())
+
+    def test_artist_display_images_are_kept_and_refreshed(self):
+        """Test that an artist showing an event image keeps it until the event is deleted."""
+        url = 'http://test.com/poster.jpg'
+        event = self.create_event('Event', url)
+        with patch('events.utils.image_utils._download_image', return_value=self.response):
+            download_and_save_image(url, event)
+        artist = Artist.objects.create(name='Pictured', spotify_id='known')
+        event.artists.add(artist)
+        event.refresh_from_db()
+        self.assertEqual(Artist.objects.get().display_image.name, event.image.name)
+
+        # Referenced through display_image alone
+        Event.objects.filter(pk=event.pk).update(image='')
+        self.assertNotIn(event.image.name, collect_garbage(dry_run=True))
+
+        event.delete()
+        self.assertEqual(Artist.objects.get().display_image.name, '')
+        self.assertIn(event.image.name, collect_garbage())
+
+    def test_gc_images_dry_run_keeps_files(self):
+        """Test that the gc_images command only lists files with --dry-run."""
+        with patch('events.utils.image_utils._download_image', return_value=self.response):
+            name = store_image_from_url('http://test.com/orphan.jpg')
+
+        out = StringIO()
+        call_command('gc_images', '--dry-run', stdout=out)
+
+        self.assertIn(name, out.getvalue())
+        self.assertTrue(default_storage.exists(name))
+        self.assertEqual(name, content_path(ImageSource.objects.get().sha256))
@@ -1,8 +1,11 @@
-from django.test import TestCase
+from django.template import Context, Template
+from django.test import TestCase, override_settings
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.utils import timezone
 from events.models import Artist, Event, Venue
 import os
+import shutil
+import tempfile
 from PIL import Image
 from io import BytesIO
 
@@ -58,15 +61,36 @@ class ArtistImageTests(TestCase):
     def test_artist_without_image_uses_event_image(self):
         """Test that artist uses event image when no own image exists"""
         # Ensure artist has no image
+        self.artist.refresh_from_db()
         self.assertFalse(bool(self.artist.image))
         
-        # Get image (should get from event)
-        image = self.artist.get_image
+        # Get image (should get from event without queries or file writes)
+        with self.assertNumQueries(0):
+            image = self.artist.get_image
         
-        # Check that image was obtained from event and saved
+        # Check that the event image is used as is
         self.assertIsNotNone(image)
-        self.assertTrue(os.path.exists(self.artist.image.path))
-        self.assertTrue(self.artist.image.name.startswith('artists/'))
+        self.assertEqual(image.name, self.event.image.name)
+        self.assertFalse(bool(self.artist.image))
+
+    def test_artist_image_from_prefetched_events(self):
+        """Test that prefetched events provide the fallback without queries"""
+        Artist.objects.filter(pk=self.artist.pk).update(display_image='')
+        artist = Artist.objects.prefetch_related('events').get(pk=self.artist.pk)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(artist.get_image.name, self.event.image.name)
+
+    def test_display_image_follows_event_links(self):
+        """Test that linking and unlinking events updates the display image"""
+        artist = Artist.objects.create(name='Linked Artist')
+        self.event.artists.add(artist)
+        artist.refresh_from_db()
+        self.assertEqual(artist.display_image.name, self.event.image.name)
+
+        self.event.artists.remove(artist)
+        artist.refresh_from_db()
+        self.assertFalse(artist.display_image)
 
     def test_artist_without_image_or_event_images(self):
         """Test that None is returned when no images are available"""
@@ -120,4 +144,67 @@ class ArtistImageTests(TestCase):
                 os.remove(self.artist.image.path)
         if self.event.image:
             if os.path.exists(self.event.image.path):
-                os.remove(self.event.image.path)
\ No newline at end of file
+                os.remove(self.event.image.path)
+
+class EventRenditionTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(
+            MEDIA_ROOT=self.media_root,
+            IMAGE_RENDITIONS={'card': [(300, 200), (600, 400)]},
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.venue = Venue.objects.create(
+            name='Test Venue',
+            address='123 Test St',
+            city='Test City',
+            state='Test State',
+            zip_code='12345'
+        )
+
+    def _create_event(self, size):
+        image_io = BytesIO()
+        Image.new('RGB', size, 'green').save(image_io, format='PNG')
+        return Event.objects.create(
+            title='Test Event',
+            date=timezone.now(),
+            venue=self.venue,
+            image=SimpleUploadedFile('poster.png', image_io.getvalue())
+        )
+
+    def test_renditions_generated_for_each_size_and_format(self):
+        """Test that every configured size is stored in every available format"""
+        event = self._create_event((1200, 800))
+
+        card = event.renditions['card']
+        self.assertEqual(list(card)[-1], 'jpeg')
+        self.assertIn('webp', card)
+        for fmt, entries in card.items():
+            self.assertEqual([width for _, width in entries], [300, 600])
+            for name, width in entries:
+                with Image.open(os.path.join(self.media_root, name)) as img:
+                    self.assertEqual(img.format, fmt.upper())
+                    self.assertEqual(img.width, width)
+        self.assertTrue(event.thumbnail)
+
+    def test_small_source_not_upscaled(self):
+        """Test that sources smaller than a box produce a single rendition"""
+        event = self._create_event((250, 100))
+
+        self.assertEqual(event.renditions['card']['jpeg'][0][1], 250)
+        self.assertEqual(len(event.renditions['card']['jpeg']), 1)
+
+    def test_event_picture_tag_renders_srcset(self):
+        """Test that the template tag offers modern formats with a JPEG fallback"""
+        event = self._create_event((1200, 800))
+
+        html = Template(
+            "{% load event_images %}{% event_picture event 'card' sizes='33vw' %}"
+        ).render(Context({'event': event}))
+
+        self.assertIn('type="image/webp"', html)
+        self.assertIn('.card-600.jpg 600w', html)
+        self.assertIn('sizes="33vw"', html)
@@ -0,0 +1,212 @@
+from unittest.mock import patch
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone, translation
+from events.models import ContentVersion, Event, Venue
+from events.utils.page_cache import ETAG_PERIOD, bump_content_version, get_content_version
+from events.utils.sync_base import EventSyncBase
+import datetime
+
+@override_settings(PAGE_CACHE_TIMEOUT=60)
+class PageCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.venue = Venue.objects.create(
+            name='Test Venue',
+            address='123 Test St',
+            city='Test City',
+            state='Test State',
+            zip_code='12345'
+        )
+        cls.event = Event.objects.create(
+            title='Cached Event',
+            date=timezone.now() + datetime.timedelta(days=1),
+            venue=cls.venue
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def _get(self, url, **kwargs):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, **kwargs)
+        self.assertEqual(response.status_code, 200)
+        return response, len(queries)
+
+    def test_second_request_is_served_from_cache(self):
+        """Test that a repeated anonymous request only reads the content version"""
+        url = reverse('events:event_list')
+        first, first_queries = self._get(url)
+        second, second_queries = self._get(url)
+
+        self.assertGreater(first_queries, 0)
+        self.assertEqual(second_queries, 1)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['Content-Type'], first['Content-Type'])
+
+    def test_keys_differ_per_page_and_language(self):
+        """Test that other query strings and languages are rendered separately"""
+        with translation.override('en'):
+            url = reverse('events:event_list')
+        with translation.override('es'):
+            spanish_url = reverse('events:event_list')
+
+        english, _ = self._get(url)
+        _, queries = self._get(url, QUERY_STRING='page=1')
+        self.assertGreater(queries, 0)
+
+        spanish, queries = self._get(spanish_url)
+        self.assertGreater(queries, 0)
+        self.assertNotEqual(english.content, spanish.content)
+
+    def test_model_changes_invalidate_pages(self):
+        """Test that saving an event drops the cached pages"""
+        url = reverse('events:event_list')
+        self._get(url)
+        version = get_content_version()
+
+        self.event.title = 'Renamed Event'
+        self.event.save()
+
+        self.assertNotEqual(get_content_version(), version)
+        response, queries = self._get(url)
+        self.assertGreater(queries, 0)
+        self.assertContains(response, 'Renamed Event')
+
+    def test_bulk_sync_invalidates_pages(self):
+        """Test that bulk syncs, which bypass the model signals, bump the version"""
+        self._get(reverse('events:event_list'))
+        version = get_content_version()
+
+        sync = EventSyncBase('test', batch_size=10)
+        sync.sync_records([{
+            'event': {
+                'title': 'Synced Event',
+                'date': timezone.now() + datetime.timedelta(days=2),
+                'external_id': 'synced-1',
+            },
+            'venue': self.venue,
+        }])
+
+        self.assertGreater(get_content_version(), version)
+        response, _ = self._get(reverse('events:event_list'))
+        self.assertContains(response, 'Synced Event')
+
+    def test_bump_without_stored_version(self):
+        """Test that the first bump creates the version row"""
+        ContentVersion.objects.all().delete()
+        self.assertEqual(get_content_version(), 0)
+        bump_content_version()
+        self.assertEqual(get_content_version(), 1)
+
+    def test_version_is_shared_through_the_database(self):
+        """Test that the version does not depend on the (possibly per-process) cache"""
+        bump_content_version()
+        version = get_content_version()
+        cache.clear()
+        self.assertEqual(get_content_version(), version)
+
+    def test_authenticated_users_bypass_cache(self):
+        """Test that pages for logged-in users are neither served from nor stored in the cache"""
+        user = get_user_model().objects.create_user('staff', password='secret')
+        self.client.force_login(user)
+        url = reverse('events:event_list')
+        self._get(url)
+        _, queries = self._get(url)
+        self.assertGreater(queries, 0)
+
+        self.client.logout()
+        _, queries = self._get(url)
+        self.assertGreater(queries, 0)
+
+    @override_settings(PAGE_CACHE_TIMEOUT=0)
+    def test_zero_timeout_disables_cache(self):
+        """Test that PAGE_CACHE_TIMEOUT=0 renders every request"""
+        url = reverse('events:event_list')
+        self._get(url)
+        _, queries = self._get(url)
+        self.assertGreater(queries, 0)
+
+
+@override_settings(PAGE_CACHE_TIMEOUT=60)
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        venue = Venue.objects.create(
+            name='Test Venue',
+            address='123 Test St',
+            city='Test City',
+            state='Test State',
+            zip_code='12345'
+        )
+        cls.event = Event.objects.create(
+            title='Validated Event',
+            slug='validated-event',
+            date=timezone.now() + datetime.timedelta(days=1),
+            venue=venue
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_list_pages_revalidate_with_etag(self):
+        """Test that list pages answer 304 reading only the content version until it changes"""
+        url = reverse('events:event_list')
+        response = self.client.get(url)
+        etag = response['ETag']
+        self.assertIn('no-cache', response['Cache-Control'])
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(len(queries), 1)
+
+        self.event.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_etag_changes_with_time(self):
+        """Test that list ETags expire as time passes, since upcoming events become past ones"""
+        url = reverse('events:event_list')
+        etag = self.client.get(url)['ETag']
+
+        later = timezone.now() + datetime.timedelta(seconds=ETAG_PERIOD)
+        with patch('events.utils.page_cache.timezone.now', return_value=later):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_event_detail_revalidates_with_related_changes(self):
+        """Test that event pages answer 304 until data they show changes, even on another model"""
+        sync = EventSyncBase('test')
+        artist, _ = sync.create_or_update_artist({'name': 'Detail Artist', 'bio': 'Old bio'})
+        self.event.artists.add(artist)
+        url = reverse('events:event_detail', args=[self.event.pk, self.event.slug])
+        etag = self.client.get(url)['ETag']
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        # Neither change touches the event itself
+        sync.create_or_update_artist({'name': 'Detail Artist', 'bio': 'New bio'})
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, 'New bio')
+        etag = response['ETag']
+
+        venue = self.event.venue
+        venue.address = '456 New St'
+        venue.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, '456 New St')
+
+    def test_authenticated_users_get_no_validators(self):
+        """Test that pages rendered for logged-in users carry no validators"""
+        self.client.force_login(get_user_model().objects.create_user('staff', password='secret'))
+        response = self.client.get(reverse('events:event_list'))
+        self.assertFalse(response.has_header('ETag'))
+        self.assertFalse(response.has_header('Last-Modified'))
@@ -0,0 +1,111 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from events import search
+from events.models import Artist, Event, Venue
+from events.utils.sync_base import EventSyncBase
+import datetime
+
+class SearchIndexTests(TestCase):
+    def setUp(self):
+        self.venue = Venue.objects.create(
+            name='Sala Riviera',
+            address='Paseo Bajo de la Virgen del Puerto',
+            city='Madrid',
+            state='Madrid',
+            zip_code='28005'
+        )
+        self.artist = Artist.objects.create(name='Vetusta Morla')
+        self.event = Event.objects.create(
+            title='Summer Tour',
+            description='An evening of indie rock',
+            date=timezone.now() + datetime.timedelta(days=1),
+            venue=self.venue
+        )
+        self.event.artists.add(self.artist)
+
+    def test_matches_title_artists_venue_and_description(self):
+        """Test that every indexed field is searchable, by word prefix"""
+        for query in ('summer', 'vetusta morla', 'riviera', 'madrid', 'indie', 'VETU'):
+            self.assertEqual(search.search_event_ids(query), [self.event.pk], query)
+        self.assertEqual(search.search_event_ids('jazz'), [])
+
+    def test_title_matches_rank_first(self):
+        """Test that a title match outranks a description match"""
+        other = Event.objects.create(
+            title='Indie Night',
+            date=timezone.now() + datetime.timedelta(days=2),
+            venue=self.venue
+        )
+        self.assertEqual(search.search_event_ids('indie'), [other.pk, self.event.pk])
+
+    def test_changes_are_reindexed(self):
+        """Test that renames, line-up changes and deletions update the index"""
+        self.artist.name = 'Love of Lesbian'
+        self.artist.save()
+        self.assertEqual(search.search_event_ids('lesbian'), [self.event.pk])
+        self.assertEqual(search.search_event_ids('vetusta'), [])
+
+        self.event.artists.add(Artist.objects.create(name='Izal'))
+        self.assertEqual(search.search_event_ids('izal'), [self.event.pk])
+
+        Artist.objects.get(name='Izal').delete()
+        self.assertEqual(search.search_event_ids('izal'), [])
+
+        self.venue.city = 'Barcelona'
+        self.venue.save()
+        self.assertEqual(search.search_event_ids('barcelona'), [self.event.pk])
+
+        self.event.delete()
+        self.assertEqual(search.search_event_ids('summer'), [])
+
+    def test_bulk_sync_indexes_batch(self):
+        """Test that events written by the bulk sync are searchable"""
+        EventSyncBase('test', batch_size=10).sync_records([{
+            'event': {
+                'title': 'Synced Festival',
+                'date': timezone.now() + datetime.timedelta(days=3),
+                'external_id': 'synced-1',
+            },
+            'venue': self.venue,
+            'artists': [{'name': 'Rigoberta Bandini'}],
+        }])
+        event = Event.objects.get(external_id='synced-1')
+        self.assertEqual(search.search_event_ids('bandini festival'), [event.pk])
+
+    def test_search_syntax_is_ignored(self):
+        """Test that operators and quotes in queries are treated as plain words"""
+        self.assertEqual(search.search_event_ids('"summer" *tour- ('), [self.event.pk])
+        self.assertEqual(search.search_event_ids('***'), [])
+
+    def test_rebuild_index(self):
+        """Test that a rebuild indexes events written without signals"""
+        Event.objects.filter(pk=self.event.pk).update(title='Winter Tour')
+        self.assertEqual(search.search_event_ids('winter'), [])
+        self.assertEqual(search.rebuild_index(), 1)
+        self.assertEqual(search.search_event_ids('winter'), [self.event.pk])
+
+
+@override_settings(PAGE_CACHE_TIMEOUT=0)
+class SearchViewTests(TestCase):
+    def test_search_page(self):
+        """Test that the search page lists matching events as cards"""
+        venue = Venue.objects.create(
+            name='Test Venue',
+            address='123 Test St',
+            city='Test City',
+            state='Test State',
+            zip_code='12345'
+        )
+        Event.objects.create(title='Found Event', date=timezone.now(), venue=venue)
+        Event.objects.create(title='Other Event', date=timezone.now(), venue=venue)
+
+        response = self.client.get(reverse('events:search'), {'q': 'found'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([event.title for event in response.context['events']], ['Found Event'])
+        self.assertContains(response, 'Found Event')
+        self.assertNotContains(response, 'Other Event')
+
+        response = self.client.get(reverse('events:search'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['events'], [])
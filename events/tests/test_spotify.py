@@ -0,0 +1,356 @@
+"""Tests for the Spotify client and artist refresh."""
+import shutil
+import tempfile
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest.mock import MagicMock, patch
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+from spotipy.exceptions import SpotifyException
+from events.models import Artist
+from events.utils import spotify
+from events.utils.image_utils import ImageTooLarge, download_image_bytes
+from events.utils.rate_limit import CallMetrics, RateLimiter
+
+
+def spotify_artist(name, spotify_id):
+    """A Spotify API artist object."""
+    return {
+        'id': spotify_id,
+        'name': name,
+        'uri': f'spotify:artist:{spotify_id}',
+        'external_urls': {'spotify': f'https://open.spotify.com/artist/{spotify_id}'},
+        'popularity': 50,
+        'followers': {'total': 1000},
+        'images': [],
+    }
+
+
+class SpotifyRefreshTests(TestCase):
+    """Test the batched Spotify refresh."""
+
+    def setUp(self):
+        # bulk_create skips save(), which would look the artists up
+        Artist.objects.bulk_create([
+            Artist(name='Known One', spotify_id='id1'),
+            Artist(name='Known Two', spotify_id='id2'),
+            Artist(name='Gone', spotify_id='gone'),
+            Artist(name='New Artist'),
+            Artist(name='Fresh', spotify_id='id3', spotify_last_updated=timezone.now() - timedelta(days=1)),
+        ])
+        self.sp = MagicMock()
+        self.sp.artists.side_effect = lambda ids: {'artists': [
+            None if spotify_id == 'gone' else spotify_artist(f'Artist {spotify_id}', spotify_id)
+            for spotify_id in ids
+        ]}
+        self.sp.search.side_effect = lambda q, **kwargs: {'artists': {'items': [
+            spotify_artist(q.split(':', 1)[1], 'searched')
+        ]}}
+
+    def test_known_ids_are_fetched_in_one_request(self):
+        """Test that known ids share one request and only the other artists are searched."""
+        result = spotify.refresh_artists(Artist.objects.order_by('pk'), sp=self.sp)
+
+        self.assertEqual(result, (4, 0, 1))
+        self.sp.artists.assert_called_once_with(['id1', 'id2', 'gone'])
+        searched = sorted(call.kwargs['q'] for call in self.sp.search.call_args_list)
+        self.assertEqual(searched, ['artist:Gone', 'artist:New Artist'])
+
+        artist = Artist.objects.get(name='Known One')
+        self.assertEqual(artist.spotify_followers, 1000)
+        self.assertIsNotNone(artist.spotify_last_updated)
+        self.assertEqual(Artist.objects.get(name='New Artist').spotify_id, 'searched')
+
+    def test_batches_are_written_with_bulk_update(self):
+        """Test that a batch is written with one query, without saving each artist."""
+        with patch.object(Artist, 'save') as mock_save, \
+                patch.object(Artist.objects, 'bulk_update', wraps=Artist.objects.bulk_update) as mock_update:
+            spotify.refresh_artists(Artist.objects.order_by('pk'), force_update=True, sp=self.sp)
+
+        mock_save.assert_not_called()
+        mock_update.assert_called_once()
+        self.assertEqual(len(mock_update.call_args.args[0]), 5)
+
+    def test_ids_are_requested_in_batches(self):
+        """Test that no request asks for more ids than the endpoint accepts."""
+        Artist.objects.bulk_create([
+            Artist(name=f'Batch {i}', spotify_id=f'batch{i}') for i in range(spotify.ARTISTS_BATCH_SIZE + 1)
+        ])
+        spotify.refresh_artists(Artist.objects.filter(name__startswith='Batch'), sp=self.sp)
+
+        self.assertEqual(
+            [len(call.args[0]) for call in self.sp.artists.call_args_list],
+            [spotify.ARTISTS_BATCH_SIZE, 1]
+        )
+
+    def test_long_rate_limit_stops_the_run(self):
+        """Test that a long Retry-After stops the refresh instead of failing each artist."""
+        client = spotify.SpotifyClient(self.sp, MagicMock(spec=RateLimiter))
+        self.sp.artists.side_effect = rate_limited(3600)
+        with self.assertRaises(spotify.SpotifyRateLimited):
+            spotify.refresh_artists(Artist.objects.order_by('pk'), sp=client)
+        self.sp.search.assert_not_called()
+
+        self.sp.artists.side_effect = None
+        self.sp.search.side_effect = rate_limited(3600)
+        with self.assertRaises(spotify.SpotifyRateLimited):
+            spotify.refresh_artists(Artist.objects.filter(spotify_id__isnull=True), sp=client)
+        self.assertIsNone(Artist.objects.get(name='New Artist').spotify_checked_at)
+
+    @override_settings(SPOTIFY_CLIENT_ID='id', SPOTIFY_CLIENT_SECRET='secret')
+    def test_client_is_shared(self):
+        """Test that the connection, token cache and limiter are reused while the settings stay the same."""
+        client = spotify.spotify_client()
+        other = spotify.spotify_client()
+        self.assertIs(other.api, client.api)
+        self.assertIs(other.limiter, client.limiter)
+        self.assertIsNot(other.metrics, client.metrics)
+        with self.settings(SPOTIFY_CLIENT_SECRET='other'):
+            self.assertIsNot(spotify.spotify_client().api, client.api)
+
+
+class SpotifyMissTests(TestCase):
+    """Test that searches without a match are not repeated until their recheck is due."""
+
+    def setUp(self):
+        Artist.objects.bulk_create([Artist(name='Tributo a Nadie')])
+        self.artist = Artist.objects.get()
+        self.sp = MagicMock()
+        self.sp.search.return_value = {'artists': {'items': []}}
+
+    def test_miss_is_recorded_and_skipped(self):
+        """Test that a miss is stored and the artist is skipped until the interval passes."""
+        self.assertEqual(spotify.refresh_artists(Artist.objects.all(), sp=self.sp), (0, 1, 0))
+        self.artist.refresh_from_db()
+        self.assertEqual(self.artist.spotify_misses, 1)
+        self.assertIsNotNone(self.artist.spotify_checked_at)
+
+        self.assertEqual(spotify.refresh_artists(Artist.objects.all(), sp=self.sp), (0, 0, 1))
+        self.assertEqual(self.sp.search.call_count, 1)
+
+        # Retried when asked to, or once the recheck is due
+        spotify.refresh_artists(Artist.objects.all(), sp=self.sp, retry_misses=True)
+        Artist.objects.update(spotify_checked_at=timezone.now() - timedelta(days=3))
+        spotify.refresh_artists(Artist.objects.all(), sp=self.sp)
+        self.assertEqual(self.sp.search.call_count, 3)
+        self.assertEqual(Artist.objects.get().spotify_misses, 3)
+
+    def test_recheck_interval_doubles(self):
+        """Test the exponential recheck interval and its cap."""
+        self.assertEqual(spotify.miss_recheck_interval(1), timedelta(days=spotify.MISS_RECHECK_DAYS))
+        self.assertEqual(spotify.miss_recheck_interval(3), timedelta(days=spotify.MISS_RECHECK_DAYS * 4))
+        self.assertEqual(spotify.miss_recheck_interval(100), timedelta(days=spotify.MAX_MISS_RECHECK_DAYS))
+
+    def test_match_clears_misses(self):
+        """Test that a later match resets the miss count."""
+        Artist.objects.update(spotify_misses=2, spotify_checked_at=timezone.now() - timedelta(days=10))
+        self.sp.search.return_value = {'artists': {'items': [spotify_artist('Tributo a Nadie', 'found')]}}
+
+        self.assertTrue(Artist.objects.get().fetch_spotify_data(sp=self.sp))
+        artist = Artist.objects.get()
+        self.assertEqual(artist.spotify_id, 'found')
+        self.assertEqual(artist.spotify_misses, 0)
+
+    @patch('events.utils.spotify.spotify_client')
+    def test_save_skips_known_miss(self, mock_client):
+        """Test that saving an unmatched artist does not search again before the recheck."""
+        mock_client.return_value = self.sp
+        self.artist.save()
+        self.assertEqual(Artist.objects.get().spotify_misses, 1)
+
+        Artist.objects.get().save()
+        self.assertEqual(self.sp.search.call_count, 1)
+
+
+def rate_limited(retry_after):
+    return SpotifyException(429, -1, 'Too many requests', headers={'Retry-After': str(retry_after)})
+
+
+class SpotifyClientTests(SimpleTestCase):
+    """Test the rate limited client wrapper."""
+
+    def setUp(self):
+        self.api = MagicMock()
+        self.limiter = MagicMock(spec=RateLimiter)
+        self.client = spotify.SpotifyClient(self.api, self.limiter)
+
+    def test_retries_after_rate_limit(self):
+        """Test that a 429 pauses the shared limiter for Retry-After and the call is retried."""
+        self.api.artists.side_effect = [rate_limited(2), {'artists': []}]
+
+        self.assertEqual(self.client.artists(['id1']), {'artists': []})
+        self.limiter.pause.assert_called_once_with(2)
+        self.assertEqual(self.limiter.acquire.call_count, 2)
+        self.assertEqual((self.client.metrics.calls, self.client.metrics.throttles), (2, 1))
+        self.assertEqual(self.client.metrics.errors, 0)
+
+    def test_gives_up(self):
+        """Test that long Retry-After delays and repeated throttles are not waited for."""
+        self.api.search.side_effect = rate_limited(3600)
+        with self.assertRaises(spotify.SpotifyRateLimited) as raised:
+            self.client.search(q='artist:Someone')
+        self.assertEqual(raised.exception.retry_after, 3600)
+        self.assertEqual(self.api.search.call_count, 1)
+        # The shared limiter is not frozen for the long delay
+        self.limiter.pause.assert_not_called()
+
+        self.api.artists.side_effect = rate_limited(0)
+        with self.assertRaises(SpotifyException):
+            self.client.artists(['id1'])
+        self.assertEqual(self.api.artists.call_count, spotify.MAX_RETRIES + 1)
+
+    def test_rate_limit_without_retry_after_is_an_error(self):
+        """Test that a 429 without Retry-After, raised after server errors, does not throttle."""
+        self.api.search.side_effect = SpotifyException(429, -1, 'Max retries reached')
+        with self.assertRaises(SpotifyException):
+            self.client.search(q='artist:Someone')
+        self.assertEqual(self.api.search.call_count, 1)
+        self.limiter.pause.assert_not_called()
+        self.assertEqual((self.client.metrics.errors, self.client.metrics.throttles), (1, 0))
+
+    def test_other_errors_are_not_retried(self):
+        """Test that errors other than 429 are raised at once and counted."""
+        self.api.search.side_effect = SpotifyException(400, -1, 'Bad request')
+        with self.assertRaises(SpotifyException):
+            self.client.search(q='artist:Someone')
+        self.assertEqual(self.api.search.call_count, 1)
+        self.assertEqual((self.client.metrics.calls, self.client.metrics.errors), (1, 1))
+
+    def test_metrics(self):
+        """Test the latency percentiles and summary."""
+        metrics = CallMetrics()
+        self.assertIsNone(metrics.percentile(50))
+        for latency in range(1, 101):
+            metrics.record(latency / 1000)
+        metrics.record_throttle(1.5)
+        self.assertEqual(metrics.percentile(50), 0.05)
+        self.assertEqual(metrics.percentile(95), 0.095)
+        self.assertEqual(
+            str(metrics),
+            "100 calls, 0 errors, 1 throttled (1.5s waited), latency p50 50ms p95 95ms p99 99ms"
+        )
+
+
+class FetchSpotifyDataCommandTests(TestCase):
+    """Test the fetch_spotify_data command."""
+
+    @patch('events.utils.spotify.spotify_client')
+    def test_reports_metrics(self, mock_client):
+        """Test that the run's API metrics are printed."""
+        Artist.objects.bulk_create([Artist(name='Someone')])
+        api = MagicMock()
+        api.search.return_value = {'artists': {'items': [spotify_artist('Someone', 'id1')]}}
+        mock_client.return_value = spotify.SpotifyClient(api, RateLimiter(0))
+
+        out = StringIO()
+        call_command('fetch_spotify_data', stdout=out)
+
+        self.assertIn('1 successful, 0 failed, 0 skipped', out.getvalue())
+        self.assertIn('Spotify API: 1 calls, 0 errors, 0 throttled', out.getvalue())
+        self.assertEqual(Artist.objects.get().spotify_id, 'id1')
+
+
+def jpeg_bytes(size):
+    image_io = BytesIO()
+    Image.new('RGB', size, 'blue').save(image_io, format='JPEG')
+    return image_io.getvalue()
+
+def image_response(data, chunk_size=1024, headers=None):
+    response = MagicMock()
+    response.headers = headers or {}
+    response.iter_content.return_value = [data[i:i + chunk_size] for i in range(0, len(data), chunk_size)]
+    response.__enter__.return_value = response
+    return response
+
+
+@override_settings(
+    ARTIST_IMAGE_RENDITIONS={'card': [(100, 100), (200, 200)]},
+    IMAGE_RENDITION_FORMATS=['jpeg'],
+    PAGE_CACHE_TIMEOUT=0,
+)
+class ArtistImageTests(TestCase):
+    """Test the Spotify image download and the artist renditions."""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_pick_image(self):
+        """Test that the smallest image covering the display width is chosen."""
+        images = [
+            {'url': 'large', 'width': 640},
+            {'url': 'small', 'width': 160},
+            {'url': 'medium', 'width': 320},
+        ]
+        self.assertEqual(spotify.pick_image(images, 200)['url'], 'medium')
+        self.assertEqual(spotify.pick_image(images, 320)['url'], 'medium')
+        self.assertEqual(spotify.pick_image(images, 1000)['url'], 'large')
+        self.assertIsNone(spotify.pick_image([], 200))
+
+    @patch('events.utils.image_utils.requests.get')
+    def test_download_is_capped(self, mock_get):
+        """Test that downloads stop once they exceed the byte limit, with or without Content-Length."""
+        mock_get.return_value = image_response(b'x' * 5000)
+        with self.assertRaises(ImageTooLarge):
+            download_image_bytes('http://test.com/a.jpg', 4096)
+        mock_get.assert_called_once_with('http://test.com/a.jpg', stream=True, timeout=10)
+
+        mock_get.return_value = image_response(b'x' * 100, headers={'Content-Length': '5000'})
+        with self.assertRaises(ImageTooLarge):
+            download_image_bytes('http://test.com/a.jpg', 4096)
+
+        mock_get.return_value = image_response(b'x' * 3000)
+        self.assertEqual(len(download_image_bytes('http://test.com/a.jpg', 4096)), 3000)
+
+    def test_uploaded_image_gets_renditions(self):
+        """Test that saving an artist image generates its renditions, used by the artist list."""
+        artist = Artist(name='Uploaded', image=SimpleUploadedFile('uploaded.jpg', jpeg_bytes((400, 300))))
+        artist.save(skip_spotify=True)
+
+        artist.refresh_from_db()
+        self.assertEqual([width for _, width in artist.renditions['card']['jpeg']], [100, 200])
+        response = self.client.get(reverse('events:artist_list'))
+        self.assertContains(response, 'srcset=')
+        self.assertContains(response, artist.renditions['card']['jpeg'][0][0])
+
+        # Saving without changing the image neither queries it nor regenerates
+        with patch.object(Artist, 'generate_renditions') as mock_generate, \
+                self.assertNumQueries(2):
+            # The update and the content version bump
+            artist.bio = 'Updated'
+            artist.save(skip_spotify=True)
+        mock_generate.assert_not_called()
+
+        # Removing the image drops them
+        artist.image = None
+        artist.save(skip_spotify=True)
+        self.assertEqual(Artist.objects.get().renditions, {})
+
+    @patch('events.utils.image_utils.requests.get')
+    def test_refresh_downloads_renditioned_image(self, mock_get):
+        """Test that the batched refresh downloads the chosen image and stores its renditions."""
+        Artist.objects.bulk_create([Artist(name='Pictured')])
+        item = spotify_artist('Pictured', 'pic')
+        item['images'] = [
+            {'url': 'http://i.scdn.co/640', 'width': 640, 'height': 640},
+            {'url': 'http://i.scdn.co/320', 'width': 320, 'height': 320},
+            {'url': 'http://i.scdn.co/160', 'width': 160, 'height': 160},
+        ]
+        sp = MagicMock()
+        sp.search.return_value = {'artists': {'items': [item]}}
+        mock_get.return_value = image_response(jpeg_bytes((320, 320)))
+
+        self.assertEqual(spotify.refresh_artists(Artist.objects.all(), sp=sp), (1, 0, 0))
+
+        mock_get.assert_called_once_with('http://i.scdn.co/320', stream=True, timeout=10)
+        artist = Artist.objects.get()
+        self.assertTrue(artist.image)
+        self.assertEqual(artist.display_image.name, artist.image.name)
+        self.assertEqual([width for _, width in artist.renditions['card']['jpeg']], [100, 200])
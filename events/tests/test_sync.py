@@ -1,12 +1,16 @@
 """Tests for event synchronization functionality."""
-from django.test import TestCase
+import datetime
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 from .decorators import mock_download_image
 from events.utils.sync_base import EventSyncBase
-from events.utils.ticketmaster import TicketmasterEventSync
+from events.utils.ticketmaster import TicketmasterEventSync, iter_events_for_city
 from events.utils.riviera_sync import RivieraEventSync
 from events.models import Event, Venue, Artist
+from .test_spotify import spotify_artist
 
 class EventSyncBaseTests(TestCase):
     """Test the base event synchronization functionality."""
@@ -85,6 +89,50 @@ class EventSyncBaseTests(TestCase):
         self.assertEqual(event2.description, 'Updated description')
         self.assertEqual(self.sync.updated_count, 1)
 
+    @patch('events.utils.sync_base.download_and_save_image')
+    def test_unchanged_event_is_skipped(self, mock_download):
+        """Test that re-syncing identical data does not write the event."""
+        venue, _ = self.sync.create_or_update_venue(self.venue_data)
+        mock_download.return_value = True
+        event, _ = self.sync.create_or_update_event(self.event_data, venue)
+        updated_at = Event.objects.get(pk=event.pk).updated_at
+
+        with patch.object(Event, 'save') as mock_save:
+            event2, created = self.sync.create_or_update_event(dict(self.event_data), venue)
+
+        self.assertFalse(created)
+        self.assertEqual(event.id, event2.id)
+        mock_save.assert_not_called()
+        self.assertEqual(self.sync.unchanged_count, 1)
+        self.assertEqual(self.sync.updated_count, 0)
+        self.assertEqual(Event.objects.get(pk=event.pk).updated_at, updated_at)
+
+    @patch('events.utils.sync_base.download_and_save_image')
+    def test_stale_fingerprint_only_refreshes_hash(self, mock_download):
+        """Test that an event whose only difference is its stored fingerprint is not rewritten."""
+        venue, _ = self.sync.create_or_update_venue(self.venue_data)
+        mock_download.return_value = True
+        event, _ = self.sync.create_or_update_event(self.event_data, venue)
+        Event.objects.filter(pk=event.pk).update(source_hash='stale')
+        updated_at = Event.objects.get(pk=event.pk).updated_at
+
+        with patch.object(Event, 'save', autospec=True, side_effect=Event.save) as mock_save:
+            self.sync.create_or_update_event(dict(self.event_data), venue)
+
+        mock_save.assert_called_once()
+        self.assertEqual(mock_save.call_args.kwargs, {'update_fields': ['source_hash']})
+        self.assertEqual((self.sync.updated_count, self.sync.unchanged_count), (0, 1))
+        event.refresh_from_db()
+        self.assertEqual(event.source_hash, EventSyncBase.fingerprint(self.event_data))
+        self.assertEqual(event.updated_at, updated_at)
+
+    def test_fingerprint_normalizes_price(self):
+        """Test that equivalent prices produce the same fingerprint."""
+        other = dict(self.event_data, ticket_price='25.00')
+        self.assertEqual(EventSyncBase.fingerprint(self.event_data), EventSyncBase.fingerprint(other))
+        other['title'] = 'Another Event'
+        self.assertNotEqual(EventSyncBase.fingerprint(self.event_data), EventSyncBase.fingerprint(other))
+
     def test_create_artist(self):
         """Test artist creation."""
         artist_data = {
@@ -115,6 +163,144 @@ class EventSyncBaseTests(TestCase):
         self.assertEqual(artist.id, artist2.id)
         self.assertEqual(artist2.bio, 'Updated bio')
 
+    @patch('events.utils.sync_base.download_and_save_image')
+    def test_resync_unchanged_keeps_events(self, mock_download):
+        """Test that re-syncing unchanged venues and artists leaves their events untouched."""
+        mock_download.return_value = True
+        artist_data = {'name': 'Test Artist', 'bio': 'Test Bio'}
+        record = {'venue': self.venue_data, 'event': self.event_data, 'artists': [artist_data]}
+        event = self.sync._sync_record(record)
+        updated_at = Event.objects.get(pk=event.pk).updated_at
+
+        with patch.object(Venue, 'save') as venue_save, patch.object(Artist, 'save') as artist_save:
+            self.sync._sync_record({**record, 'venue': dict(self.venue_data), 'artists': [dict(artist_data)]})
+        venue_save.assert_not_called()
+        artist_save.assert_not_called()
+
+        # A change outside the cards leaves the events alone, a new name refreshes them
+        self.sync.create_or_update_venue(dict(self.venue_data, address='456 New St'))
+        self.assertEqual(Event.objects.get(pk=event.pk).updated_at, updated_at)
+        self.sync.create_or_update_artist({'name': 'Test Artist', 'bio': 'Updated bio'})
+        self.assertEqual(Event.objects.get(pk=event.pk).updated_at, updated_at)
+        artist = Artist.objects.get(name='Test Artist')
+        artist.name = 'Renamed Artist'
+        artist.save(skip_spotify=True)
+        self.assertGreater(Event.objects.get(pk=event.pk).updated_at, updated_at)
+
+
+class BulkSyncTests(TestCase):
+    """Test the batched upsert pipeline."""
+
+    def setUp(self):
+        self.sync = EventSyncBase('test', batch_size=50)
+        self.venue_data = {
+            'name': 'Bulk Venue',
+            'address': '1 Bulk St',
+            'city': 'Test City',
+            'state': 'TS',
+            'zip_code': '12345',
+            'website': 'http://bulk.venue'
+        }
+
+    def _records(self, count, description='Description'):
+        now = timezone.now()
+        return [
+            {
+                'event': {
+                    'title': f'Bulk Event {i}',
+                    'date': now + datetime.timedelta(days=i),
+                    'description': description,
+                    'ticket_url': 'http://test.tickets',
+                    'ticket_price': 15.3,
+                    'external_id': f'bulk-{i}',
+                },
+                'venue': self.venue_data,
+                'artists': [{'name': f'Bulk Artist {i}', 'bio': 'Bio'}, {'name': 'Headliner', 'bio': 'Bio'}],
+            }
+            for i in range(count)
+        ]
+
+    def test_bulk_create(self):
+        """Test that a batch creates events, venues, artists and links."""
+        self.sync.sync_records(self._records(3))
+
+        self.assertEqual(self.sync.created_count, 3)
+        self.assertEqual(self.sync.updated_count, 0)
+        self.assertEqual(self.sync.error_count, 0)
+        self.assertEqual(Venue.objects.filter(name='Bulk Venue').count(), 1)
+        event = Event.objects.get(external_id='bulk-1')
+        self.assertEqual(event.slug, 'bulk-event-1')
+        self.assertEqual(
+            sorted(event.artists.values_list('name', flat=True)),
+            ['Bulk Artist 1', 'Headliner']
+        )
+        self.assertEqual(Artist.objects.get(name='Headliner').events.count(), 3)
+
+    def test_bulk_update(self):
+        """Test that a second batch updates existing rows in place."""
+        self.sync.sync_records(self._records(3))
+        self.venue_data['address'] = '2 Bulk St'
+
+        sync = EventSyncBase('test', batch_size=50)
+        sync.sync_records(self._records(3, description='Updated'))
+
+        self.assertEqual(sync.created_count, 0)
+        self.assertEqual(sync.updated_count, 3)
+        self.assertEqual(sync.unchanged_count, 0)
+        self.assertEqual(Event.objects.count(), 3)
+        self.assertEqual(Event.objects.get(external_id='bulk-2').description, 'Updated')
+        self.assertEqual(Venue.objects.get(name='Bulk Venue').address, '2 Bulk St')
+        self.assertEqual(Event.artists.through.objects.count(), 6)
+
+    def test_bulk_skips_unchanged_events(self):
+        """Test that a batch with identical data writes no events."""
+        records = self._records(3)
+        self.sync.sync_records(records)
+        updated_at = Event.objects.get(external_id='bulk-0').updated_at
+
+        sync = EventSyncBase('test', batch_size=50)
+        sync.sync_records(records)
+
+        self.assertEqual(sync.updated_count, 0)
+        self.assertEqual(sync.unchanged_count, 3)
+        self.assertEqual(Event.objects.get(external_id='bulk-0').updated_at, updated_at)
+
+    def test_bulk_query_count_independent_of_batch_size(self):
+        """Test that the number of queries does not grow with the batch."""
+        Venue.objects.create(**self.venue_data)
+        with CaptureQueriesContext(connection) as small:
+            EventSyncBase('test', batch_size=50).sync_records(self._records(2))
+        Event.objects.all().delete()
+        Artist.objects.all().delete()
+        with CaptureQueriesContext(connection) as large:
+            EventSyncBase('test', batch_size=50).sync_records(self._records(20))
+
+        self.assertEqual(len(small), len(large))
+
+    @override_settings(SPOTIFY_ENRICHMENT_ASYNC=False)
+    @patch('events.utils.spotify.spotify_client')
+    def test_bulk_created_artists_are_looked_up(self, mock_client):
+        """Test that artists bulk created without save() are looked up without the task queue."""
+        sp = MagicMock()
+        sp.search.side_effect = lambda q, **kwargs: {'artists': {'items': [
+            spotify_artist(q.split(':', 1)[1], 'found')
+        ]}}
+        mock_client.return_value = sp
+
+        EventSyncBase('test', batch_size=50).sync_records(self._records(2))
+
+        self.assertEqual(sp.search.call_count, 3)
+        self.assertEqual(set(Artist.objects.values_list('spotify_id', flat=True)), {'found'})
+
+    def test_bulk_skips_incomplete_records(self):
+        """Test that records missing required data are skipped."""
+        records = self._records(2)
+        del records[0]['event']['external_id']
+        self.sync.sync_records(records)
+
+        self.assertEqual(self.sync.created_count, 1)
+        self.assertFalse(Event.objects.filter(title='Bulk Event 0').exists())
+
 
 class TicketmasterSyncTests(TestCase):
     """Test the Ticketmaster event synchronization."""
@@ -217,6 +403,56 @@ class TicketmasterSyncTests(TestCase):
         artist = Artist.objects.get(name='Test Artist')
         self.assertTrue(artist in event.artists.all())
 
+    @patch('events.utils.ticketmaster.fetch_events_for_city')
+    def test_sync_events_api_error(self, mock_fetch):
+        """Test that an API error on the first page is reported."""
+        mock_fetch.return_value = {'error': 'Unauthorized'}
+
+        created, updated, error = self.sync.sync_events()
+
+        self.assertEqual((created, updated, error), (0, 0, 'Unauthorized'))
+
+
+class TicketmasterPaginationTests(TestCase):
+    """Test the paginated Ticketmaster fetcher."""
+
+    def _page(self, page, total_pages, total_elements, prefix='tm'):
+        return {
+            '_embedded': {'events': [{'id': f'{prefix}-{page}'}]},
+            'page': {'number': page, 'totalPages': total_pages, 'totalElements': total_elements},
+        }
+
+    @patch('events.utils.ticketmaster.fetch_events_for_city')
+    def test_follows_all_pages(self, mock_fetch):
+        """Test that every page of the result set is fetched."""
+        mock_fetch.side_effect = lambda *args, page=0, **kwargs: self._page(page, 4, 4)
+
+        events = list(iter_events_for_city('Madrid', api_key='key', requests_per_second=0))
+
+        self.assertEqual(sorted(event['id'] for event in events), ['tm-0', 'tm-1', 'tm-2', 'tm-3'])
+        self.assertEqual(mock_fetch.call_count, 4)
+
+    @patch('events.utils.ticketmaster.fetch_events_for_city')
+    def test_splits_date_range_beyond_paging_cap(self, mock_fetch):
+        """Test that ranges over the deep paging cap are split in half."""
+        start = timezone.now()
+        end = start + datetime.timedelta(days=10)
+
+        def fetch(*args, page=0, start_date=None, end_date=None, **kwargs):
+            # The full range is too big, each half fits in one page
+            if end_date - start_date > datetime.timedelta(days=5):
+                return self._page(page, 10, 2000)
+            return self._page(page, 1, 1, prefix=start_date.isoformat())
+
+        mock_fetch.side_effect = fetch
+
+        events = list(iter_events_for_city('Madrid', api_key='key', start_date=start,
+                                           end_date=end, requests_per_second=0))
+
+        middle = start + datetime.timedelta(days=5)
+        self.assertEqual([event['id'] for event in events],
+                         [f'{start.isoformat()}-0', f'{middle.isoformat()}-0'])
+
 
 class RivieraSyncTests(TestCase):
     """Test the Riviera event synchronization."""
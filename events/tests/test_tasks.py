@@ -0,0 +1,192 @@
+"""Tests for background tasks."""
+from unittest.mock import MagicMock, patch
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from .decorators import mock_download_image
+from events.models import Artist, Event, Venue
+from events.tasks import (
+    IMAGE_CLUSTER, IMAGE_MAX_ATTEMPTS, SPOTIFY_BATCH_SIZE, enqueue_event_images, enrich_artists, ingest_event_images,
+)
+from events.utils.image_utils import fetch_image
+from events.utils.sync_base import EventSyncBase
+from .test_spotify import spotify_artist
+
+
+class ImageIngestionTests(TestCase):
+    """Test the queued image ingestion."""
+
+    def setUp(self):
+        self.venue = Venue.objects.create(
+            name='Test Venue',
+            address='123 Test St',
+            city='Test City',
+            state='TS',
+            zip_code='12345'
+        )
+        self.url = 'http://test.com/poster.jpg'
+        self.events = [
+            Event.objects.create(
+                title=f'Event {i}',
+                date=timezone.now(),
+                venue=self.venue,
+                image_url=self.url,
+                external_id=f'queue-{i}'
+            )
+            for i in range(2)
+        ]
+
+    @override_settings(EVENT_IMAGES_ASYNC=True)
+    @patch('events.utils.sync_base.download_and_save_image')
+    @patch('events.tasks.async_task')
+    def test_sync_queues_images_by_url(self, mock_async_task, mock_download):
+        """Test that sync records images instead of downloading them."""
+        sync = EventSyncBase('test')
+        sync.sync_records(
+            {
+                'event': {
+                    'title': f'Synced {i}',
+                    'date': timezone.now(),
+                    'external_id': f'synced-{i}',
+                    'image_url': self.url,
+                },
+                'venue': self.venue,
+            }
+            for i in range(3)
+        )
+
+        mock_download.assert_not_called()
+        mock_async_task.assert_called_once()
+        args, kwargs = mock_async_task.call_args
+        self.assertEqual(args[0], 'events.tasks.ingest_event_images')
+        self.assertEqual(list(args[1]), [self.url])
+        self.assertEqual(len(args[1][self.url]), 3)
+        self.assertEqual(kwargs['cluster'], IMAGE_CLUSTER)
+
+    @patch('events.tasks.async_task')
+    def test_enqueue_batches_urls(self, mock_async_task):
+        """Test that URLs are split into batches."""
+        enqueue_event_images({f'http://test.com/{i}.jpg': [i] for i in range(45)})
+        self.assertEqual(mock_async_task.call_count, 3)
+
+    @mock_download_image(size=(400, 300))
+    def test_ingest_downloads_each_url_once(self):
+        """Test that one download is shared by every event using the URL."""
+        with patch('events.tasks.fetch_image', wraps=fetch_image) as mock_fetch:
+            ingest_event_images({self.url: [event.pk for event in self.events]})
+
+        mock_fetch.assert_called_once_with(self.url)
+        for event in self.events:
+            event.refresh_from_db()
+            self.assertTrue(event.image)
+            self.assertTrue(event.thumbnail)
+
+    @patch('events.tasks.schedule')
+    @patch('events.tasks.fetch_image', side_effect=IOError('broken'))
+    def test_ingest_retries_with_backoff(self, mock_fetch, mock_schedule):
+        """Test that failed URLs are scheduled again until the last attempt."""
+        ingest_event_images({self.url: [self.events[0].pk]})
+
+        mock_schedule.assert_called_once()
+        self.assertEqual(mock_schedule.call_args.kwargs['attempt'], 2)
+
+        mock_schedule.reset_mock()
+        ingest_event_images({self.url: [self.events[0].pk]}, attempt=IMAGE_MAX_ATTEMPTS)
+        mock_schedule.assert_not_called()
+
+
+@override_settings(SPOTIFY_ENRICHMENT_ASYNC=True)
+class SpotifyEnrichmentTests(TestCase):
+    """Test the queued Spotify enrichment."""
+
+    def setUp(self):
+        self.venue = Venue.objects.create(
+            name='Test Venue',
+            address='123 Test St',
+            city='Test City',
+            state='TS',
+            zip_code='12345'
+        )
+
+    def _queued_ids(self, mock_async_task):
+        return [
+            artist_id
+            for call in mock_async_task.call_args_list
+            if call.args[0] == 'events.tasks.enrich_artists'
+            for artist_id in call.args[1]
+        ]
+
+    @patch('events.utils.spotify.spotify_client')
+    @patch('events.tasks.async_task')
+    def test_save_queues_instead_of_searching(self, mock_async_task, mock_client):
+        """Test that saving a new artist queues it once the transaction commits."""
+        with self.captureOnCommitCallbacks(execute=True):
+            artist = Artist.objects.create(name='Queued Artist')
+
+        mock_client.assert_not_called()
+        self.assertEqual(self._queued_ids(mock_async_task), [artist.pk])
+
+    @patch('events.utils.spotify.spotify_client')
+    @patch('events.tasks.async_task')
+    def test_sync_queues_artists_in_batches(self, mock_async_task, mock_client):
+        """Test that per-row and bulk syncs queue their artists after the run."""
+        records = [
+            {
+                'event': {'title': f'Event {i}', 'date': timezone.now(), 'external_id': f'enrich-{i}'},
+                'venue': self.venue,
+                'artists': [{'name': f'Artist {i}'}],
+            }
+            for i in range(3)
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            EventSyncBase('test').sync_records(records[:2])
+        with self.captureOnCommitCallbacks(execute=True):
+            EventSyncBase('test', batch_size=10).sync_records(records[2:])
+
+        mock_client.assert_not_called()
+        self.assertEqual(mock_async_task.call_count, 2)
+        self.assertEqual(
+            sorted(self._queued_ids(mock_async_task)),
+            sorted(Artist.objects.values_list('pk', flat=True))
+        )
+
+    @patch('events.utils.spotify.spotify_client')
+    @patch('events.tasks.async_task')
+    def test_bulk_sync_queues_only_created_artists(self, mock_async_task, mock_client):
+        """Test that a bulk sync does not queue artists it did not create."""
+        Artist.objects.bulk_create([Artist(name='Existing')])
+        records = [{
+            'event': {'title': 'Event', 'date': timezone.now(), 'external_id': 'created-only'},
+            'venue': self.venue,
+            'artists': [{'name': 'Existing'}, {'name': 'Newcomer'}],
+        }]
+        with self.captureOnCommitCallbacks(execute=True):
+            EventSyncBase('test', batch_size=10).sync_records(records)
+
+        self.assertEqual(self._queued_ids(mock_async_task), [Artist.objects.get(name='Newcomer').pk])
+
+    @patch('events.tasks.async_task')
+    def test_enqueue_batches_artists(self, mock_async_task):
+        """Test that large enrichment requests are split into batches."""
+        from events.tasks import enqueue_artist_enrichment
+        with self.captureOnCommitCallbacks(execute=True):
+            enqueue_artist_enrichment(range(1, SPOTIFY_BATCH_SIZE + 2))
+        self.assertEqual(mock_async_task.call_count, 2)
+
+    @patch('events.utils.spotify.spotify_client')
+    def test_enrich_artists_shares_one_client(self, mock_client):
+        """Test that a batch is enriched with a single client and unmatched artists are counted."""
+        with self.settings(SPOTIFY_ENRICHMENT_ASYNC=False):
+            artists = [Artist(name=name) for name in ('Found One', 'Found Two', 'Unknown')]
+            Artist.objects.bulk_create(artists)
+        sp = MagicMock()
+        sp.search.side_effect = lambda q, **kwargs: {'artists': {'items': (
+            [] if 'Unknown' in q else [spotify_artist(q.split(':', 1)[1], q[-3:])]
+        )}}
+        mock_client.return_value = sp
+
+        result = enrich_artists([artist.pk for artist in artists])
+
+        self.assertEqual(result, (2, 1, 0))
+        mock_client.assert_called_once()
+        self.assertEqual(Artist.objects.get(name='Found One').spotify_id, 'One')
+        self.assertIsNone(Artist.objects.get(name='Unknown').spotify_id)
@@ -0,0 +1,41 @@
+"""Tests for the scaled image decoding used by thumbnails."""
+from io import BytesIO
+from django.test import SimpleTestCase
+from PIL import Image
+from events.utils.thumbnails import open_scaled
+
+
+class OpenScaledTests(SimpleTestCase):
+    """Test decoding images at reduced scale."""
+
+    def _image(self, size, format, mode='RGB'):
+        output = BytesIO()
+        Image.new(mode, size, 'red' if mode == 'RGB' else 128).save(output, format=format)
+        output.seek(0)
+        return output
+
+    def test_jpeg_decoded_in_draft_mode(self):
+        """Test that JPEGs are decoded at a power-of-two scale covering the target."""
+        img = open_scaled(self._image((4000, 2400), 'JPEG'), (300, 200))
+
+        self.assertEqual(img.size, (1000, 600))
+        self.assertEqual(img.mode, 'RGB')
+
+    def test_other_formats_reduced_after_load(self):
+        """Test that non-JPEG images are reduced by an integer factor."""
+        img = open_scaled(self._image((3000, 2000), 'PNG'), (300, 200))
+
+        self.assertEqual(img.size, (600, 400))
+
+    def test_mode_converted_after_reduction(self):
+        """Test that greyscale JPEGs come out as RGB at the reduced size."""
+        img = open_scaled(self._image((2400, 1600), 'JPEG', mode='L'), (300, 200))
+
+        self.assertEqual(img.mode, 'RGB')
+        self.assertEqual(img.size, (600, 400))
+
+    def test_small_images_not_reduced(self):
+        """Test that images already near the target keep their size."""
+        img = open_scaled(self._image((400, 300), 'JPEG'), (300, 200))
+
+        self.assertEqual(img.size, (400, 300))
@@ -1,9 +1,16 @@
-from django.test import TestCase, Client
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
-from django.utils import timezone
+from django.utils import timezone, translation
+from events.filters import EventFilterForm, facet_counts
 from events.models import Event, Artist, Venue
 import datetime
 
+# These tests inspect the rendering context, so the page cache is disabled
+@override_settings(PAGE_CACHE_TIMEOUT=0)
 class EventListViewPaginationTests(TestCase):
     @classmethod
     def setUpTestData(cls):
@@ -111,6 +118,7 @@ class EventListViewPaginationTests(TestCase):
         self.assertEqual(dates, sorted(dates, reverse=True))
 
 
+@override_settings(PAGE_CACHE_TIMEOUT=0)
 class ArtistListViewPaginationTests(TestCase):
     @classmethod
     def setUpTestData(cls):
@@ -161,6 +169,7 @@ class ArtistListViewPaginationTests(TestCase):
         self.assertEqual(response.context['page_obj'].number, 2)
 
 
+@override_settings(PAGE_CACHE_TIMEOUT=0)
 class VenueListViewPaginationTests(TestCase):
     @classmethod
     def setUpTestData(cls):
@@ -211,4 +220,249 @@ class VenueListViewPaginationTests(TestCase):
         self.assertEqual(len(response.context['venues']), 3)
         
         # Check that we have the correct page object
-        self.assertEqual(response.context['page_obj'].number, 2)
\ No newline at end of file
+        self.assertEqual(response.context['page_obj'].number, 2)
+
+@override_settings(PAGE_CACHE_TIMEOUT=0)
+class EventListingQueryCountTests(TestCase):
+    def _create_events(self, count, days):
+        """Create events each with its own venue and two artists"""
+        now = timezone.now()
+        for i in range(count):
+            venue = Venue.objects.create(
+                name=f'Venue {days} {i}',
+                address='123 Test St',
+                city='Test City',
+                state='Test State',
+                zip_code='12345'
+            )
+            event = Event.objects.create(
+                title=f'Event {days} {i}',
+                date=now + datetime.timedelta(days=days, hours=i),
+                venue=venue
+            )
+            event.artists.add(
+                Artist.objects.create(name=f'Artist {days} {i}a'),
+                Artist.objects.create(name=f'Artist {days} {i}b'),
+            )
+
+    def _count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_query_count_independent_of_page_size(self):
+        """Test that listing pages issue the same queries for 1 or 9 events per section"""
+        self._create_events(1, days=1)
+        self._create_events(1, days=-1)
+        urls = [reverse('events:home'), reverse('events:event_list')]
+        small = [self._count_queries(url) for url in urls]
+
+        self._create_events(8, days=2)
+        self._create_events(4, days=-2)
+        self.assertEqual([self._count_queries(url) for url in urls], small)
+
+
+@override_settings(PAGE_CACHE_TIMEOUT=0)
+class ArtistListQueryCountTests(TestCase):
+    def _create_artists(self, count, offset=0):
+        """Create artists whose only image comes from their event"""
+        venue = Venue.objects.create(
+            name='Test Venue',
+            address='123 Test St',
+            city='Test City',
+            state='Test State',
+            zip_code='12345'
+        )
+        for i in range(offset, offset + count):
+            event = Event.objects.create(title=f'Event {i}', date=timezone.now(), venue=venue)
+            Event.objects.filter(pk=event.pk).update(image=f'events/poster{i}.jpg')
+            event.artists.add(Artist.objects.create(name=f'Artist {i:02d}'))
+
+    def test_artist_list_is_read_only(self):
+        """Test that the artist list renders event images without per-artist queries or writes"""
+        self._create_artists(2)
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(reverse('events:artist_list'))
+
+        self._create_artists(10, offset=2)
+        with CaptureQueriesContext(connection) as full:
+            response = self.client.get(reverse('events:artist_list'))
+
+        self.assertContains(response, 'events/poster0.jpg')
+        self.assertEqual(len(full), len(small))
+        self.assertFalse(any(query['sql'].startswith(('UPDATE', 'INSERT')) for query in full.captured_queries))
+        self.assertFalse(Artist.objects.exclude(image='').exclude(image__isnull=True).exists())
+
+
+@override_settings(PAGE_CACHE_TIMEOUT=0)
+class EventCardCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.venue = Venue.objects.create(
+            name='Test Venue',
+            address='123 Test St',
+            city='Test City',
+            state='Test State',
+            zip_code='12345'
+        )
+        self.artist = Artist.objects.create(name='Card Artist')
+        self.event = Event.objects.create(
+            title='Card Event',
+            date=timezone.now() + datetime.timedelta(days=1),
+            venue=self.venue
+        )
+        self.event.artists.add(self.artist)
+
+    def _card_key(self, title_class=''):
+        event = Event.objects.get(pk=self.event.pk)
+        return make_template_fragment_key('event_card', [event.pk, event.updated_at, translation.get_language(), title_class])
+
+    def test_card_shared_across_listing_pages(self):
+        """Test that a card rendered on the home page is reused by the event list"""
+        self.client.get(reverse('events:home'))
+        card = cache.get(self._card_key())
+        self.assertIn('Card Artist', card)
+
+        response = self.client.get(reverse('events:event_list'))
+        self.assertContains(response, card, html=False)
+
+    def test_related_changes_refresh_card(self):
+        """Test that renaming an artist or venue or changing the line-up renders a new card"""
+        self.client.get(reverse('events:event_list'))
+        key = self._card_key()
+
+        self.artist.name = 'Renamed Artist'
+        self.artist.save()
+        self.assertNotEqual(self._card_key(), key)
+        self.assertContains(self.client.get(reverse('events:event_list')), 'Renamed Artist')
+
+        key = self._card_key()
+        self.venue.name = 'Renamed Venue'
+        self.venue.save()
+        self.assertNotEqual(self._card_key(), key)
+        self.assertContains(self.client.get(reverse('events:event_list')), 'Renamed Venue')
+
+        key = self._card_key()
+        self.event.artists.add(Artist.objects.create(name='Guest Artist'))
+        self.assertNotEqual(self._card_key(), key)
+        self.assertContains(self.client.get(reverse('events:event_list')), 'Guest Artist')
+
+
+@override_settings(CURSOR_PAGINATION=True, PAGE_CACHE_TIMEOUT=0)
+class CursorPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        venue = Venue.objects.create(
+            name='Test Venue',
+            address='123 Test St',
+            city='Test City',
+            state='Test State',
+            zip_code='12345'
+        )
+        # Pairs of events at the same time, so the id breaks the ties
+        date = timezone.now() + datetime.timedelta(days=1)
+        for i in range(15):
+            Event.objects.create(
+                title=f'Future Event {i+1}',
+                date=date + datetime.timedelta(days=i // 2),
+                venue=venue,
+                slug=f'future-event-{i+1}'
+            )
+        for i in range(14):
+            Artist.objects.create(name=f'Artist {i // 2}')
+
+    def _walk(self, url, key):
+        """Follow the next cursors and return the pages' objects"""
+        pages = []
+        response = self.client.get(url)
+        while True:
+            self.assertEqual(response.status_code, 200)
+            page = response.context['page_obj']
+            pages.append(list(response.context[key]))
+            if not page.has_next():
+                return pages, response
+            response = self.client.get(url, {'after': page.next_cursor})
+
+    def test_event_pages_follow_date_and_id(self):
+        """Test that cursors walk the events in (date, id) order without COUNT or OFFSET"""
+        url = reverse('events:event_list')
+        with CaptureQueriesContext(connection) as queries:
+            pages, last = self._walk(url, 'events')
+
+        self.assertEqual([len(page) for page in pages], [9, 6])
+        events = [event for page in pages for event in page]
+        self.assertEqual(events, list(Event.objects.order_by('date', 'id')))
+        sql = ' '.join(query['sql'] for query in queries.captured_queries)
+        self.assertNotIn('COUNT(*)', sql)
+        self.assertNotIn('OFFSET', sql)
+
+        response = self.client.get(url, {'before': last.context['page_obj'].previous_cursor})
+        self.assertEqual(list(response.context['events']), pages[0])
+        self.assertFalse(response.context['page_obj'].has_previous())
+        self.assertContains(last, '?before=')
+
+    def test_artist_pages_follow_name_and_id(self):
+        """Test that cursors walk artists sharing a name in id order"""
+        pages, _ = self._walk(reverse('events:artist_list'), 'artists')
+        self.assertEqual([len(page) for page in pages], [12, 2])
+        artists = [artist for page in pages for artist in page]
+        self.assertEqual(artists, list(Artist.objects.order_by('name', 'id')))
+
+    def test_invalid_cursor(self):
+        """Test that a malformed cursor returns 404"""
+        response = self.client.get(reverse('events:event_list'), {'after': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(PAGE_CACHE_TIMEOUT=0)
+class EventFilterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.madrid = Venue.objects.create(name='Riviera', address='1 Test St', city='Madrid', state='Madrid', zip_code='28005')
+        cls.wizink = Venue.objects.create(name='WiZink', address='2 Test St', city='Madrid', state='Madrid', zip_code='28009')
+        cls.bilbao = Venue.objects.create(name='Kafe Antzokia', address='3 Test St', city='Bilbao', state='Bizkaia', zip_code='48005')
+        cls.artist = Artist.objects.create(name='Izal')
+        now = timezone.now()
+        for i, (venue, price) in enumerate([(cls.madrid, 20), (cls.madrid, 35), (cls.wizink, 50), (cls.bilbao, 15)]):
+            event = Event.objects.create(
+                title=f'Event {i}',
+                date=now + datetime.timedelta(days=i + 1),
+                venue=venue,
+                ticket_price=price,
+                slug=f'event-{i}'
+            )
+            if i % 2 == 0:
+                event.artists.add(cls.artist)
+
+    def _titles(self, response):
+        return [event.title for event in response.context['events']]
+
+    def test_filters(self):
+        """Test the city, venue, artist, price and date range filters"""
+        url = reverse('events:event_list')
+        self.assertEqual(self._titles(self.client.get(url, {'city': 'madrid'})), ['Event 0', 'Event 1', 'Event 2'])
+        self.assertEqual(self._titles(self.client.get(url, {'venue': self.bilbao.pk})), ['Event 3'])
+        self.assertEqual(self._titles(self.client.get(url, {'artist': self.artist.pk})), ['Event 0', 'Event 2'])
+        self.assertEqual(self._titles(self.client.get(url, {'max_price': '20'})), ['Event 0', 'Event 3'])
+        day = timezone.localdate() + datetime.timedelta(days=2)
+        self.assertEqual(self._titles(self.client.get(url, {'date_from': day, 'date_to': day})), ['Event 1'])
+        # Invalid values are ignored, the valid ones still apply
+        self.assertEqual(self._titles(self.client.get(url, {'venue': 'x', 'city': 'Bilbao'})), ['Event 3'])
+
+    def test_facet_counts(self):
+        """Test that facets count the filtered events with two queries"""
+        filtered = EventFilterForm({'max_price': '40'}).apply(Event.objects.upcoming())
+        with self.assertNumQueries(2):
+            facets = facet_counts(filtered)
+        self.assertEqual([(city['name'], city['count']) for city in facets['cities']], [('Madrid', 2), ('Bilbao', 1)])
+        self.assertEqual([(venue['name'], venue['count']) for venue in facets['venues']],
+                         [('Riviera', 2), ('Kafe Antzokia', 1)])
+        self.assertEqual([(artist['name'], artist['count']) for artist in facets['artists']], [('Izal', 1)])
+
+    def test_links_keep_filters(self):
+        """Test that facet and pagination links keep the active filters"""
+        response = self.client.get(reverse('events:event_list'), {'city': 'Madrid', 'page': '1'})
+        venues = response.context['facets']['venues']
+        self.assertEqual(venues[0]['query'], f'city=Madrid&venue={self.madrid.pk}')
+        self.assertEqual(response.context['pagination_query'], 'city=Madrid')
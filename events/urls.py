@@ -11,5 +11,6 @@ urlpatterns = [
     path('artists/<int:pk>/', views.ArtistDetailView.as_view(), name='artist_detail'),
     path('venues/', views.VenueListView.as_view(), name='venue_list'),
     path('venues/<int:pk>/', views.VenueDetailView.as_view(), name='venue_detail'),
+    path('search/', views.search, name='search'),
     path('terms/', views.TermsView.as_view(), name='terms'),
 ]
\ No newline at end of file
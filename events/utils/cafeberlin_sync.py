@@ -3,11 +3,16 @@ Utility for synchronizing events from Café Berlín website.
 """
 import logging
 import re
+import threading
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from urllib.parse import urlparse
 from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
 from django.utils import timezone
 from django.utils.text import slugify
+from .http_cache import cached_get
 from .sync_base import EventSyncBase
 
 logger = logging.getLogger(__name__)
@@ -26,6 +31,21 @@ VENUE_INFO = {
     "capacity": 200  # Approximate capacity
 }
 
+# Threads fetching event detail pages, and concurrent requests allowed per host
+DETAIL_WORKERS = 8
+MAX_CONNECTIONS_PER_HOST = 4
+
+_host_semaphores = {}
+_host_semaphores_lock = threading.Lock()
+
+def _host_semaphore(url):
+    """Return the semaphore bounding concurrent requests to the URL's host."""
+    host = urlparse(url).netloc
+    with _host_semaphores_lock:
+        if host not in _host_semaphores:
+            _host_semaphores[host] = threading.BoundedSemaphore(MAX_CONNECTIONS_PER_HOST)
+        return _host_semaphores[host]
+
 def _parse_date_element(date_element, title=None):
     """Parse date from date element."""
     event_date = None
@@ -59,13 +79,19 @@ def _parse_date_element(date_element, title=None):
     
     return event_date
 
-def _get_and_scrape_event_details(event_url, headers):
-    """Fetch and scrape event details page."""
+def _get_and_scrape_event_details(event_url, headers, session=None, cache=None):
+    """
+    Fetch and scrape event details page.
+
+    Returns:
+        tuple: (description, high_res_image), or None if the page could not
+        be fetched or scraped
+    """
     description = ""
     high_res_image = None
     try:
-        event_response = requests.get(event_url, headers=headers, timeout=30)
-        event_response.raise_for_status()
+        with _host_semaphore(event_url):
+            event_response = cached_get(event_url, cache, session, headers=headers, timeout=30)
         event_soup = BeautifulSoup(event_response.text, 'html.parser')
         
         # Find description section
@@ -88,11 +114,12 @@ def _get_and_scrape_event_details(event_url, headers):
                 high_res_image = f"https:{image_url}"
     except Exception as e:
         logger.warning(f"Error fetching event details from {event_url}: {e}")
+        return None
     
     return description, high_res_image
 
-def _scrape_event_card(event_card, headers):
-    """Scrape data from a single event card."""
+def _parse_event_card(event_card):
+    """Extract the listing data from a single event card, without its details page."""
     try:
         # Extract event URL
         event_url = event_card.get('href')
@@ -127,47 +154,86 @@ def _scrape_event_card(event_card, headers):
             if image_url and not image_url.startswith('http'):
                 image_url = f"https:{image_url}"
         
-        # Get event details and high-res image
-        description, high_res_image = _get_and_scrape_event_details(event_url, headers)
-        
-        # Use high-res image if available
-        if high_res_image:
-            image_url = high_res_image
-        
         # Create event data dictionary
-        event_data = {
+        return {
             'title': title,
             'date': event_date,
-            'description': description,
+            'description': "",
             'image_url': image_url,
             'ticket_url': event_url,
             'ticket_price': price,
             'external_id': f"cafeberlin-{slugify(title)}-{event_date.strftime('%Y-%m-%d')}"
         }
         
-        logger.info(f"Processed event: {title}")
-        return event_data
-        
     except Exception as e:
         logger.error(f"Error processing event card: {e}")
         return None
 
-def fetch_cafeberlin_events():
+def _apply_event_details(event_data, details):
+    """
+    Merge the (description, high_res_image) of a details page into event data.
+
+    Events whose details page failed keep their listing data and are flagged
+    with details_missing, so the sync can tell the run was incomplete.
+    """
+    if details is None:
+        event_data['details_missing'] = True
+        return event_data
+    description, high_res_image = details
+    event_data['description'] = description
+    
+    # Use high-res image if available
+    if high_res_image:
+        event_data['image_url'] = high_res_image
+    
+    logger.info(f"Processed event: {event_data['title']}")
+    return event_data
+
+def _scrape_event_card(event_card, headers, session=None, cache=None):
+    """Scrape data from a single event card, including its details page."""
+    event_data = _parse_event_card(event_card)
+    if not event_data:
+        return None
+    
+    details = _get_and_scrape_event_details(event_data['ticket_url'], headers, session, cache)
+    return _apply_event_details(event_data, details)
+
+def _build_session(headers, max_workers):
+    """Create a keep-alive session with a connection pool sized for the workers."""
+    session = requests.Session()
+    session.headers.update(headers)
+    adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+def fetch_cafeberlin_events(max_workers=DETAIL_WORKERS, cache=None):
     """
     Fetch events from Café Berlín website.
     
+    Event detail pages are fetched concurrently through a bounded thread
+    pool sharing one keep-alive session, so the total time is driven by the
+    slowest pages rather than the sum of all of them.
+    
+    Args:
+        max_workers (int, optional): Threads used to fetch detail pages
+        cache (HTTPCache, optional): Cache used for conditional requests
+    
     Returns:
-        list: List of event dictionaries with details
+        list: List of event dictionaries with details, in listing order, or
+        None when the cached listing is still current
     """
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36'
+    }
+    session = _build_session(headers, max_workers)
     try:
         logger.info(f"Fetching events from URL: {CAFEBERLIN_URL}")
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36'
-        }
-        response = requests.get(CAFEBERLIN_URL, headers=headers, timeout=30)
-        response.raise_for_status()
+        response = cached_get(CAFEBERLIN_URL, cache, session, headers=headers, timeout=30)
         
         logger.info(f"Response status code: {response.status_code}")
+        if response.not_modified:
+            return None
         
         # Save HTML for debugging
         with open('/tmp/cafeberlin_response.html', 'w', encoding='utf-8') as f:
@@ -175,28 +241,32 @@ def fetch_cafeberlin_events():
         logger.info("Saved response HTML to /tmp/cafeberlin_response.html")
         
         soup = BeautifulSoup(response.text, 'html.parser')
-        events_data = []
         
         # Find all event cards
         event_cards = soup.find_all('a', class_='event-card')
         logger.info(f"Found {len(event_cards)} event cards")
         
-        for event_card in event_cards:
-            event_data = _scrape_event_card(event_card, headers)
-            if event_data:
-                events_data.append(event_data)
+        events_data = [event_data for event_data in map(_parse_event_card, event_cards) if event_data]
         
-        return events_data
+        # map() keeps the listing order whatever order the pages complete in
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            details = executor.map(
+                lambda event_data: _get_and_scrape_event_details(event_data['ticket_url'], headers, session, cache),
+                events_data
+            )
+            return [_apply_event_details(event_data, detail) for event_data, detail in zip(events_data, details)]
     
     except requests.RequestException as e:
         logger.error(f"Error fetching events from Café Berlín: {e}")
         return []
+    finally:
+        session.close()
 
 class CafeBerlinEventSync(EventSyncBase):
     """Café Berlín event synchronization implementation."""
 
-    def __init__(self):
-        super().__init__('cafeberlin')
+    def __init__(self, batch_size=None, use_cache=True):
+        super().__init__('cafeberlin', batch_size=batch_size, use_cache=use_cache)
         self.venue = None
 
     def sync_events(self):
@@ -215,32 +285,31 @@ class CafeBerlinEventSync(EventSyncBase):
             logger.info(f"Created venue: {self.venue.name}")
         
         # Fetch events from Café Berlín
-        events_data = fetch_cafeberlin_events()
+        events_data = fetch_cafeberlin_events(cache=self.http_cache)
+        if events_data is None:
+            logger.info("Café Berlín listing not modified since the last sync, skipping")
+            return self.created_count, self.updated_count, None
         logger.info(f"Fetched {len(events_data)} events from Café Berlín website")
         
-        for event_data in events_data:
-            try:
-                # Process event
-                event, created = self.create_or_update_event(event_data, self.venue)
-                if not event:
-                    continue
-
-                # Extract and create artist
-                artist_name = self._extract_artist_name(event.title)
-                artist_data = {
-                    'name': artist_name,
+        # Synced from the listing alone, but counted as errors so that the
+        # listing's validators are not stored and the next run tries again
+        missing_details = sum(1 for event_data in events_data if event_data.pop('details_missing', False))
+        if missing_details:
+            logger.warning(f"Could not fetch the details pages of {missing_details} Café Berlín events")
+            self.error_count += missing_details
+        
+        self.sync_records(
+            {
+                'event': event_data,
+                'venue': self.venue,
+                'artists': [{
+                    'name': self._extract_artist_name(event_data.get('title') or ''),
                     'bio': f"Artist performing at {self.venue.name}"
-                }
-                artist, _ = self.create_or_update_artist(artist_data)
-                if artist:
-                    event.artists.add(artist)
-
-                logger.info(f"{'Created' if created else 'Updated'} event: {event.title}")
-                
-            except Exception as e:
-                logger.error(f"Error processing event: {e}")
-                self.error_count += 1
-                continue
+                }],
+            }
+            for event_data in events_data
+        )
+        self.commit_http_cache()
         
         return self.created_count, self.updated_count, self.error_count if self.error_count > 0 else None
 
@@ -0,0 +1,164 @@
+"""
+Conditional HTTP fetching with an on-disk response cache.
+
+Responses carrying an ETag or Last-Modified validator are stored on disk.
+Later requests for the same URL send If-None-Match/If-Modified-Since, and a
+304 Not Modified answer is served from the stored body, flagged with
+`not_modified` so callers can skip parsing and database work.
+
+New responses are only written by `commit()`, once the caller has processed
+them: a run that fails halfway keeps the old validators, so the next run
+downloads and syncs the listing again instead of getting a 304.
+"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from pathlib import Path
+from urllib.parse import urlencode
+import requests
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CachedResponse:
+    """Response served from the cache after a 304 Not Modified."""
+
+    status_code = 304
+    not_modified = True
+
+    def __init__(self, url, content, encoding=None):
+        self.url = url
+        self.content = content
+        self.encoding = encoding or 'utf-8'
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding, errors='replace')
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        pass
+
+
+class HTTPCache:
+    """
+    Disk cache of HTTP validators and bodies, keyed by URL and query params.
+
+    Safe to share between threads; `hits` counts 304 answers served from the
+    cache and `misses` counts full downloads, which stay pending until
+    `commit()`.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = Path(directory or settings.HTTP_CACHE_DIR)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # meta path -> (body path, metadata, body) of downloads not yet stored
+        self._pending = {}
+
+    def _paths(self, url, params=None):
+        key = url
+        if params:
+            key += '?' + urlencode(sorted(params.items()))
+        digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        return self.directory / f"{digest}.json", self.directory / f"{digest}.body"
+
+    def _load(self, meta_path, body_path):
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                return meta, f.read()
+        except (OSError, ValueError):
+            return None, None
+
+    def _write_atomic(self, path, data):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _stage(self, meta_path, body_path, response):
+        meta = {
+            'url': response.url,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'encoding': response.encoding,
+        }
+        if not (meta['etag'] or meta['last_modified']):
+            return
+        with self._lock:
+            self._pending[meta_path] = (body_path, meta, response.content)
+
+    def commit(self):
+        """Store the responses downloaded since the last commit."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for meta_path, (body_path, meta, content) in pending.items():
+            try:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                # Body first, so a metadata file always points at a complete body
+                self._write_atomic(body_path, content)
+                self._write_atomic(meta_path, json.dumps(meta).encode('utf-8'))
+            except OSError as e:
+                logger.warning(f"Could not store {meta['url']} in the HTTP cache: {e}")
+
+    def get(self, url, session=None, params=None, headers=None, **kwargs):
+        """
+        GET a URL, revalidating any cached copy.
+
+        Returns:
+            requests.Response or CachedResponse: `not_modified` is True when
+            the cached body was reused
+
+        Raises:
+            requests.HTTPError: For error responses
+        """
+        meta_path, body_path = self._paths(url, params)
+        meta, body = self._load(meta_path, body_path)
+
+        headers = dict(headers or {})
+        if meta:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+
+        response = (session or requests).get(url, params=params, headers=headers, **kwargs)
+        if response.status_code == 304 and meta:
+            with self._lock:
+                self.hits += 1
+            return CachedResponse(url, body, meta.get('encoding'))
+
+        response.raise_for_status()
+        with self._lock:
+            self.misses += 1
+        response.not_modified = False
+        self._stage(meta_path, body_path, response)
+        return response
+
+
+def cached_get(url, cache=None, session=None, **kwargs):
+    """
+    GET a URL through the cache when one is given, otherwise directly.
+
+    Returns:
+        requests.Response or CachedResponse: with a `not_modified` attribute
+
+    Raises:
+        requests.HTTPError: For error responses
+    """
+    if cache is not None:
+        return cache.get(url, session=session, **kwargs)
+
+    response = (session or requests).get(url, **kwargs)
+    response.raise_for_status()
+    response.not_modified = False
+    return response
@@ -0,0 +1,126 @@
+"""
+Content-addressed storage for downloaded images.
+
+Images are stored once under a name derived from the SHA-256 of the source
+bytes, so a poster used by several events, or downloaded again by a later
+sync, is fetched, encoded and stored a single time. The ImageSource model
+maps source URLs to hashes so known URLs are not downloaded at all.
+"""
+import hashlib
+import logging
+import os
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from events.models import Artist, Event, ImageSource
+from . import image_utils
+from .renditions import rendition_names
+
+logger = logging.getLogger(__name__)
+
+# Storage directory holding content-addressed files
+IMAGE_STORE_DIR = 'images'
+
+
+def content_path(digest, suffix='.jpg'):
+    """Return the storage name for a content hash."""
+    return f"{IMAGE_STORE_DIR}/{digest[:2]}/{digest}{suffix}"
+
+def is_content_addressed(name):
+    """Return True if a storage name belongs to the content-addressed store."""
+    return bool(name) and name.startswith(f"{IMAGE_STORE_DIR}/")
+
+def thumbnail_path(name):
+    """Return the storage name of the thumbnail for a content-addressed image."""
+    base, _ = os.path.splitext(name)
+    return f"{base}.thumb.jpg"
+
+def store_image(data, url=''):
+    """
+    Store image bytes under their content hash, encoding them only if new.
+
+    Returns:
+        tuple: (hex digest of the source bytes, storage name)
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    name = content_path(digest)
+    if not default_storage.exists(name):
+        name = default_storage.save(name, ContentFile(image_utils.encode_jpeg(data, url)))
+    return digest, name
+
+def store_image_from_url(url, refresh=False, max_bytes=None):
+    """
+    Return the storage name of the image at a URL, downloading it if unknown.
+
+    Args:
+        url (str): Image URL
+        refresh (bool): Download again even if the URL is in the index
+        max_bytes (int, optional): Stream the download and reject larger images
+
+    Returns:
+        str: Storage name of the content-addressed image
+    """
+    if not refresh:
+        source = ImageSource.objects.filter(url=url).first()
+        if source and default_storage.exists(content_path(source.sha256)):
+            return content_path(source.sha256)
+
+    if max_bytes:
+        data = image_utils.download_image_bytes(url, max_bytes)
+    else:
+        data = image_utils._download_image(url).content
+    digest, name = store_image(data, url)
+    ImageSource.objects.update_or_create(url=url, defaults={'sha256': digest})
+    return name
+
+def referenced_image_names():
+    """Return the content-addressed names referenced by any image field."""
+    names = set()
+    # An artist's display_image may be the image of one of its events
+    for model, fields in ((Event, ('image', 'thumbnail')), (Artist, ('image', 'display_image'))):
+        for field in fields:
+            names.update(
+                model.objects.filter(**{f"{field}__startswith": f"{IMAGE_STORE_DIR}/"})
+                .values_list(field, flat=True)
+            )
+    for model in (Event, Artist):
+        for renditions in model.objects.exclude(renditions={}).values_list('renditions', flat=True):
+            names.update(name for name in rendition_names(renditions) if is_content_addressed(name))
+    return names
+
+def collect_garbage(dry_run=False):
+    """
+    Delete content-addressed files no Event or Artist references anymore.
+
+    Index entries pointing at deleted images are removed as well.
+
+    Returns:
+        list: Storage names of the deleted (or, in dry run, deletable) files
+    """
+    referenced = referenced_image_names()
+    unreferenced = []
+    try:
+        prefixes, _ = default_storage.listdir(IMAGE_STORE_DIR)
+    except FileNotFoundError:
+        return unreferenced
+
+    for prefix in prefixes:
+        _, files = default_storage.listdir(f"{IMAGE_STORE_DIR}/{prefix}")
+        for filename in files:
+            name = f"{IMAGE_STORE_DIR}/{prefix}/{filename}"
+            if name not in referenced:
+                unreferenced.append(name)
+
+    if dry_run:
+        return unreferenced
+
+    for name in unreferenced:
+        default_storage.delete(name)
+    # Thumbnails and renditions share their source's hash; only sources are indexed
+    deleted_digests = set()
+    for name in unreferenced:
+        digest = os.path.basename(name).split('.')[0]
+        if name == content_path(digest):
+            deleted_digests.add(digest)
+    ImageSource.objects.filter(sha256__in=deleted_digests).delete()
+    logger.info(f"Deleted {len(unreferenced)} unreferenced images")
+    return unreferenced
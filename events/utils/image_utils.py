@@ -1,6 +1,7 @@
 import requests
 import logging
 import os
+from django.conf import settings
 from django.core.files.base import ContentFile
 from urllib.parse import urlparse
 from PIL import Image
@@ -8,6 +9,67 @@ from io import BytesIO
 
 logger = logging.getLogger(__name__)
 
+# Seconds to wait for the server to connect or send data
+DOWNLOAD_TIMEOUT = 10
+# Bytes read per chunk of a streamed download
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+
+class ImageTooLarge(IOError):
+    """Raised when a download exceeds its byte limit"""
+
+
+def fetch_image(url):
+    """
+    Download an image from a URL and re-encode it as an RGB JPEG.
+
+    Args:
+        url (str): URL of the image to download
+
+    Returns:
+        tuple: (image file name, JPEG bytes)
+
+    Raises:
+        requests.exceptions.RequestException: If the download fails
+        IOError: If the image cannot be decoded
+    """
+    # Get the image file name from the URL
+    parsed_url = urlparse(url)
+    original_name = os.path.basename(parsed_url.path)
+    name, ext = os.path.splitext(original_name)
+    # Ensure the saved image has a standard extension like .jpg
+    image_name = f"{name}.jpg"
+
+    # Download the image
+    response = _download_image(url)
+    return image_name, encode_jpeg(response.content, url)
+
+def encode_jpeg(data, url=''):
+    """
+    Re-encode image bytes as an RGB JPEG.
+
+    Args:
+        data (bytes): Source image bytes
+        url (str, optional): Source URL, for logging
+
+    Returns:
+        bytes: JPEG image data
+
+    Raises:
+        IOError: If the image cannot be decoded
+    """
+    img = Image.open(BytesIO(data))
+
+    # Convert to RGB if necessary
+    if img.mode != 'RGB':
+        logger.info(f"Converting image from {img.mode} to RGB: {url}")
+        img = img.convert('RGB')
+
+    # Save the converted image to a BytesIO object in JPEG format
+    output_io = BytesIO()
+    img.save(output_io, format='JPEG', quality=85, optimize=True) # Save as JPEG
+    return output_io.getvalue()
+
 def download_and_save_image(url, model_instance, field_name='image'):
     """
     Download an image from a URL, convert it to RGB if necessary,
@@ -26,43 +88,22 @@ def download_and_save_image(url, model_instance, field_name='image'):
         return False
 
     try:
-        # Get the image file name from the URL
-        parsed_url = urlparse(url)
-        original_name = os.path.basename(parsed_url.path)
-        name, ext = os.path.splitext(original_name)
-        # Ensure the saved image has a standard extension like .jpg
-        image_name = f"{name}.jpg"
-
-        # Download the image
-        response = _download_image(url)
-
-        # Read image into memory
-        image_data = BytesIO(response.content)
-        img = Image.open(image_data)
-
-        # Convert to RGB if necessary
-        if img.mode == 'RGBA' or img.mode == 'P':
-            logger.info(f"Converting image from {img.mode} to RGB: {url}")
-            img = img.convert('RGB')
-        elif img.mode != 'RGB':
-            logger.info(f"Converting image from {img.mode} to RGB: {url}")
-            img = img.convert('RGB')
-
-
-        # Save the converted image to a BytesIO object in JPEG format
-        output_io = BytesIO()
-        img.save(output_io, format='JPEG', quality=85, optimize=True) # Save as JPEG
-        output_io.seek(0)
-
         # Get the model's field
         field = getattr(model_instance, field_name)
 
-        # Save the file content to the field
-        # Use ContentFile to save from memory buffer
-        field.save(image_name, ContentFile(output_io.read()), save=False)
+        if getattr(settings, 'CONTENT_ADDRESSED_IMAGES', False):
+            # Imported here to avoid a circular import with events.models
+            from .image_store import store_image_from_url
+            # Point the field at the shared file, downloading it only if new
+            field.name = store_image_from_url(url)
+        else:
+            image_name, content = fetch_image(url)
+
+            # Save the file content to the field
+            # Use ContentFile to save from memory buffer
+            field.save(image_name, ContentFile(content), save=False)
 
         # Save the model instance (this should trigger the thumbnail generation if needed)
-        # Pass skip_thumbnail=False or remove it if your save method handles it
         model_instance.save()
 
         return True
@@ -76,10 +117,36 @@ def download_and_save_image(url, model_instance, field_name='image'):
     except Exception as e:
         logger.error(f"Unexpected error processing image from {url}: {e}")
         return False
-    finally:
-        # Clean up temp file if it was created (though we moved away from NamedTemporaryFile)
-        # This block might not be needed anymore if not using tempfile on disk
-        pass
+
+def download_image_bytes(url, max_bytes, timeout=DOWNLOAD_TIMEOUT):
+    """
+    Stream an image download, stopping as soon as it exceeds a size limit.
+
+    Args:
+        url (str): URL of the image to download
+        max_bytes (int): Largest accepted download
+        timeout (int, optional): Seconds to wait for the connection or data
+
+    Returns:
+        bytes: The downloaded data
+
+    Raises:
+        requests.exceptions.RequestException: If the download fails
+        ImageTooLarge: If the image is larger than max_bytes
+    """
+    with requests.get(url, stream=True, timeout=timeout) as response:
+        response.raise_for_status()
+        length = response.headers.get('Content-Length')
+        if length and length.isdigit() and int(length) > max_bytes:
+            raise ImageTooLarge(f"Image at {url} is {length} bytes, the limit is {max_bytes}")
+
+        data = bytearray()
+        for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+            data += chunk
+            # Content-Length may be missing or wrong, so count what is read
+            if len(data) > max_bytes:
+                raise ImageTooLarge(f"Image at {url} exceeds the limit of {max_bytes} bytes")
+    return bytes(data)
 
 def _download_image(url):
     response = requests.get(url, stream=True, timeout=10) # Added timeout
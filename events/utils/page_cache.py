@@ -0,0 +1,147 @@
+"""
+Response caching for the public pages.
+
+Cache keys embed a content version that is bumped whenever events, artists or
+venues change (through the model signals, and after each bulk sync batch),
+so every cached page goes stale at once without tracking individual keys.
+The same version, with the current time period, makes up the ETag of the
+public pages, so browsers and proxies can revalidate them with conditional
+requests; the period makes listings of upcoming events expire as time passes
+even when nothing is written.
+
+The version is a database row rather than a cache entry, so a bump made by
+a sync command or a django-q worker reaches every web process, even when
+each of them has its own local memory cache.
+"""
+import hashlib
+import logging
+from functools import wraps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+logger = logging.getLogger(__name__)
+
+# Primary key of the ContentVersion row
+CONTENT_VERSION_ID = 1
+# Seconds after which ETags change even without content changes, as the
+# upcoming and past listings depend on the current time
+ETAG_PERIOD = 15 * 60
+
+
+def get_content_version():
+    """Return the current content version, 0 before the first change."""
+    # Imported here as events.models is not ready when this module loads
+    from events.models import ContentVersion
+    version = ContentVersion.objects.filter(pk=CONTENT_VERSION_ID).values_list('version', flat=True).first()
+    return version or 0
+
+def bump_content_version():
+    """Invalidate every cached page by moving to a new content version."""
+    from events.models import ContentVersion
+    changed = ContentVersion.objects.filter(pk=CONTENT_VERSION_ID).update(
+        version=F('version') + 1, changed_at=timezone.now()
+    )
+    if not changed:
+        try:
+            # In a savepoint, so a lost race leaves an outer transaction usable
+            with transaction.atomic():
+                ContentVersion.objects.create(pk=CONTENT_VERSION_ID, version=1)
+        except IntegrityError:
+            # Created concurrently by another process
+            return bump_content_version()
+    logger.debug("Page cache content version bumped")
+
+def invalidate_pages():
+    """
+    Bump the content version. Inside a transaction the bump commits along
+    with the changes, so other processes see both at once.
+    """
+    bump_content_version()
+
+def _request_version(request):
+    """Read the content version once per request."""
+    if not hasattr(request, '_content_version'):
+        request._content_version = get_content_version()
+    return request._content_version
+
+def _language(request):
+    return getattr(request, 'LANGUAGE_CODE', settings.LANGUAGE_CODE)
+
+def _is_public(request):
+    """Whether a request gets the shared anonymous version of a page."""
+    return request.method in ('GET', 'HEAD') and not request.user.is_authenticated
+
+def page_cache_key(request):
+    """Return the cache key of a page for the current content version and language."""
+    path = hashlib.md5(request.get_full_path().encode('utf-8')).hexdigest()
+    return f"events:page:{_request_version(request)}:{_language(request)}:{path}"
+
+def content_etag(request, *args, **kwargs):
+    """Return the ETag of a public page: the content version, time period and language."""
+    if not _is_public(request):
+        return None
+    period = int(timezone.now().timestamp() // ETAG_PERIOD)
+    return f'"{_request_version(request)}-{period}-{_language(request)}"'
+
+def conditional_page():
+    """
+    Add validators to a public view and answer 304 without running it when
+    the client's copy is still current.
+
+    Pages are validated with the content version ETag, which changes with
+    any content write and with the time period, so pages showing related
+    data or the current date are covered too. Validated responses are
+    marked no-cache so clients revalidate them rather than guess their
+    freshness.
+    """
+    validate = condition(etag_func=content_etag)
+
+    def decorator(view):
+        conditional_view = validate(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            if _is_public(request):
+                patch_cache_control(response, no_cache=True)
+            return response
+        return wrapper
+    return decorator
+
+def cache_public_page(view):
+    """
+    Cache a view's rendered HTML for anonymous GET requests.
+
+    Only the body, status and content type are stored, never cookies or
+    per-user headers; middleware still runs on cached responses.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        timeout = getattr(settings, 'PAGE_CACHE_TIMEOUT', 3600)
+        if not timeout or not _is_public(request):
+            return view(request, *args, **kwargs)
+
+        key = page_cache_key(request)
+        cached = cache.get(key)
+        if cached is not None:
+            content, content_type = cached
+            return HttpResponse(content, content_type=content_type)
+
+        response = view(request, *args, **kwargs)
+
+        def store(response):
+            if response.status_code == 200 and not response.streaming:
+                cache.set(key, (response.content, response['Content-Type']), timeout)
+
+        if hasattr(response, 'add_post_render_callback') and not response.is_rendered:
+            response.add_post_render_callback(store)
+        else:
+            store(response)
+        return response
+    return wrapper
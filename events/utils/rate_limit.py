@@ -0,0 +1,97 @@
+"""
+Rate limiting helpers shared by the external API clients.
+"""
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket limiting calls to `rate` per second.
+
+    Up to `capacity` calls may be made in a burst; afterwards callers block in
+    acquire() until a token has been refilled. pause() holds every caller back
+    for a while, e.g. when the API asks clients to retry later.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a call is allowed."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    delay = self._paused_until - now
+                elif not self.rate:
+                    return
+                else:
+                    self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+
+    def pause(self, seconds):
+        """Hold back every call for `seconds`, unless already paused for longer."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            # No burst once the pause ends
+            self._tokens = min(self._tokens, 1)
+
+
+class CallMetrics:
+    """Thread-safe counts and latencies of the API calls made during a run."""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.throttles = 0
+        self.throttled_seconds = 0.0
+        self.latencies = []
+        self._lock = threading.Lock()
+
+    def record(self, latency, error=False):
+        """Record a completed call and its latency in seconds."""
+        with self._lock:
+            self.calls += 1
+            self.errors += int(error)
+            self.latencies.append(latency)
+
+    def record_throttle(self, delay):
+        """Record a rate limited call, retried after `delay` seconds."""
+        with self._lock:
+            self.throttles += 1
+            self.throttled_seconds += delay
+
+    def percentile(self, percent):
+        """
+        Latency below which `percent` of the calls completed, by nearest rank.
+
+        Returns:
+            float: Seconds, or None if no call was made
+        """
+        with self._lock:
+            latencies = sorted(self.latencies)
+        if not latencies:
+            return None
+        rank = max(1, round(percent / 100 * len(latencies)))
+        return latencies[min(rank, len(latencies)) - 1]
+
+    def __str__(self):
+        summary = (
+            f"{self.calls} calls, {self.errors} errors, "
+            f"{self.throttles} throttled ({self.throttled_seconds:.1f}s waited)"
+        )
+        if self.latencies:
+            p50, p95, p99 = (self.percentile(p) * 1000 for p in (50, 95, 99))
+            summary += f", latency p50 {p50:.0f}ms p95 {p95:.0f}ms p99 {p99:.0f}ms"
+        return summary
@@ -0,0 +1,153 @@
+"""
+Responsive image renditions.
+
+The source image is decoded once and resized to every configured size, each
+encoded as JPEG, WebP and, when the codec is available, AVIF. The resulting
+storage names are kept on the model so templates can build `srcset`
+attributes without touching storage.
+"""
+import logging
+import os
+from io import BytesIO
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image
+from .thumbnails import REDUCING_GAP, fit_size
+
+try:
+    # Registers the AVIF codec on Pillow releases without native support
+    import pillow_avif  # noqa: F401
+except ImportError:
+    pass
+
+logger = logging.getLogger(__name__)
+
+# Rendition group -> bounding boxes, smallest first (1x and 2x densities)
+DEFAULT_RENDITIONS = {
+    'card': [(300, 200), (600, 400)],
+    'detail': [(800, 600), (1600, 1200)],
+}
+
+# Format -> (MIME type, file extension, Pillow save options), best first
+FORMATS = {
+    'avif': ('image/avif', 'avif', {'quality': 60}),
+    'webp': ('image/webp', 'webp', {'quality': 80, 'method': 4}),
+    'jpeg': ('image/jpeg', 'jpg', {'quality': 85, 'optimize': True, 'progressive': True}),
+}
+
+# Artist image sizes, as (width, height) boxes per template slot
+DEFAULT_ARTIST_RENDITIONS = {
+    'card': [(350, 350), (700, 700)],
+}
+
+# Directories for renditions of images outside the content-addressed store
+RENDITIONS_DIR = 'events/renditions'
+ARTIST_RENDITIONS_DIR = 'artists/renditions'
+
+
+def get_renditions():
+    """Return the configured rendition groups."""
+    return getattr(settings, 'IMAGE_RENDITIONS', DEFAULT_RENDITIONS)
+
+def get_artist_renditions():
+    """Return the configured artist rendition groups."""
+    return getattr(settings, 'ARTIST_IMAGE_RENDITIONS', DEFAULT_ARTIST_RENDITIONS)
+
+def largest_box(renditions):
+    """Return the (width, height) box covering every rendition size."""
+    boxes = [box for group in renditions.values() for box in group]
+    return max(w for w, _ in boxes), max(h for _, h in boxes)
+
+def available_formats():
+    """
+    Return the configured formats Pillow can encode, JPEG always included last.
+    """
+    Image.init()
+    requested = getattr(settings, 'IMAGE_RENDITION_FORMATS', list(FORMATS))
+    formats = [
+        fmt for fmt in FORMATS
+        if fmt in requested and fmt != 'jpeg' and fmt.upper() in Image.SAVE
+    ]
+    # JPEG is the <img> fallback every browser understands
+    return formats + ['jpeg']
+
+def rendition_base(image_name, directory=RENDITIONS_DIR):
+    """Return the storage name prefix for renditions of an image."""
+    # Imported here as image_store imports events.models
+    from .image_store import is_content_addressed
+
+    base, _ = os.path.splitext(image_name)
+    if is_content_addressed(image_name):
+        # Stored next to the shared source so events using it share them too
+        return base
+    return f"{directory}/{os.path.basename(base)}"
+
+def _save(name, img, fmt, overwrite, output):
+    """Encode an image into a reused buffer and save it, returning the final storage name."""
+    if default_storage.exists(name):
+        if not overwrite:
+            return name
+        default_storage.delete(name)
+
+    output.seek(0)
+    output.truncate()
+    img.save(output, format=fmt.upper(), **FORMATS[fmt][2])
+    return default_storage.save(name, ContentFile(output.getvalue()))
+
+def generate_renditions(img, image_name, renditions=None, directory=RENDITIONS_DIR):
+    """
+    Resize a decoded image to every rendition size and format.
+
+    Args:
+        img (PIL.Image.Image): Decoded RGB source image, left untouched
+        image_name (str): Storage name of the source image
+        renditions (dict, optional): Rendition groups, defaults to the settings
+        directory (str, optional): Where renditions of images outside the
+            content-addressed store are saved
+
+    Returns:
+        dict: group -> format -> list of [storage name, width], smallest first
+    """
+    from .image_store import is_content_addressed
+
+    # Content-addressed renditions are immutable, so existing files are reused
+    overwrite = not is_content_addressed(image_name)
+    base = rendition_base(image_name, directory)
+    formats = available_formats()
+
+    output = BytesIO()
+    result = {}
+    for group, boxes in (renditions or get_renditions()).items():
+        result[group] = {fmt: [] for fmt in formats}
+        widths = set()
+        for box in boxes:
+            fitted = fit_size(img.size, box)
+            # Sources smaller than the box come out the same size every time
+            if fitted[0] in widths:
+                continue
+            widths.add(fitted[0])
+            resized = img.resize(fitted, Image.LANCZOS, reducing_gap=REDUCING_GAP) if fitted != img.size else img
+
+            for fmt in formats:
+                name = f"{base}.{group}-{resized.width}.{FORMATS[fmt][1]}"
+                try:
+                    name = _save(name, resized, fmt, overwrite, output)
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Could not encode {fmt} rendition of {image_name}: {e}")
+                    continue
+                result[group][fmt].append([name, resized.width])
+    return result
+
+def rendition_names(renditions):
+    """Return every storage name listed in a renditions mapping."""
+    return {
+        name
+        for formats in (renditions or {}).values()
+        for entries in formats.values()
+        for name, _ in entries
+    }
+
+def srcset(entries):
+    """Return a srcset attribute value for a list of [storage name, width]."""
+    return ', '.join(f"{default_storage.url(name)} {width}w" for name, width in entries)
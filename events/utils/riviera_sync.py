@@ -8,6 +8,7 @@ from datetime import datetime
 from bs4 import BeautifulSoup
 from django.utils import timezone
 from django.utils.text import slugify
+from .http_cache import cached_get
 from .sync_base import EventSyncBase
 
 logger = logging.getLogger(__name__)
@@ -26,19 +27,24 @@ VENUE_INFO = {
     "capacity": 2500
 }
 
-def fetch_riviera_events():
+def fetch_riviera_events(cache=None):
     """
     Fetch events from Sala Riviera website.
     
+    Args:
+        cache (HTTPCache, optional): Cache used for a conditional request
+    
     Returns:
-        list: List of event dictionaries with details
+        list: List of event dictionaries with details, or None when the
+        cached listing is still current
     """
     try:
         logger.info(f"Fetching events from URL: {RIVIERA_URL}")
-        response = requests.get(RIVIERA_URL, timeout=30)
-        response.raise_for_status()
+        response = cached_get(RIVIERA_URL, cache, timeout=30)
         
         logger.info(f"Response status code: {response.status_code}")
+        if response.not_modified:
+            return None
         
         # Save HTML for debugging
         with open('/tmp/riviera_response.html', 'w', encoding='utf-8') as f:
@@ -276,8 +282,8 @@ def fetch_riviera_events():
 class RivieraEventSync(EventSyncBase):
     """Sala Riviera event synchronization implementation."""
 
-    def __init__(self):
-        super().__init__('riviera')
+    def __init__(self, batch_size=None, use_cache=True):
+        super().__init__('riviera', batch_size=batch_size, use_cache=use_cache)
         self.venue = None
 
     def sync_events(self):
@@ -296,32 +302,24 @@ class RivieraEventSync(EventSyncBase):
             logger.info(f"Created venue: {self.venue.name}")
         
         # Fetch events from Sala Riviera
-        events_data = fetch_riviera_events()
+        events_data = fetch_riviera_events(cache=self.http_cache)
+        if events_data is None:
+            logger.info("Sala Riviera listing not modified since the last sync, skipping")
+            return self.created_count, self.updated_count, None
         logger.info(f"Fetched {len(events_data)} events from Sala Riviera website")
         
-        for event_data in events_data:
-            try:
-                # Process event
-                event, created = self.create_or_update_event(event_data, self.venue)
-                if not event:
-                    continue
-
-                # Extract and create artist
-                artist_name = self._extract_artist_name(event.title)
-                artist_data = {
-                    'name': artist_name,
+        self.sync_records(
+            {
+                'event': event_data,
+                'venue': self.venue,
+                'artists': [{
+                    'name': self._extract_artist_name(event_data.get('title') or ''),
                     'bio': f"Artist performing at {self.venue.name}"
-                }
-                artist, _ = self.create_or_update_artist(artist_data)
-                if artist:
-                    event.artists.add(artist)
-
-                logger.info(f"{'Created' if created else 'Updated'} event: {event.title}")
-                
-            except Exception as e:
-                logger.error(f"Error processing event: {e}")
-                self.error_count += 1
-                continue
+                }],
+            }
+            for event_data in events_data
+        )
+        self.commit_http_cache()
         
         return self.created_count, self.updated_count, self.error_count if self.error_count > 0 else None
 
@@ -0,0 +1,502 @@
+"""
+Spotify artist enrichment.
+
+Artists are matched by a name search and updated with their Spotify id,
+popularity, followers and image. enrich_artists() processes a batch with a
+single authenticated client, saving each artist. refresh_artists() looks up
+artists whose Spotify id is already known through the several-artists
+endpoint, searches only for the others, and writes each batch with one
+bulk_update.
+
+Searches without a match are remembered on the artist (spotify_misses and
+spotify_checked_at), and the artist is not searched again until an interval
+that doubles with each consecutive miss has passed.
+
+Calls go through SpotifyClient, which shares one connection pool, one
+client-credentials token (kept in memory until it expires) and one rate
+limiter with every other client of the process. A 429 response pauses all
+calls for the Retry-After delay before the call is retried, and each client
+counts its calls, throttles and latencies for the run it is used for. A
+Retry-After longer than MAX_RETRY_AFTER raises SpotifyRateLimited instead,
+which stops refresh_artists() and enrich_artists() rather than failing
+every remaining artist.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from itertools import islice
+from django.conf import settings
+from django.utils import timezone
+import requests
+import spotipy
+from requests.adapters import HTTPAdapter
+from spotipy.cache_handler import MemoryCacheHandler
+from spotipy.exceptions import SpotifyException
+from spotipy.oauth2 import SpotifyClientCredentials
+from urllib3.util.retry import Retry
+from .rate_limit import CallMetrics, RateLimiter
+from .renditions import get_artist_renditions, largest_box
+
+logger = logging.getLogger(__name__)
+
+# Search results considered when matching an artist name
+SEARCH_LIMIT = 5
+# Artists with Spotify data younger than this are not refreshed
+REFRESH_AGE_DAYS = 7
+# Wait after a first search without a match, doubled for each further miss
+MISS_RECHECK_DAYS = 1
+MAX_MISS_RECHECK_DAYS = 90
+# Most artist ids accepted by the several-artists endpoint
+ARTISTS_BATCH_SIZE = 50
+# Columns written by refresh_artists()
+REFRESH_FIELDS = [
+    'spotify_id', 'spotify_uri', 'spotify_url', 'spotify_popularity', 'spotify_followers',
+    'spotify_image_url', 'spotify_last_updated', 'image', 'renditions', 'spotify_checked_at', 'spotify_misses',
+]
+
+# Retries of a rate limited call before giving up
+MAX_RETRIES = 3
+# Longest Retry-After honoured by pausing and retrying; longer ones stop the run
+MAX_RETRY_AFTER = 60
+# Server errors are retried by the HTTP adapter; 429 is left to SpotifyClient
+SERVER_ERROR_STATUSES = (500, 502, 503, 504)
+
+# Process-wide API connection and rate limiter, keyed by the settings they were built with
+_api = None
+_limiter = None
+_api_settings = None
+_api_lock = threading.Lock()
+
+
+class SpotifyRateLimited(Exception):
+    """Raised when Spotify asks to wait longer than MAX_RETRY_AFTER."""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Spotify rate limit: retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+def _build_api(client_id, client_secret, max_workers):
+    session = requests.Session()
+    retry = Retry(
+        total=MAX_RETRIES,
+        read=False,
+        allowed_methods=frozenset(['GET', 'POST']),
+        status_forcelist=SERVER_ERROR_STATUSES,
+        backoff_factor=0.3,
+        respect_retry_after_header=False,
+    )
+    # One pooled connection per worker thread
+    session.mount('https://', HTTPAdapter(max_retries=retry, pool_maxsize=max_workers))
+    return spotipy.Spotify(
+        requests_session=session,
+        client_credentials_manager=SpotifyClientCredentials(
+            client_id=client_id,
+            client_secret=client_secret,
+            cache_handler=MemoryCacheHandler(),
+        ),
+    )
+
+def _max_workers():
+    return max(1, getattr(settings, 'SPOTIFY_MAX_WORKERS', 4))
+
+def _is_throttle(error):
+    """
+    Whether an error is a rate limit answer from Spotify.
+
+    spotipy also raises a 429 without headers once the HTTP adapter has run
+    out of retries on server errors, which is an outage rather than a throttle.
+    """
+    return error.http_status == 429 and (error.headers or {}).get('Retry-After') is not None
+
+def _retry_after(error, attempt):
+    """Seconds to wait before retrying a rate limited call."""
+    try:
+        return max(0, int(error.headers.get('Retry-After')))
+    except (TypeError, ValueError):
+        return 2 ** attempt
+
+
+class SpotifyClient:
+    """
+    Rate limited Spotify API client for one run.
+
+    Calls wait for the process-wide limiter and are retried after a 429
+    response once its Retry-After delay has passed; the delay pauses the
+    limiter, so concurrent calls back off too. Delays over MAX_RETRY_AFTER
+    raise SpotifyRateLimited without pausing the limiter. Safe to use from
+    several threads.
+
+    Attributes:
+        api (spotipy.Spotify): Underlying client
+        limiter (RateLimiter): Limiter shared with the other clients
+        metrics (CallMetrics): Calls made through this client
+    """
+
+    def __init__(self, api, limiter):
+        self.api = api
+        self.limiter = limiter
+        self.metrics = CallMetrics()
+
+    def _call(self, method, *args, **kwargs):
+        attempt = 0
+        while True:
+            self.limiter.acquire()
+            started = time.monotonic()
+            try:
+                result = getattr(self.api, method)(*args, **kwargs)
+            except SpotifyException as e:
+                throttled = _is_throttle(e)
+                self.metrics.record(time.monotonic() - started, error=not throttled)
+                if not throttled:
+                    raise
+                attempt += 1
+                delay = _retry_after(e, attempt)
+                if delay > MAX_RETRY_AFTER:
+                    # Pausing the shared limiter that long would stall every caller
+                    logger.warning(f"Spotify rate limit: retry after {delay}s, giving up")
+                    raise SpotifyRateLimited(delay) from e
+                self.limiter.pause(delay)
+                if attempt > MAX_RETRIES:
+                    logger.warning(f"Spotify rate limit: giving up after {attempt} attempts, retry after {delay}s")
+                    raise
+                self.metrics.record_throttle(delay)
+                logger.info(f"Spotify rate limit: retrying in {delay}s")
+                continue
+            except Exception:
+                self.metrics.record(time.monotonic() - started, error=True)
+                raise
+            self.metrics.record(time.monotonic() - started)
+            return result
+
+    def search(self, q, type='artist', limit=10):
+        return self._call('search', q=q, type=type, limit=limit)
+
+    def artists(self, artists):
+        return self._call('artists', artists)
+
+
+def spotify_client():
+    """
+    Build a Spotify client for a run, sharing the process-wide connection.
+
+    The connection and its token are created once per process and set of
+    credentials; the token is cached in memory and renewed when it expires.
+
+    Returns:
+        SpotifyClient: The client, or None if credentials are not configured
+    """
+    global _api, _limiter, _api_settings
+    client_id = getattr(settings, 'SPOTIFY_CLIENT_ID', None)
+    client_secret = getattr(settings, 'SPOTIFY_CLIENT_SECRET', None)
+    if not client_id or not client_secret:
+        logger.warning("Spotify API credentials not configured")
+        return None
+    requests_per_second = getattr(settings, 'SPOTIFY_REQUESTS_PER_SECOND', 5.0)
+    max_workers = _max_workers()
+
+    api_settings = (client_id, client_secret, requests_per_second, max_workers)
+    with _api_lock:
+        if _api is None or _api_settings != api_settings:
+            _api = _build_api(client_id, client_secret, max_workers)
+            _limiter = RateLimiter(requests_per_second)
+            _api_settings = api_settings
+        return SpotifyClient(_api, _limiter)
+
+def is_fresh(artist):
+    """Whether an artist's Spotify data is recent enough to skip a refresh."""
+    return bool(
+        artist.spotify_id and artist.spotify_last_updated
+        and (timezone.now() - artist.spotify_last_updated).days < REFRESH_AGE_DAYS
+    )
+
+def miss_recheck_interval(misses):
+    """Time to wait before searching again for an artist after consecutive misses."""
+    # The exponent is bounded, as the interval reaches its maximum long before
+    days = MISS_RECHECK_DAYS * 2 ** (min(misses, 16) - 1)
+    return timedelta(days=min(days, MAX_MISS_RECHECK_DAYS))
+
+def is_known_miss(artist):
+    """Whether the last lookup of an artist found no match and is too recent to retry."""
+    return bool(
+        artist.spotify_misses and artist.spotify_checked_at
+        and timezone.now() < artist.spotify_checked_at + miss_recheck_interval(artist.spotify_misses)
+    )
+
+def should_refresh(artist, force_update=False, retry_misses=False):
+    """
+    Whether an artist needs a Spotify lookup.
+
+    Args:
+        artist (Artist): Artist to check
+        force_update (bool): Refresh even if the data is still fresh
+        retry_misses (bool): Search again for recently unmatched artists
+    """
+    if not force_update and is_fresh(artist):
+        return False
+    return retry_misses or not is_known_miss(artist)
+
+def record_miss(artist):
+    """Note on an Artist, without saving it, that no match was found."""
+    artist.spotify_misses = (artist.spotify_misses or 0) + 1
+    artist.spotify_checked_at = timezone.now()
+    logger.info(
+        f"No Spotify results found for artist: {artist.name}, "
+        f"retrying in {miss_recheck_interval(artist.spotify_misses).days} days"
+    )
+
+def best_match(items, name):
+    """Pick the search result with exactly the artist's name, else the first one."""
+    for item in items:
+        if item['name'].lower() == name.lower():
+            return item
+    return items[0] if items else None
+
+def search_artist(sp, name):
+    """
+    Search Spotify for an artist by name.
+
+    Returns:
+        dict: The best matching Spotify artist, or None
+    """
+    results = sp.search(q=f'artist:{name}', type='artist', limit=SEARCH_LIMIT)
+    return best_match(results['artists']['items'], name)
+
+def pick_image(images, min_width):
+    """
+    Pick the smallest image at least min_width wide, else the largest one.
+
+    Args:
+        images (list): Spotify image objects with url, width and height
+        min_width (int): Width the image is displayed at
+
+    Returns:
+        dict: The chosen image, or None if there are none
+    """
+    images = sorted(images, key=lambda image: image.get('width') or 0)
+    for image in images:
+        if (image.get('width') or 0) >= min_width:
+            return image
+    return images[-1] if images else None
+
+def apply_artist_data(artist, item):
+    """
+    Copy a Spotify artist object onto an Artist, without saving it.
+
+    Returns:
+        bool: Whether the artist has no image yet and one is available to download
+    """
+    artist.spotify_id = item['id']
+    artist.spotify_uri = item['uri']
+    artist.spotify_url = item['external_urls'].get('spotify', '')
+    artist.spotify_popularity = item['popularity']
+    artist.spotify_followers = item['followers']['total']
+    artist.spotify_last_updated = timezone.now()
+    artist.spotify_checked_at = artist.spotify_last_updated
+    artist.spotify_misses = 0
+
+    if item.get('images'):
+        # Big enough for the largest rendition, without downloading more than that
+        width, _ = largest_box(get_artist_renditions())
+        artist.spotify_image_url = pick_image(item['images'], width)['url']
+    return bool(not artist.image and artist.spotify_image_url)
+
+def enrich_artist(sp, artist):
+    """
+    Search, update and save a single artist.
+
+    Args:
+        sp (SpotifyClient): Authenticated client
+        artist (Artist): Artist to enrich
+
+    Returns:
+        bool: True if the artist was matched
+
+    Raises:
+        SpotifyRateLimited: If Spotify asks to wait longer than MAX_RETRY_AFTER
+    """
+    try:
+        item = search_artist(sp, artist.name)
+        if not item:
+            record_miss(artist)
+            # Only the miss is written, without the save() side effects
+            type(artist).objects.filter(pk=artist.pk).update(
+                spotify_misses=artist.spotify_misses,
+                spotify_checked_at=artist.spotify_checked_at,
+            )
+            return False
+
+        if apply_artist_data(artist, item):
+            artist._download_spotify_image()
+        artist.save(skip_spotify=True)
+        return True
+    except SpotifyRateLimited:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching Spotify data for {artist.name}: {str(e)}")
+        return False
+
+def enrich_artists(artists, force_update=False, sp=None, retry_misses=False):
+    """
+    Enrich a batch of artists with one Spotify client.
+
+    Args:
+        artists (iterable): Artist instances
+        force_update (bool): Refresh artists whose data is still fresh
+        sp (SpotifyClient): Optional client to reuse
+        retry_misses (bool): Search again for recently unmatched artists
+
+    Returns:
+        tuple: (matched, unmatched, skipped) counts
+
+    Raises:
+        SpotifyRateLimited: If Spotify asks to wait longer than MAX_RETRY_AFTER
+    """
+    matched = unmatched = skipped = 0
+    for artist in artists:
+        if not should_refresh(artist, force_update, retry_misses):
+            skipped += 1
+            continue
+        if sp is None:
+            sp = spotify_client()
+            if sp is None:
+                return matched, unmatched, skipped
+        if enrich_artist(sp, artist):
+            matched += 1
+        else:
+            unmatched += 1
+    return matched, unmatched, skipped
+
+def _batches(artists, size):
+    artists = iter(artists)
+    while True:
+        batch = list(islice(artists, size))
+        if not batch:
+            return
+        yield batch
+
+def _lookup_known(sp, artists):
+    """
+    Fetch artists by their Spotify id with one request.
+
+    Returns:
+        list: (artist, item) pairs; item is None for ids Spotify no longer knows
+    """
+    items = sp.artists([artist.spotify_id for artist in artists])['artists']
+    return list(zip(artists, items))
+
+def _search(sp, artist):
+    """Search for an artist, returning (item, error) for use from a worker thread."""
+    try:
+        return search_artist(sp, artist.name), None
+    except SpotifyRateLimited:
+        raise
+    except Exception as e:
+        return None, e
+
+def _refresh_batch(sp, artists, executor):
+    """
+    Refresh up to ARTISTS_BATCH_SIZE artists and bulk update them, recording
+    a miss for artists without a match. Name searches run on the executor.
+
+    Returns:
+        tuple: (matched, unmatched) counts
+    """
+    from events.models import Artist
+
+    known = [artist for artist in artists if artist.spotify_id]
+    unknown = [artist for artist in artists if not artist.spotify_id]
+    found = []
+    missed = []
+    if known:
+        try:
+            for artist, item in _lookup_known(sp, known):
+                if item:
+                    found.append((artist, item))
+                else:
+                    # The id is gone, e.g. after an artist merge, so match by name again
+                    unknown.append(artist)
+        except SpotifyRateLimited:
+            raise
+        except Exception as e:
+            logger.error(f"Error fetching Spotify artists by id: {str(e)}")
+
+    searches = executor.map(lambda artist: _search(sp, artist), unknown)
+    for artist, (item, error) in zip(unknown, searches):
+        if error:
+            logger.error(f"Error fetching Spotify data for {artist.name}: {str(error)}")
+        elif item:
+            found.append((artist, item))
+        else:
+            record_miss(artist)
+            missed.append(artist)
+
+    with_images = []
+    for artist, item in found:
+        if apply_artist_data(artist, item):
+            artist._download_spotify_image()
+            if artist.image:
+                # Generated here, as bulk_update does not call save()
+                artist.generate_renditions()
+                with_images.append(artist.pk)
+
+    if found or missed:
+        Artist.objects.bulk_update([artist for artist, item in found] + missed, REFRESH_FIELDS)
+        if with_images:
+            # bulk_update skips save(), which keeps display_image in step
+            Artist.objects.filter(pk__in=with_images).refresh_display_images()
+    return len(found), len(artists) - len(found)
+
+def refresh_artists(artists, force_update=False, sp=None, retry_misses=False):
+    """
+    Refresh artists in batches of ARTISTS_BATCH_SIZE.
+
+    Artists with a known Spotify id are fetched together through the
+    several-artists endpoint; only the others are searched by name, on up to
+    SPOTIFY_MAX_WORKERS threads, and
+    artists whose last search found nothing are skipped until their recheck
+    interval has passed. Each batch is written with a single bulk_update,
+    without calling save().
+
+    Args:
+        artists (iterable): Artist instances
+        force_update (bool): Refresh artists whose data is still fresh
+        sp (SpotifyClient): Optional client to reuse
+        retry_misses (bool): Search again for recently unmatched artists
+
+    Returns:
+        tuple: (matched, unmatched, skipped) counts
+
+    Raises:
+        SpotifyRateLimited: If Spotify asks to wait longer than MAX_RETRY_AFTER;
+            the batches written before are kept
+    """
+    from events.utils.page_cache import invalidate_pages
+
+    matched = unmatched = skipped = 0
+    stale = []
+    for artist in artists:
+        if should_refresh(artist, force_update, retry_misses):
+            stale.append(artist)
+        else:
+            skipped += 1
+    if not stale:
+        return matched, unmatched, skipped
+
+    if sp is None:
+        sp = spotify_client()
+        if sp is None:
+            return matched, unmatched, skipped
+
+    try:
+        with ThreadPoolExecutor(max_workers=_max_workers()) as executor:
+            for batch in _batches(stale, ARTISTS_BATCH_SIZE):
+                batch_matched, batch_unmatched = _refresh_batch(sp, batch, executor)
+                matched += batch_matched
+                unmatched += batch_unmatched
+    finally:
+        if matched:
+            invalidate_pages()
+    return matched, unmatched, skipped
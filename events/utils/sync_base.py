@@ -1,20 +1,68 @@
 """
 Base classes and utilities for event synchronization.
 """
+import hashlib
+import json
 import logging
+from decimal import Decimal
+from contextlib import nullcontext
+from itertools import islice
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import transaction
+from django.utils import timezone
+from django.utils.text import slugify
+from events import search
 from events.models import Event, Venue, Artist
+from .http_cache import HTTPCache
 from .image_utils import download_and_save_image
+from .page_cache import bump_content_version
+from .spotify import SpotifyRateLimited, is_known_miss, refresh_artists
 
 logger = logging.getLogger(__name__)
 
 class EventSyncBase:
     """Base class for event synchronization from external sources."""
     
-    def __init__(self, source_name):
+    def __init__(self, source_name, batch_size=None, use_cache=True):
         self.source_name = source_name
         self.created_count = 0
         self.updated_count = 0
+        self.unchanged_count = 0
         self.error_count = 0
+        # A batch size enables the bulk upsert pipeline (see bulk_sync)
+        if batch_size is None:
+            batch_size = getattr(settings, 'EVENT_SYNC_BATCH_SIZE', 0)
+        self.batch_size = batch_size
+        # Hand image downloads to the django-q image cluster instead of
+        # fetching them inline
+        self.async_images = getattr(settings, 'EVENT_IMAGES_ASYNC', False) and apps.is_installed('django_q')
+        self._pending_images = {}
+        # Queue Spotify lookups on django-q instead of running them in Artist.save
+        self.async_spotify = getattr(settings, 'SPOTIFY_ENRICHMENT_ASYNC', False) and apps.is_installed('django_q')
+        # Events created or changed by the current bulk batch, reindexed for search
+        self._changed_event_ids = set()
+        # Conditional requests against the on-disk HTTP cache
+        self.http_cache = HTTPCache() if use_cache and getattr(settings, 'HTTP_CACHE_DIR', None) else None
+
+    @property
+    def cache_hits(self):
+        """Number of responses served from the HTTP cache (304 Not Modified)."""
+        return self.http_cache.hits if self.http_cache else 0
+
+    @property
+    def cache_misses(self):
+        """Number of responses downloaded in full."""
+        return self.http_cache.misses if self.http_cache else 0
+
+    def commit_http_cache(self):
+        """
+        Store the validators of the responses fetched by this run, unless it
+        had errors, so that a failed run is not skipped as unmodified next time.
+        """
+        if self.http_cache and not self.error_count:
+            self.http_cache.commit()
 
     def sync_events(self):
         """
@@ -25,10 +73,359 @@ class EventSyncBase:
         """
         raise NotImplementedError("Subclasses must implement sync_events()")
 
+    @staticmethod
+    def fingerprint(event_data):
+        """
+        Return a hash of the normalized source fields we store on an Event.
+
+        Events whose stored Event.source_hash matches the fingerprint of the
+        incoming data are skipped without being written.
+        """
+        ticket_price = event_data.get('ticket_price')
+        if ticket_price is not None:
+            ticket_price = str(Decimal(str(ticket_price)).normalize())
+        date = event_data.get('date')
+        payload = {
+            'title': (event_data.get('title') or '').strip(),
+            'date': date.isoformat() if hasattr(date, 'isoformat') else date,
+            'description': (event_data.get('description') or '').strip(),
+            'ticket_url': event_data.get('ticket_url') or '',
+            'ticket_price': ticket_price,
+            'image_url': event_data.get('image_url') or '',
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def sync_records(self, records):
+        """
+        Store a sequence of normalized records in the database.
+
+        Each record is a dict with an 'event' dict (as accepted by
+        create_or_update_event), a 'venue' (a Venue instance or a venue dict)
+        and an optional list of 'artists' dicts. Records are processed in
+        batches through bulk_sync when a batch size is configured, otherwise
+        one by one.
+
+        Args:
+            records (iterable): Records to synchronize, may be a generator
+        """
+        records = iter(records)
+        enrichment = nullcontext()
+        if self.async_spotify:
+            # Imported here as it requires django_q to be installed
+            from events.tasks import collect_artist_enrichment
+            # New artists are enriched from Spotify in batches after the run
+            enrichment = collect_artist_enrichment()
+
+        with enrichment:
+            if self.batch_size:
+                while True:
+                    batch = list(islice(records, self.batch_size))
+                    if not batch:
+                        break
+                    self.bulk_sync(batch)
+                    # Bulk writes bypass the model signals, so cached pages are
+                    # invalidated here, once the batch has committed
+                    bump_content_version()
+                    self.queue_pending_images()
+                return
+
+            for record in records:
+                try:
+                    self._sync_record(record)
+                except Exception as e:
+                    logger.error(f"Error processing event {record.get('event', {}).get('title', 'Unknown')}: {e}")
+                    self.error_count += 1
+            self.queue_pending_images()
+
+    def queue_pending_images(self):
+        """Queue the image downloads collected while syncing, one per URL."""
+        if not self._pending_images:
+            return
+        # Imported here as it requires django_q to be installed
+        from events.tasks import enqueue_event_images
+        enqueue_event_images(self._pending_images)
+        logger.info(f"Queued {len(self._pending_images)} images for download")
+        self._pending_images = {}
+
+    def _sync_record(self, record):
+        """Synchronize a single record using the per-row methods."""
+        venue = record['venue']
+        if not isinstance(venue, Venue):
+            venue, _ = self.create_or_update_venue(venue)
+            if not venue:
+                return None
+
+        event, created = self.create_or_update_event(record['event'], venue)
+        if not event:
+            return None
+
+        for artist_data in record.get('artists', []):
+            artist, _ = self.create_or_update_artist(artist_data)
+            if artist:
+                event.artists.add(artist)
+
+        logger.info(f"{'Created' if created else 'Synchronized'} event: {event.title}")
+        return event
+
+    def bulk_sync(self, records):
+        """
+        Synchronize a batch of records with a fixed number of queries.
+
+        Existing venues, artists and events are prefetched by name and
+        external_id, changes are computed in memory and written with
+        bulk_create/bulk_update, and artist links are inserted into the
+        Event.artists through table in a single statement. Images are
+        downloaded once the batch has been committed.
+
+        Args:
+            records (list): Records as described in sync_records
+        """
+        valid_records = {}
+        for record in records:
+            event_data = record.get('event') or {}
+            if not (event_data.get('title') and event_data.get('date') and event_data.get('external_id')):
+                logger.warning(f"Skipping event with missing required data: {event_data.get('title')}")
+                continue
+            # Later records win when the source repeats an event
+            valid_records[event_data['external_id']] = record
+        records = list(valid_records.values())
+        if not records:
+            return
+
+        self._changed_event_ids = set()
+        try:
+            with transaction.atomic():
+                venues = self._bulk_upsert_venues(records)
+                artists, created_artists = self._bulk_upsert_by_name(Artist, {
+                    artist_data['name']: artist_data
+                    for record in records
+                    for artist_data in record.get('artists', [])
+                    if artist_data.get('name')
+                })
+                events, (created, updated, unchanged), image_jobs = self._bulk_upsert_events(records, venues)
+                self._bulk_link_artists(records, events, artists)
+                search.index_events(self._changed_event_ids)
+        except Exception as e:
+            logger.error(f"Error processing batch of {len(records)} events: {e}")
+            self.error_count += len(records)
+            return
+
+        self.created_count += created
+        self.updated_count += updated
+        self.unchanged_count += unchanged
+        # Artists are bulk created without Artist.save, so look the new ones up here
+        self._enrich_artists(created_artists)
+        logger.info(f"Batch synchronized: {created} created, {updated} updated, {unchanged} unchanged")
+
+        for event, image_url in image_jobs:
+            self._handle_event_image(event, image_url)
+
+    def _enrich_artists(self, artists):
+        """
+        Look artists up on Spotify as Artist.save does: queued on django-q
+        when SPOTIFY_ENRICHMENT_ASYNC is set, otherwise inline in batches.
+        """
+        if self.async_spotify:
+            from events.tasks import enqueue_artist_enrichment
+            enqueue_artist_enrichment(artist.pk for artist in artists if not is_known_miss(artist))
+            return
+        try:
+            refresh_artists(artists)
+        except SpotifyRateLimited as e:
+            # Left to a later run, like Artist.save does
+            logger.warning(f"Skipping Spotify lookups for the batch: {e}")
+
+    def _bulk_upsert_venues(self, records):
+        """Resolve the venue of every record, creating or updating in bulk."""
+        venues = {}
+        venue_data_by_name = {}
+        for record in records:
+            venue = record['venue']
+            if isinstance(venue, Venue):
+                venues[venue.name] = venue
+            else:
+                venue_data_by_name[venue['name']] = venue
+        venues.update(self._bulk_upsert_by_name(Venue, venue_data_by_name)[0])
+        return venues
+
+    def _bulk_upsert_by_name(self, model, data_by_name):
+        """
+        Create or update model instances identified by name.
+
+        Returns:
+            tuple: (dict of name -> model instance, list of created instances)
+        """
+        if not data_by_name:
+            return {}, []
+
+        existing = {obj.name: obj for obj in model.objects.filter(name__in=list(data_by_name))}
+        field_names = {field.name for field in model._meta.concrete_fields}
+        to_create = []
+        to_update = []
+        changed_fields = set()
+
+        for name, data in data_by_name.items():
+            obj = existing.get(name)
+            if obj is None:
+                obj = model(**{field: value for field, value in data.items() if field in field_names})
+                to_create.append(obj)
+                existing[name] = obj
+                continue
+            fields = self._apply_changes(obj, data)
+            if fields:
+                to_update.append(obj)
+                changed_fields.update(fields)
+
+        if to_create:
+            model.objects.bulk_create(to_create)
+        if to_update:
+            model.objects.bulk_update(to_update, sorted(changed_fields))
+        return existing, to_create
+
+    def _bulk_upsert_events(self, records, venues):
+        """
+        Create or update the events of a batch.
+
+        Returns:
+            tuple: (events by external_id, (created, updated, unchanged), image jobs)
+        """
+        external_ids = [record['event']['external_id'] for record in records]
+        events = {event.external_id: event for event in Event.objects.filter(external_id__in=external_ids)}
+        now = timezone.now()
+        to_create = []
+        to_update = []
+        changed_fields = set()
+        image_jobs = []
+        updated = 0
+        unchanged = 0
+
+        for record in records:
+            event_data = record['event']
+            venue = record['venue']
+            venue = venues[venue.name if isinstance(venue, Venue) else venue['name']]
+            image_url = event_data.get('image_url', '') or ''
+            ticket_price = event_data.get('ticket_price')
+            source_hash = self.fingerprint(event_data)
+            event = events.get(event_data['external_id'])
+
+            if event is None:
+                event = Event(
+                    title=event_data['title'],
+                    slug=slugify(event_data['title']),
+                    date=event_data['date'],
+                    venue=venue,
+                    description=event_data.get('description', ''),
+                    ticket_url=event_data.get('ticket_url', ''),
+                    ticket_price=ticket_price,
+                    image_url=image_url,
+                    external_id=event_data['external_id'],
+                    source_hash=source_hash,
+                )
+                to_create.append(event)
+                events[event.external_id] = event
+                if image_url:
+                    image_jobs.append((event, image_url))
+                continue
+
+            if event.source_hash == source_hash:
+                if not event.image and event.image_url:
+                    # Try to download image again if we have a URL but no image
+                    image_jobs.append((event, event.image_url))
+                unchanged += 1
+                continue
+
+            changes = {
+                'source_hash': source_hash,
+                'title': event_data['title'],
+                'date': event_data['date'],
+                'description': event_data.get('description', ''),
+                'ticket_url': event_data.get('ticket_url', ''),
+            }
+            if ticket_price is not None:
+                changes['ticket_price'] = ticket_price
+            if image_url and event.image_url != image_url:
+                image_jobs.append((event, image_url))
+            elif not event.image and event.image_url:
+                image_jobs.append((event, event.image_url))
+            if image_url:
+                changes['image_url'] = image_url
+
+            fields = self._apply_changes(event, changes)
+            if fields == ['source_hash']:
+                # Only the stored fingerprint was stale, the row itself is current
+                unchanged += 1
+            else:
+                event.updated_at = now
+                changed_fields.add('updated_at')
+                updated += 1
+            to_update.append(event)
+            changed_fields.update(fields)
+
+        if to_create:
+            Event.objects.bulk_create(to_create)
+        if to_update:
+            Event.objects.bulk_update(to_update, sorted(changed_fields))
+        self._changed_event_ids.update(event.pk for event in to_create + to_update)
+        return events, (len(to_create), updated, unchanged), image_jobs
+
+    def _bulk_link_artists(self, records, events, artists):
+        """Insert all event/artist links of a batch in one statement."""
+        through = Event.artists.through
+        links = {
+            (events[record['event']['external_id']].pk, artists[artist_data['name']].pk)
+            for record in records
+            for artist_data in record.get('artists', [])
+            if artist_data.get('name')
+        }
+        if links:
+            links -= set(through.objects.filter(
+                event_id__in={event_id for event_id, _ in links}
+            ).values_list('event_id', 'artist_id'))
+        if links:
+            through.objects.bulk_create(
+                [through(event_id=event_id, artist_id=artist_id) for event_id, artist_id in links],
+                ignore_conflicts=True,
+            )
+            # bulk_create sends no m2m_changed signal, so refresh artist images
+            # and mark the events whose cards list new artists here
+            Artist.objects.filter(pk__in={artist_id for _, artist_id in links}).refresh_display_images()
+            Event.objects.filter(pk__in={event_id for event_id, _ in links}).touch()
+            self._changed_event_ids.update(event_id for event_id, _ in links)
+
+    def _apply_changes(self, obj, data):
+        """
+        Set the values in data on obj and return the names of changed fields.
+
+        Values are normalized by the model field so that, e.g., a float price
+        compares equal to the stored Decimal.
+        """
+        changed = []
+        for field_name, value in data.items():
+            try:
+                field = obj._meta.get_field(field_name)
+            except FieldDoesNotExist:
+                continue
+            if not field.concrete or field.primary_key:
+                continue
+            if field.is_relation:
+                if getattr(obj, field.attname) != getattr(value, 'pk', value):
+                    setattr(obj, field_name, value)
+                    changed.append(field_name)
+                continue
+            value = field.to_python(value)
+            if getattr(obj, field.attname) != value:
+                setattr(obj, field.attname, value)
+                changed.append(field_name)
+        return changed
+
     def create_or_update_event(self, event_data, venue):
         """
         Create or update an event based on the provided data.
         
+        Existing events whose stored fingerprint matches the incoming data
+        are left untouched and counted as unchanged, as are events where
+        only the stored fingerprint was stale.
+        
         Args:
             event_data (dict): Event data including title, date, description, etc.
             venue (Venue): The venue object for this event
@@ -50,6 +447,8 @@ class EventSyncBase:
                 logger.warning(f"Skipping event with missing required data: {title}")
                 return None, False
 
+            source_hash = self.fingerprint(event_data)
+
             # Create or update event
             event, created = Event.objects.get_or_create(
                 external_id=external_id,
@@ -61,6 +460,7 @@ class EventSyncBase:
                     'ticket_url': ticket_url,
                     'ticket_price': ticket_price,
                     'image_url': image_url,
+                    'source_hash': source_hash,
                 }
             )
 
@@ -69,25 +469,41 @@ class EventSyncBase:
                 # Download and save image for new events
                 if image_url:
                     self._handle_event_image(event, image_url)
+            elif event.source_hash == source_hash:
+                if not event.image and event.image_url:
+                    # Try to download image again if we have a URL but no image
+                    self._handle_event_image(event, event.image_url)
+                self.unchanged_count += 1
             else:
                 # Update existing event
-                event.title = title
-                event.date = date
-                event.description = description
-                event.ticket_url = ticket_url
+                changes = {
+                    'source_hash': source_hash,
+                    'title': title,
+                    'date': date,
+                    'description': description,
+                    'ticket_url': ticket_url,
+                }
                 if ticket_price is not None:
-                    event.ticket_price = ticket_price
+                    changes['ticket_price'] = ticket_price
+                image_changed = image_url and event.image_url != image_url
+                if image_changed:
+                    changes['image_url'] = image_url
+                fields = self._apply_changes(event, changes)
 
                 # Update image if URL has changed
-                if image_url and event.image_url != image_url:
-                    event.image_url = image_url
+                if image_changed:
                     self._handle_event_image(event, image_url)
                 elif not event.image and event.image_url:
                     # Try to download image again if we have a URL but no image
                     self._handle_event_image(event, event.image_url)
 
-                event.save()
-                self.updated_count += 1
+                if fields == ['source_hash']:
+                    # Only the stored fingerprint was stale, the row itself is current
+                    event.save(update_fields=['source_hash'])
+                    self.unchanged_count += 1
+                else:
+                    event.save()
+                    self.updated_count += 1
 
             return event, created
 
@@ -98,6 +514,9 @@ class EventSyncBase:
 
     def _handle_event_image(self, event, image_url):
         """Handle downloading and processing event images."""
+        if self.async_images:
+            self._pending_images.setdefault(image_url, set()).add(event.pk)
+            return
         if download_and_save_image(image_url, event):
             if event.image:
                 event.generate_thumbnail()
@@ -118,11 +537,8 @@ class EventSyncBase:
                 defaults=venue_data
             )
             
-            if not created:
-                # Update existing venue
-                for field, value in venue_data.items():
-                    if hasattr(venue, field):
-                        setattr(venue, field, value)
+            # Update an existing venue only when the data differs
+            if not created and self._apply_changes(venue, venue_data):
                 venue.save()
             
             return venue, created
@@ -146,11 +562,8 @@ class EventSyncBase:
                 defaults=artist_data
             )
             
-            if not created:
-                # Update existing artist
-                for field, value in artist_data.items():
-                    if hasattr(artist, field):
-                        setattr(artist, field, value)
+            # Update an existing artist only when the data differs
+            if not created and self._apply_changes(artist, artist_data):
                 artist.save()
             
             return artist, created
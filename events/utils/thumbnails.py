@@ -1,9 +1,66 @@
 import os
 
+import django
+
 from io import BytesIO
 from PIL import Image
 from django.core.files.base import ContentFile
 
+# Draft/reduce keeps the intermediate image at least this many times the
+# target size, so the final LANCZOS pass is as sharp as a full-size resize
+REDUCING_GAP = 2.0
+
+def fit_size(size, box):
+    """
+    Get the size of an image scaled to fit in a box, preserving aspect ratio
+
+    Args:
+        size: Tuple of (width, height) of the image
+        box: Tuple of (width, height) to fit into
+
+    Returns:
+        tuple: (width, height), never larger than the original size
+    """
+    ratio = min(box[0] / size[0], box[1] / size[1], 1)
+    return max(1, round(size[0] * ratio)), max(1, round(size[1] * ratio))
+
+def open_scaled(source, size, modes=('RGB',), reducing_gap=REDUCING_GAP):
+    """
+    Open an image decoded at the smallest scale still covering a size
+
+    JPEGs use draft mode, so the decoder itself scales by 1/2, 1/4 or 1/8
+    and never materializes the full-size bitmap. Other formats are reduced
+    by an integer factor right after loading. The colour mode is converted
+    last, on the already reduced image.
+
+    Args:
+        source: File object, path or ImageField to open
+        size: Tuple of (width, height) of the largest box the image will be
+            resized into
+        modes: Colour modes to keep; anything else is converted to RGB
+        reducing_gap: Minimum ratio between the decoded and target sizes
+
+    Returns:
+        PIL.Image.Image: The decoded image
+    """
+    img = Image.open(source)
+    fitted = fit_size(img.size, size)
+    target = (int(fitted[0] * reducing_gap), int(fitted[1] * reducing_gap))
+
+    if img.format == 'JPEG':
+        img.draft('RGB', target)
+    else:
+        factor = int(min(img.width / target[0], img.height / target[1]))
+        if factor > 1:
+            if img.mode == 'P':
+                # Palette images cannot be reduced directly
+                img = img.convert('RGBA')
+            img = img.reduce(factor)
+
+    if img.mode not in modes:
+        img = img.convert('RGB')
+    return img
+
 def generate_thumbnail(image_field, size=(300, 200), format='JPEG', quality=85, prefix='thumb_'):
     """
     Generate a thumbnail for an ImageField
@@ -21,12 +78,8 @@ def generate_thumbnail(image_field, size=(300, 200), format='JPEG', quality=85,
     if not image_field:
         return None
         
-    # Open the image using PIL
-    img = Image.open(image_field)
-    
-    # Convert to RGB if needed (for PNG with transparency)
-    if img.mode not in ('L', 'RGB', 'RGBA'):
-        img = img.convert('RGB')
+    # Open the image at reduced scale, keeping transparency for PNG output
+    img = open_scaled(image_field, size, modes=('L', 'RGB', 'RGBA'))
     
     # Create a thumbnail
     img.thumbnail(size, Image.LANCZOS)
@@ -72,4 +125,33 @@ def get_thumbnail_path(image_field, size=(300, 200), format='JPEG', prefix='thum
     directory = os.path.dirname(image_field.name)
     
     # Return the path to the thumbnail
-    return os.path.join(directory, thumbnail_name)
\ No newline at end of file
+    return os.path.join(directory, thumbnail_name)
+
+def init_worker():
+    """
+    Set up Django in a spawned worker process
+
+    Worker functions live here rather than next to the models, so unpickling
+    them does not import the models before the app registry is ready.
+    """
+    django.setup()
+
+def render_event_images(job):
+    """
+    Generate the thumbnail and renditions of one event image in a worker
+
+    Only storage is written; the caller updates the database in bulk.
+
+    Args:
+        job: Tuple of (event id, image name, current renditions, rendition
+            groups or None for all)
+
+    Returns:
+        tuple: (event id, thumbnail name or None on error, renditions)
+    """
+    from events.models import Event
+
+    pk, image_name, renditions, groups = job
+    event = Event(pk=pk, title=str(pk), image=image_name, renditions=renditions or {})
+    event.generate_thumbnail(renditions=groups)
+    return pk, event.thumbnail.name or None, event.renditions
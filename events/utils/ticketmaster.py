@@ -1,8 +1,11 @@
 import requests
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from django.conf import settings
 from django.utils import timezone
-from datetime import datetime
+from datetime import datetime, timedelta, timezone as dt_timezone
+from requests.adapters import HTTPAdapter
+from .rate_limit import RateLimiter
 from .sync_base import EventSyncBase
 
 logger = logging.getLogger(__name__)
@@ -10,7 +13,25 @@ logger = logging.getLogger(__name__)
 # Ticketmaster API base URL
 TICKETMASTER_API_URL = "https://app.ticketmaster.com/discovery/v2/events.json"
 
-def fetch_events_for_city(city, state=None, api_key=None, size=20):
+# The Discovery API rejects pages beyond size * page >= 1000
+DEEP_PAGING_LIMIT = 1000
+MAX_PAGE_SIZE = 200
+
+# Date range fetched by default, and the smallest range we split down to
+SYNC_WINDOW = timedelta(days=365)
+MIN_SPLIT_WINDOW = timedelta(hours=1)
+
+
+class TicketmasterError(Exception):
+    """Raised when the Ticketmaster API cannot be queried."""
+
+
+def _format_api_datetime(value):
+    """Format a datetime as expected by startDateTime/endDateTime."""
+    return value.astimezone(dt_timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+def fetch_events_for_city(city, state=None, api_key=None, size=20, page=0,
+                          start_date=None, end_date=None, session=None):
     """
     Fetch events from Ticketmaster API for a specific city
     
@@ -19,6 +40,10 @@ def fetch_events_for_city(city, state=None, api_key=None, size=20):
         state (str, optional): State code (e.g., 'CA', 'NY')
         api_key (str, optional): Ticketmaster API key, defaults to settings.TICKETMASTER_API_KEY
         size (int, optional): Number of events to fetch, defaults to 20
+        page (int, optional): Page number to fetch, defaults to 0
+        start_date (datetime, optional): Only return events starting after this date
+        end_date (datetime, optional): Only return events starting before this date
+        session (requests.Session, optional): Session to reuse connections from
         
     Returns:
         dict: API response data
@@ -34,29 +59,124 @@ def fetch_events_for_city(city, state=None, api_key=None, size=20):
         "apikey": api_key,
         "city": city,
         "size": size,
+        "page": page,
         "classificationName": "music",
         "sort": "date,asc"
     }
     
     if state:
         params["stateCode"] = state
+    if start_date:
+        params["startDateTime"] = _format_api_datetime(start_date)
+    if end_date:
+        params["endDateTime"] = _format_api_datetime(end_date)
     
     try:
-        response = requests.get(TICKETMASTER_API_URL, params=params)
+        response = (session or requests).get(TICKETMASTER_API_URL, params=params, timeout=30)
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
         logger.error(f"Error fetching events from Ticketmaster: {e}")
         return {"error": str(e)}
 
+def _page_events(data):
+    """Return the events contained in an API response page."""
+    return data.get("_embedded", {}).get("events", [])
+
+def iter_events_for_city(city, state=None, api_key=None, start_date=None, end_date=None,
+                         page_size=MAX_PAGE_SIZE, max_workers=4, requests_per_second=5):
+    """
+    Yield every Ticketmaster event for a city, following pagination.
+
+    The first page of a date range tells how many events it holds. Ranges
+    holding more events than the API lets us page through are split in half
+    until every range fits under DEEP_PAGING_LIMIT. The remaining pages of a
+    range are then fetched concurrently over a pooled session, and events are
+    yielded as pages arrive.
+
+    Args:
+        city (str): City name
+        state (str, optional): State code (e.g., 'CA', 'NY')
+        api_key (str, optional): Ticketmaster API key
+        start_date (datetime, optional): Defaults to now
+        end_date (datetime, optional): Defaults to start_date + SYNC_WINDOW
+        page_size (int, optional): Events per page, at most MAX_PAGE_SIZE
+        max_workers (int, optional): Concurrent page requests
+        requests_per_second (float, optional): Rate limit for API requests
+
+    Yields:
+        dict: Raw Ticketmaster event data
+
+    Raises:
+        TicketmasterError: If the first page of a date range cannot be fetched
+    """
+    page_size = min(page_size, MAX_PAGE_SIZE)
+    max_pages = DEEP_PAGING_LIMIT // page_size
+    start_date = start_date or timezone.now()
+    end_date = end_date or start_date + SYNC_WINDOW
+    limiter = RateLimiter(requests_per_second)
+
+    with requests.Session() as session:
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        session.mount('https://', adapter)
+
+        def fetch_page(page, window_start, window_end):
+            limiter.acquire()
+            return fetch_events_for_city(
+                city, state, api_key, size=page_size, page=page,
+                start_date=window_start, end_date=window_end, session=session
+            )
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            windows = [(start_date, end_date)]
+            while windows:
+                window_start, window_end = windows.pop(0)
+                data = fetch_page(0, window_start, window_end)
+                if "error" in data:
+                    raise TicketmasterError(data["error"])
+
+                page_info = data.get("page", {})
+                total_elements = page_info.get("totalElements", 0)
+                if total_elements > DEEP_PAGING_LIMIT and window_end - window_start > MIN_SPLIT_WINDOW:
+                    middle = window_start + (window_end - window_start) / 2
+                    # Keep chronological order by processing the first half next
+                    windows[:0] = [(window_start, middle), (middle, window_end)]
+                    continue
+
+                total_pages = page_info.get("totalPages", 1)
+                if total_pages > max_pages:
+                    logger.warning(
+                        f"Ticketmaster range {window_start} - {window_end} has {total_elements} events, "
+                        f"only the first {max_pages * page_size} can be fetched"
+                    )
+                    total_pages = max_pages
+
+                yield from _page_events(data)
+
+                futures = [
+                    executor.submit(fetch_page, page, window_start, window_end)
+                    for page in range(1, total_pages)
+                ]
+                for future in as_completed(futures):
+                    data = future.result()
+                    if "error" in data:
+                        logger.error(f"Skipping Ticketmaster page for {city}: {data['error']}")
+                        continue
+                    yield from _page_events(data)
+
 class TicketmasterEventSync(EventSyncBase):
     """Ticketmaster event synchronization implementation."""
 
-    def __init__(self, city, state=None, api_key=None):
-        super().__init__('ticketmaster')
+    def __init__(self, city, state=None, api_key=None, batch_size=None,
+                 max_workers=None, requests_per_second=None):
+        # Not cached: the rolling date range makes every request URL new
+        super().__init__('ticketmaster', batch_size=batch_size, use_cache=False)
         self.city = city
         self.state = state
         self.api_key = api_key or getattr(settings, 'TICKETMASTER_API_KEY', None)
+        self.max_workers = max_workers or getattr(settings, 'TICKETMASTER_MAX_WORKERS', 4)
+        self.requests_per_second = requests_per_second or getattr(settings, 'TICKETMASTER_REQUESTS_PER_SECOND', 5)
+        self.fetched_count = 0
 
     def sync_events(self):
         """
@@ -65,46 +185,48 @@ class TicketmasterEventSync(EventSyncBase):
         Returns:
             tuple: (created_count, updated_count, error_message)
         """
-        data = fetch_events_for_city(self.city, self.state, self.api_key)
+        events = iter_events_for_city(
+            self.city, self.state, self.api_key,
+            max_workers=self.max_workers,
+            requests_per_second=self.requests_per_second,
+        )
         
-        if "error" in data:
-            return 0, 0, data["error"]
+        try:
+            self.sync_records(self._build_records(events))
+        except TicketmasterError as e:
+            return self.created_count, self.updated_count, str(e)
         
-        if "_embedded" not in data or "events" not in data["_embedded"]:
+        if not self.fetched_count:
             return 0, 0, "No events found"
         
-        events = data["_embedded"]["events"]
-        
+        return self.created_count, self.updated_count, None
+
+    def _build_records(self, events):
+        """Yield sync records for raw Ticketmaster events."""
         for event_data in events:
+            self.fetched_count += 1
             try:
-                # Process venue
-                venue_data = self._extract_venue_data(event_data)
-                venue, _ = self.create_or_update_venue(venue_data)
-                if not venue:
+                processed_event_data = self._extract_event_data(event_data, None)
+                if not processed_event_data:
+                    logger.warning(f"Skipping event without a start date: {event_data.get('name', 'Unknown')}")
+                    self.error_count += 1
                     continue
 
-                # Process event
-                processed_event_data = self._extract_event_data(event_data, venue)
-                event, created = self.create_or_update_event(processed_event_data, venue)
-                if not event:
-                    continue
-
-                # Process artists
-                artist_names = self._extract_artist_names(event_data)
-                for artist_name in artist_names:
-                    artist_data = {
+                artists = [
+                    {
                         'name': artist_name,
                         'bio': f"Artist/performer appearing at {processed_event_data['title']}"
                     }
-                    artist, _ = self.create_or_update_artist(artist_data)
-                    if artist:
-                        event.artists.add(artist)
-                
+                    for artist_name in self._extract_artist_names(event_data)
+                ]
+                yield {
+                    'event': processed_event_data,
+                    'venue': self._extract_venue_data(event_data),
+                    'artists': artists,
+                }
             except Exception as e:
                 logger.error(f"Error processing event {event_data.get('name', 'Unknown')}: {e}")
                 self.error_count += 1
-        
-        return self.created_count, self.updated_count, None
 
     def _extract_venue_data(self, event_data):
         """Extract venue data from Ticketmaster event data."""
@@ -1,10 +1,19 @@
 from django.shortcuts import render, get_object_or_404
+from django.utils.decorators import method_decorator
 from django.views.generic import ListView, DetailView, TemplateView
-from django.utils import timezone
+from .filters import EventFilterForm, facet_counts
 from .models import Artist, Venue, Event
+from .search import search_events
+from .pagination import CursorPaginationMixin
+from .utils.page_cache import cache_public_page, conditional_page
 
+# Validators are checked before the page cache, so a 304 skips both
+public_page = [conditional_page(), cache_public_page]
+
+@conditional_page()
+@cache_public_page
 def home(request):
-    upcoming_events = Event.objects.filter(date__gte=timezone.now()).order_by('date')[:5]
+    upcoming_events = Event.objects.upcoming().cards()[:5]
     featured_artists = Artist.objects.all()[:3]
     featured_venues = Venue.objects.all()[:3]
     
@@ -16,22 +25,38 @@ def home(request):
     
     return render(request, 'events/home.html', context)
 
-class EventListView(ListView):
+@method_decorator(public_page, name='dispatch')
+class EventListView(CursorPaginationMixin, ListView):
     model = Event
     template_name = 'events/event_list.html'
     context_object_name = 'events'
     paginate_by = 9  # Show 9 events per page (3 rows of 3 events)
-    
+    cursor_ordering = ('date', 'id')
+
+    def get_filter_form(self):
+        if not hasattr(self, 'filter_form'):
+            self.filter_form = EventFilterForm(self.request.GET)
+        return self.filter_form
+
     def get_queryset(self):
-        queryset = Event.objects.filter(date__gte=timezone.now()).order_by('date')
-        return queryset
+        return self.get_filter_form().apply(Event.objects.upcoming()).cards()
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        form = self.get_filter_form()
         # Get past events separately (not paginated)
-        context['past_events'] = Event.objects.filter(date__lt=timezone.now()).order_by('-date')[:5]
+        context['past_events'] = form.apply(Event.objects.past(), dates=False).cards()[:5]
+        context['filter_form'] = form
+        context['active_filters'] = form.filters()
+        # Filters carried over by the pagination and facet links
+        query = self.request.GET.copy()
+        for param in ('page', 'after', 'before'):
+            query.pop(param, None)
+        context['pagination_query'] = query.urlencode()
+        context['facets'] = facet_counts(form.apply(Event.objects.upcoming()), query)
         return context
 
+@method_decorator(public_page, name='dispatch')
 class EventDetailView(DetailView):
     model = Event
     template_name = 'events/event_detail.html'
@@ -40,19 +65,33 @@ class EventDetailView(DetailView):
     def get_object(self, queryset=None):
         return get_object_or_404(Event, pk=self.kwargs['pk'], slug=self.kwargs['slug'])
 
+# Validated with the content version too, as the page shows artist and
+# venue details and whether the event is past, which updated_at misses
+@conditional_page()
+@cache_public_page
 def event_detail(request, pk, slug):
     event = get_object_or_404(Event, pk=pk)
     return render(request, 'events/event_detail.html', {'event': event})
 
-class ArtistListView(ListView):
+@conditional_page()
+@cache_public_page
+def search(request):
+    query = request.GET.get('q', '').strip()
+    events = search_events(query) if query else []
+    return render(request, 'events/search.html', {'query': query, 'events': events})
+
+@method_decorator(public_page, name='dispatch')
+class ArtistListView(CursorPaginationMixin, ListView):
     model = Artist
     template_name = 'events/artist_list.html'
     context_object_name = 'artists'
     paginate_by = 12  # Show 12 artists per page
+    cursor_ordering = ('name', 'id')
     
     def get_queryset(self):
         return Artist.objects.all().order_by('name')
 
+@method_decorator(public_page, name='dispatch')
 class ArtistDetailView(DetailView):
     model = Artist
     template_name = 'events/artist_detail.html'
@@ -60,10 +99,11 @@ class ArtistDetailView(DetailView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['upcoming_events'] = self.object.events.filter(date__gte=timezone.now()).order_by('date')
-        context['past_events'] = self.object.events.filter(date__lt=timezone.now()).order_by('-date')
+        context['upcoming_events'] = self.object.events.upcoming().cards()
+        context['past_events'] = self.object.events.past().cards()
         return context
 
+@method_decorator(public_page, name='dispatch')
 class VenueListView(ListView):
     model = Venue
     template_name = 'events/venue_list.html'
@@ -73,6 +113,7 @@ class VenueListView(ListView):
     def get_queryset(self):
         return Venue.objects.all().order_by('name')
 
+@method_decorator(public_page, name='dispatch')
 class VenueDetailView(DetailView):
     model = Venue
     template_name = 'events/venue_detail.html'
@@ -80,8 +121,8 @@ class VenueDetailView(DetailView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['upcoming_events'] = self.object.events.filter(date__gte=timezone.now()).order_by('date')
-        context['past_events'] = self.object.events.filter(date__lt=timezone.now()).order_by('-date')
+        context['upcoming_events'] = self.object.events.upcoming().cards()
+        context['past_events'] = self.object.events.past().cards()
         return context
 
 
@@ -20,10 +20,24 @@ env = environ.Env(
     SECRET_KEY=(str, None),
     DJANGO_ALLOWED_HOSTS=(list, []),
     TICKETMASTER_API_KEY=(str, None),
+    TICKETMASTER_MAX_WORKERS=(int, 4),
+    TICKETMASTER_REQUESTS_PER_SECOND=(float, 5.0),
     SPOTIFY_CLIENT_ID=(str, None),
     SPOTIFY_CLIENT_SECRET=(str, None),
     SITE_LOGO=(str, 'images/logo.png'),
     SITE_NAME=(str, 'music.madrid'),
+    EVENT_SYNC_BATCH_SIZE=(int, 0),
+    HTTP_CACHE_DIR=(str, '/tmp/musicevents-http-cache'),
+    EVENT_IMAGES_ASYNC=(bool, False),
+    CONTENT_ADDRESSED_IMAGES=(bool, False),
+    IMAGE_RENDITION_FORMATS=(list, ['avif', 'webp', 'jpeg']),
+    CACHE_URL=(str, ''),
+    PAGE_CACHE_TIMEOUT=(int, 3600),
+    EVENT_CARD_CACHE_TIMEOUT=(int, 86400),
+    CURSOR_PAGINATION=(bool, False),
+    SPOTIFY_ENRICHMENT_ASYNC=(bool, False),
+    SPOTIFY_REQUESTS_PER_SECOND=(float, 5.0),
+    SPOTIFY_MAX_WORKERS=(int, 4),
 )
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -71,6 +85,14 @@ Q_CLUSTER = {
     'cpu_affinity': 1,
     'label': 'Django Q',
     'orm': 'default',
+    # Image downloads run on their own workers: Q_CLUSTER_NAME=images manage.py qcluster
+    'ALT_CLUSTERS': {
+        'images': {
+            'workers': 2,
+            'timeout': 600,
+            'retry': 900,
+        },
+    },
 }
 
 MIDDLEWARE = [
@@ -171,10 +193,74 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Ticketmaster API settings
 TICKETMASTER_API_KEY = env('TICKETMASTER_API_KEY')
+# Concurrent page requests and request rate (the Discovery API allows 5/s)
+TICKETMASTER_MAX_WORKERS = env('TICKETMASTER_MAX_WORKERS')
+TICKETMASTER_REQUESTS_PER_SECOND = env('TICKETMASTER_REQUESTS_PER_SECOND')
+
+# Event sync settings
+# Number of events written per bulk upsert batch, 0 processes events one by one
+EVENT_SYNC_BATCH_SIZE = env('EVENT_SYNC_BATCH_SIZE')
+# Directory storing scraped pages for conditional requests, empty to disable
+HTTP_CACHE_DIR = env('HTTP_CACHE_DIR')
+# Download event images on the django-q 'images' cluster instead of during sync
+EVENT_IMAGES_ASYNC = env('EVENT_IMAGES_ASYNC')
+# Store downloaded images once per content hash under media/images/
+CONTENT_ADDRESSED_IMAGES = env('CONTENT_ADDRESSED_IMAGES')
+# Responsive event image sizes, as (width, height) boxes per template slot
+IMAGE_RENDITIONS = {
+    'card': [(300, 200), (600, 400)],
+    'detail': [(800, 600), (1600, 1200)],
+}
+# Responsive artist image sizes; Spotify images are downloaded at the
+# smallest size covering the largest box
+ARTIST_IMAGE_RENDITIONS = {
+    'card': [(350, 350), (700, 700)],
+}
+# Rendition formats; JPEG is always generated as the fallback
+IMAGE_RENDITION_FORMATS = env('IMAGE_RENDITION_FORMATS')
+
+# Cache settings
+# Shared cache for rendered pages, e.g. redis://localhost:6379/1; without it
+# each process keeps its own in-memory cache
+CACHE_URL = env('CACHE_URL')
+if CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+# Seconds public pages stay cached for anonymous visitors, 0 to disable
+PAGE_CACHE_TIMEOUT = env('PAGE_CACHE_TIMEOUT')
+# Seconds a rendered event card is kept; cards are keyed on the event's
+# updated_at, so edits never serve stale markup
+EVENT_CARD_CACHE_TIMEOUT = env('EVENT_CARD_CACHE_TIMEOUT')
+
+# Listing settings
+# Paginate the event and artist lists with next/previous cursors instead of
+# page numbers, avoiding COUNT(*) and OFFSET on large tables
+CURSOR_PAGINATION = env('CURSOR_PAGINATION')
+# PostgreSQL text search configuration; 'simple' does no stemming, as events
+# are in several languages
+SEARCH_CONFIG = 'simple'
 
 # Spotify API settings
 SPOTIFY_CLIENT_ID = env('SPOTIFY_CLIENT_ID')
 SPOTIFY_CLIENT_SECRET = env('SPOTIFY_CLIENT_SECRET')
+# Look artists up on django-q workers, in batches sharing one client, instead
+# of synchronously in Artist.save()
+SPOTIFY_ENRICHMENT_ASYNC = env('SPOTIFY_ENRICHMENT_ASYNC')
+# Rate limit shared by all Spotify calls of a process; 429 responses pause it
+# for their Retry-After delay
+SPOTIFY_REQUESTS_PER_SECOND = env('SPOTIFY_REQUESTS_PER_SECOND')
+# Concurrent artist searches during a refresh
+SPOTIFY_MAX_WORKERS = env('SPOTIFY_MAX_WORKERS')
 
 # Site branding settings
 SITE_LOGO = env('SITE_LOGO')  # Default logo path relative to static directory
@@ -24,6 +24,7 @@ from events.admin import admin_site as events_admin_site
 # Non-translatable URLs
 urlpatterns = [
     path('i18n/', include('django.conf.urls.i18n')),  # Language switch view
+    path('api/v1/', include('events.api.urls')),  # Read-only JSON API
 ]
 
 # Translatable URLs
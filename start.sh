@@ -8,6 +8,11 @@ cleanup() {
         kill ${QCLUSTER_PID} 2>/dev/null
         wait ${QCLUSTER_PID} 2>/dev/null
     fi
+    if [ -n "${IMAGES_QCLUSTER_PID}" ]; then
+        echo "Stopping Django Q images cluster (PID: ${IMAGES_QCLUSTER_PID})"
+        kill ${IMAGES_QCLUSTER_PID} 2>/dev/null
+        wait ${IMAGES_QCLUSTER_PID} 2>/dev/null
+    fi
     exit 0
 }
 
@@ -24,6 +29,12 @@ uv run manage.py qcluster &
 QCLUSTER_PID=$!
 echo "Django Q cluster started with PID: ${QCLUSTER_PID}"
 
+# Start the Django Q cluster processing image downloads
+echo "Starting Django Q images cluster..."
+Q_CLUSTER_NAME=images uv run manage.py qcluster &
+IMAGES_QCLUSTER_PID=$!
+echo "Django Q images cluster started with PID: ${IMAGES_QCLUSTER_PID}"
+
 # Start Django development server
 echo "Starting Django development server..."
 uv run manage.py runserver 0.0.0.0:8000